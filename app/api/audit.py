@@ -1,34 +1,52 @@
-from fastapi import APIRouter
-from ..models.schemas import AuditQuery, SeasonContrastQuery
+import json
+
+from fastapi import APIRouter, Request
+from ..models.schemas import AuditQuery, SeasonContrastQuery, SeasonScanQuery
 from ..core.audit_engine import (
-    get_audit_db, filter_audit_data, calculate_stats,
+    get_audit_snapshot, filter_audit_data, calculate_stats,
     get_heatmap_stats, get_drift_stats, get_monthly_stats,
     get_event_comparison_stats, get_event_deception_index, get_event_dates,
-    get_season_contrast_stats
+    get_season_contrast_stats, get_season_split_scan
 )
-from ..services.temporal_service import TemporalService
+from ..core.memo import MemoCache
+from .responses import negotiate, make_etag, not_modified
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
+# The filter panel cycles through a handful of queries; payloads are shared, never mutated
+BUNDLE_CACHE = MemoCache("audit_bundle", maxsize=64)
+
+def _query_key(q: AuditQuery):
+    """Filters are set-like, so order and duplicates don't change the result."""
+    return {
+        "events": sorted(set(q.events)),
+        "stars": sorted(set(q.stars)),
+        "catch_ops": sorted(set(q.catch_ops)),
+        "min_samples": q.min_samples,
+        "split_date": q.split_date or None
+    }
+
 @router.get("/temporal-gap")
-def get_temporal_gap():
+def get_temporal_gap(request: Request):
     """Returns real vs IID gap analysis data."""
-    service = TemporalService()
-    return service.get_temporal_gap_data()
+    # Imported here so audit-only startups don't pull in NumPy
+    from ..services.temporal_service import get_temporal_service
+    service = get_temporal_service()
+    etag = make_etag(request, service.data_version())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return negotiate(request, service.get_temporal_gap_data(), etag)
 
 @router.get("/meta")
-def get_audit_metadata():
-    db = get_audit_db()
-    events = sorted(list(set(r["_event"] for r in db)))
-    stars = sorted(list(set(r["star"] for r in db)))
-    dates = sorted(list(set(r["_date"] for r in db)))
-    
-    return {
-        "events": events,
-        "stars": stars,
-        "dates": dates,
-        "total_records": len(db)
-    }
+def get_audit_metadata(request: Request):
+    snapshot = get_audit_snapshot()
+    etag = make_etag(request, snapshot.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    return negotiate(request, snapshot.dims.meta(), etag)
 
 @router.post("/query")
 def query_audit_data(q: AuditQuery):
@@ -52,21 +70,35 @@ def query_audit_data(q: AuditQuery):
     }
 
 @router.post("/bundle")
-def get_audit_bundle(q: AuditQuery):
+def get_audit_bundle(q: AuditQuery, request: Request):
     """Fetch a consistent set of audit stats with the same filters."""
+    # One snapshot for the whole bundle: a reload mid-build can't mix versions
+    snapshot = get_audit_snapshot()
+    key = _query_key(q)
+    etag = make_etag(request, snapshot.version, key)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    cache_key = json.dumps(key, sort_keys=True)
+    payload = BUNDLE_CACHE.get(cache_key, snapshot.version, lambda: _build_bundle(q, snapshot))
+    return negotiate(request, payload, etag)
+
+def _build_bundle(q: AuditQuery, snapshot):
     filtered, included, skipped, total = filter_audit_data(
         events=q.events,
         stars=q.stars,
         catch_ops=q.catch_ops,
-        min_samples=q.min_samples
+        min_samples=q.min_samples,
+        snapshot=snapshot
     )
 
     results = calculate_stats(filtered)
     heatmap = get_heatmap_stats(filtered_db=filtered)
     drift = get_drift_stats(filtered_db=filtered)
     monthly = get_monthly_stats(filtered_db=filtered)
-    event_dec = get_event_deception_index(filtered)
-    season = get_season_contrast_stats(filtered_db=filtered)
+    event_dec = get_event_deception_index(filtered, snapshot=snapshot)
+    season = get_season_contrast_stats(split_date=q.split_date, filtered_db=filtered)
 
     dates = sorted(list(set(r["date"] for r in heatmap)))
     stars = sorted(list(set(r["star"] for r in heatmap)))
@@ -89,24 +121,30 @@ def get_audit_bundle(q: AuditQuery):
         "drift": drift,
         "monthly": monthly,
         "eventDec": event_dec,
-        "eventDates": get_event_dates(),
+        "eventDates": get_event_dates(snapshot=snapshot),
         "seasonContrast": season
     }
 
 @router.get("/heatmap")
-def get_heatmap_data():
+def get_heatmap_data(request: Request):
     """Returns Z-score data grouped by (star, date) for heatmap visualization."""
-    results = get_heatmap_stats()
+    snapshot = get_audit_snapshot()
+    etag = make_etag(request, snapshot.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    results = get_heatmap_stats(filtered_db=snapshot.cube.select())
     
     # Get unique sorted dates and stars for axes
     dates = sorted(list(set(r["date"] for r in results)))
     stars = sorted(list(set(r["star"] for r in results)))
     
-    return {
+    return negotiate(request, {
         "data": results,
         "dates": dates,
         "stars": stars
-    }
+    }, etag)
 
 @router.get("/drift")
 def get_drift_data():
@@ -128,13 +166,15 @@ def get_event_comparison():
 @router.post("/event-deception")
 def get_event_deception(q: AuditQuery):
     """Calculate the Event Deception Index based on probability suppression with filters."""
+    snapshot = get_audit_snapshot()
     filtered, _, _, _ = filter_audit_data(
         events=q.events,
         stars=q.stars,
         catch_ops=q.catch_ops,
-        min_samples=q.min_samples
+        min_samples=q.min_samples,
+        snapshot=snapshot
     )
-    return get_event_deception_index(filtered)
+    return get_event_deception_index(filtered, snapshot=snapshot)
 
 @router.get("/event-dates")
 def get_event_dates_api():
@@ -156,3 +196,14 @@ def post_season_contrast(q: SeasonContrastQuery):
         min_samples=q.min_samples
     )
     return get_season_contrast_stats(split_date=q.split_date, filtered_db=filtered)
+
+@router.post("/season-splits")
+def post_season_splits(q: SeasonScanQuery):
+    """Season contrast at many candidate split dates, to locate a likely patch date."""
+    filtered, _, _, _ = filter_audit_data(
+        events=q.events,
+        stars=q.stars,
+        catch_ops=q.catch_ops,
+        min_samples=q.min_samples
+    )
+    return get_season_split_scan(split_dates=q.split_dates, filtered_db=filtered)
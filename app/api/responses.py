@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from ..core import metrics
+from ..core.columnar import MEDIA_TYPE, encode
+
+
+def wants_columnar(request: Request) -> bool:
+    return MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def make_etag(request: Request, version, query=None):
+    """
+    Strong ETag over the data version, the route, the normalized query and
+    the negotiated media type. `query` defaults to the sorted query string.
+    """
+    if query is None:
+        query = sorted(request.query_params.multi_items())
+    key = json.dumps({
+        "v": version,
+        "path": request.url.path,
+        "q": query,
+        "media": MEDIA_TYPE if wants_columnar(request) else "application/json"
+    }, sort_keys=True, default=str)
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def not_modified(request: Request, etag):
+    """304 response when If-None-Match already names `etag`, else None."""
+    header = request.headers.get("if-none-match")
+    tags = [t.strip() for t in header.split(",")] if header else []
+    hit = "*" in tags or etag in tags or f"W/{etag}" in tags
+    metrics.record_cache("http_etag", hit)
+    if hit:
+        return Response(status_code=304, headers=_cache_headers(etag))
+    return None
+
+
+def _cache_headers(etag):
+    headers = {"Vary": "Accept"}
+    if etag:
+        # Cacheable, but always revalidated against the ETag
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "no-cache"
+    return headers
+
+
+def negotiate(request: Request, payload, etag=None):
+    """JSON by default; columnar binary when the client accepts it."""
+    headers = _cache_headers(etag)
+    if wants_columnar(request):
+        return Response(encode(jsonable_encoder(payload)), media_type=MEDIA_TYPE, headers=headers)
+    return JSONResponse(jsonable_encoder(payload), headers=headers)
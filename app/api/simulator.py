@@ -1,10 +1,35 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from ..models.schemas import CompareRequest
 from ..services.simulation_service import SimulationService
+from ..services.compare_stream import stream_compare, stop_stream
+from .responses import negotiate
 
 router = APIRouter()
 simulation_service = SimulationService()
 
 @router.post("/compare")
-def run_compare(req: CompareRequest):
-    return simulation_service.run_compare(req)
+def run_compare(req: CompareRequest, request: Request):
+    return negotiate(request, simulation_service.run_compare(req))
+
+@router.post("/compare/stream")
+def run_compare_stream(req: CompareRequest, batch_size: int = 2000):
+    """Server-sent events: started, snapshot*, then result (or error)."""
+    def frames():
+        for event, data in stream_compare(simulation_service, req, batch_size):
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/compare/stream/{run_id}/stop")
+def stop_compare_stream(run_id: str):
+    if not stop_stream(run_id):
+        raise HTTPException(status_code=404, detail="Unknown or finished run")
+    return {"stopped": True}
@@ -0,0 +1,317 @@
+"""
+On-disk columnar cache of the parsed audit dataset.
+
+audit_data/.cache/ holds a manifest.json plus one generation directory with
+one .npy file per record column. Rows are grouped in per-file segments, in
+os.listdir() order, so records come back in the same order as a plain JSON
+load. The manifest keeps each file's size, mtime and sha1. On load only
+files whose size/mtime changed are re-hashed, and only files whose content
+changed are re-parsed. Unchanged segments are copied from the previous
+generation's memory-mapped columns.
+
+Per-file values (_event, _date, _is_catch, _filename) are stored in the
+manifest rather than as columns.
+
+The generation files are the dataset shared between uvicorn workers. Each
+worker maps them read-only, so the OS keeps one copy of the pages however
+many workers attach. Refreshes take an exclusive lock on .cache/.lock.
+The first process to see a change parses it, and the others wait and then
+map the generation it wrote. The temporal service publishes its series the
+same way (read_manifest / write_generation / locked).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock; each worker may refresh on its own
+    fcntl = None
+
+CACHE_FORMAT = 1
+MANIFEST = "manifest.json"
+LOCK = ".lock"
+NO_EVENT = "스타포스 이벤트 미적용"
+
+
+class Uncacheable(Exception):
+    """Records don't fit the fixed int64/float64 column layout."""
+
+
+class AuditColumns:
+    def __init__(self, layout, columns, files):
+        self.layout = layout        # [[name, "int64" | "float64"], ...] in record key order
+        self.columns = columns      # name -> np.ndarray (memory-mapped when read from disk)
+        self.files = files          # manifest entries: offset/rows plus the per-file values
+
+    def __len__(self):
+        return sum(e["rows"] for e in self.files)
+
+    def to_records(self):
+        """Flat record dicts, identical to audit_engine's JSON loader."""
+        return [r for records in self.file_records().values() for r in records]
+
+    def file_records(self, previous=None):
+        """
+        {(filename, sha1): [record dicts]} in file order. Files whose entry
+        is also in `previous` (an earlier result) reuse those dicts as-is.
+        """
+        names = [name for name, _ in self.layout]
+        values = None
+        out = {}
+        for e in self.files:
+            key = (e["name"], e["sha1"])
+            if e.get("error"):
+                print(f"Error loading {e['name']}: {e['error']}")
+                out[key] = []
+                continue
+            if previous and key in previous:
+                out[key] = previous[key]
+                continue
+            if values is None:
+                values = [self.columns[name].tolist() for name in names]
+            extra = {"_event": e["event"], "_date": e["date"], "_is_catch": e["is_catch"], "_filename": e["name"]}
+            start = e["offset"]
+            records = []
+            for row in zip(*(v[start:start + e["rows"]] for v in values)):
+                r = dict(zip(names, row))
+                r.update(extra)
+                records.append(r)
+            out[key] = records
+        return out
+
+
+class LazyRecords:
+    """
+    Flat record dicts of an AuditColumns, built on first access. Serving
+    only needs the columns, so workers don't each hold a dict per row
+    unless a record-level caller asks for them.
+    """
+
+    def __init__(self, columns, previous=None):
+        self._columns = columns
+        # Only already-built dicts are reused; don't keep older generations alive
+        self._previous = previous.loaded() if isinstance(previous, LazyRecords) else previous
+        self._lock = threading.Lock()
+        self._by_file = None
+        self._flat = None
+
+    def loaded(self):
+        """{(filename, sha1): [record dicts]} if built yet, else None."""
+        return self._by_file
+
+    def by_file(self):
+        if self._flat is None:
+            with self._lock:
+                if self._flat is None:
+                    by_file = self._columns.file_records(self._previous)
+                    self._previous = None
+                    self._by_file = by_file
+                    self._flat = [r for records in by_file.values() for r in records]
+        return self._by_file
+
+    def _records(self):
+        self.by_file()
+        return self._flat
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __getitem__(self, i):
+        return self._records()[i]
+
+    def __iter__(self):
+        return iter(self._records())
+
+
+def parse_file(filename, raw):
+    """(file values, kept records) for one audit JSON file."""
+    data = json.loads(raw)
+    meta = data.get("meta", {})
+    event_name = meta.get("event", NO_EVENT).strip()
+    if not event_name or event_name == "No Event":
+        event_name = NO_EVENT
+    info = {
+        "event": event_name,
+        "date": filename.split("_")[0],
+        "is_catch": meta.get("star_catch", False)
+    }
+    # Drop empty/placeholder rows (these dilute aggregates like heatmap/drift/monthly).
+    records = [r for r in data.get("records", []) if r.get("total_n", 0) > 0]
+    return info, records
+
+
+def _layout_of(record):
+    layout = []
+    for name, v in record.items():
+        if isinstance(v, bool) or not isinstance(v, (int, float)):
+            raise Uncacheable(f"column {name!r} holds {type(v).__name__}")
+        layout.append([name, "int64" if isinstance(v, int) else "float64"])
+    return layout
+
+
+def _to_columns(layout, records):
+    cols = {}
+    for name, dtype in layout:
+        py_type = int if dtype == "int64" else float
+        values = []
+        for r in records:
+            v = r.get(name)
+            if type(v) is not py_type:
+                raise Uncacheable(f"column {name!r} is not uniformly {dtype}")
+            values.append(v)
+        cols[name] = np.array(values, dtype=dtype)
+    if any(len(r) != len(layout) for r in records):
+        raise Uncacheable("records have extra keys")
+    return cols
+
+
+def read_manifest(cache_dir, fmt=CACHE_FORMAT):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != fmt:
+        return None
+    return manifest
+
+
+def _open_columns(cache_dir, manifest):
+    gen_dir = os.path.join(cache_dir, manifest["generation"])
+    return {
+        name: np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r")
+        for name, _ in manifest["layout"]
+    }
+
+
+def write_generation(cache_dir, manifest, columns):
+    """New generation directory first, then an atomic manifest swap."""
+    os.makedirs(cache_dir, exist_ok=True)
+    generation = f"gen-{time.time_ns():x}-{os.getpid()}"
+    gen_dir = os.path.join(cache_dir, generation)
+    os.makedirs(gen_dir)
+    for name, arr in columns.items():
+        np.save(os.path.join(gen_dir, f"{name}.npy"), arr)
+    manifest = dict(manifest, generation=generation)
+    tmp = os.path.join(cache_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+    # Readers that still map an old generation keep their pages (POSIX unlink semantics)
+    for entry in os.listdir(cache_dir):
+        if entry.startswith("gen-") and entry != generation:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return manifest
+
+
+@contextmanager
+def locked(cache_dir):
+    """Exclusive cross-process lock on the cache directory (best effort)."""
+    try:
+        if fcntl is None:
+            raise OSError("no flock")
+        os.makedirs(cache_dir, exist_ok=True)
+        f = open(os.path.join(cache_dir, LOCK), "a")
+    except OSError:
+        # Read-only checkout or no flock: refresh unlocked
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load(directory, cache_dir=None):
+    """
+    AuditColumns for `directory`, refreshing the cache for changed files.
+    Raises Uncacheable when the records don't fit the column layout.
+    """
+    cache_dir = cache_dir or os.path.join(directory, ".cache")
+    with locked(cache_dir):
+        try:
+            return _refresh(directory, cache_dir, read_manifest(cache_dir))
+        except Uncacheable:
+            # The layout may have changed (e.g. a new field); retry from scratch
+            return _refresh(directory, cache_dir, None)
+
+
+def _refresh(directory, cache_dir, old):
+    names = [f for f in os.listdir(directory) if f.endswith(".json")]
+    old_files = {}
+    old_columns = None
+    if old is not None:
+        try:
+            old_columns = _open_columns(cache_dir, old)
+            old_files = {e["name"]: e for e in old["files"]}
+        except (OSError, ValueError):
+            old = None
+    layout = old["layout"] if old is not None else None
+
+    dirty = old is None or [e["name"] for e in old["files"]] != names
+    files, segments = [], []
+    offset = 0
+    for name in names:
+        path = os.path.join(directory, name)
+        st = os.stat(path)
+        prev = old_files.get(name)
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            entry, seg = dict(prev), ("cached", prev["offset"], prev["rows"])
+        else:
+            dirty = True
+            with open(path, "rb") as f:
+                raw = f.read()
+            sha1 = hashlib.sha1(raw).hexdigest()
+            if prev and prev["sha1"] == sha1:
+                # touched but unchanged
+                entry, seg = dict(prev), ("cached", prev["offset"], prev["rows"])
+            else:
+                entry = {"name": name, "sha1": sha1}
+                try:
+                    info, records = parse_file(name, raw)
+                except Exception as e:
+                    info, records = {"error": str(e)}, []
+                if records and layout is None:
+                    layout = _layout_of(records[0])
+                entry.update(info)
+                seg = ("parsed", _to_columns(layout, records) if records else None, len(records))
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+        entry["offset"], entry["rows"] = offset, seg[2]
+        offset += seg[2]
+        files.append(entry)
+        segments.append(seg)
+
+    if not dirty:
+        return AuditColumns(layout, old_columns, files)
+
+    layout = layout or []
+    columns = {}
+    for name, dtype in layout:
+        parts = []
+        for kind, src, rows in segments:
+            if not rows:
+                continue
+            if kind == "cached":
+                parts.append(old_columns[name][src:src + rows])
+            else:
+                parts.append(src[name])
+        columns[name] = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    manifest = {"format": CACHE_FORMAT, "layout": layout, "files": files}
+    try:
+        manifest = write_generation(cache_dir, manifest, columns)
+        columns = _open_columns(cache_dir, manifest)
+    except OSError as e:
+        # Read-only checkout: serve the freshly parsed columns from memory
+        print(f"Audit cache not written: {e}")
+    return AuditColumns(layout, columns, files)
@@ -0,0 +1,240 @@
+"""
+Pre-aggregated star × catch × event × date cube over the audit records.
+
+Each view in the bundle sums a handful of sufficient statistics over a
+subset of the cells: record count, total_n, and for S/F/B the observed
+count, n·p and n·p(1−p). The only per-record filter is min_samples
+(total_n >= T). To handle it, each cell keeps its records sorted by
+total_n together with suffix sums of those statistics. A threshold
+becomes one binary search per cell, so a query costs O(cells), not
+O(records).
+
+The var-ratio tests need the variance of the individual z-scores
+(n > 100). Each z is scaled to an exact integer over a common power of
+two. Each cell keeps suffix sums of x and x² as Python ints, so a group's
+variance is exact and needs no per-record list. Non-finite z-scores fall
+back to gathering the lists.
+
+Cells are numbered in the order their first record appears. While each
+cell holds a single record (one file per date/event/catch, one row per
+star), every sum matches the record-at-a-time result bit for bit. Cells
+holding several records may differ in the last ulp.
+"""
+
+import bisect
+
+import numpy as np
+
+from .audit_frame import OUTCOMES, group_rows, group_int_sum, list_variances, scaled_ints, variance_from_sums
+
+STATS = ("n",) + tuple(f"{t}_{s}" for t, _ in OUTCOMES for s in ("obs", "exp", "var"))
+Z_MIN_N = 100
+
+
+def _segment_suffix(values, bounds, ufunc=np.add):
+    """Suffix reductions (sums by default) within each [bounds[i], bounds[i+1]) segment."""
+    out = values.copy()
+    sizes = np.diff(bounds)
+    # Single-record cells (the common case) are their own suffix sum
+    for c in np.flatnonzero(sizes > 1).tolist():
+        s, e = bounds[c], bounds[c + 1]
+        out[s:e] = ufunc.accumulate(values[s:e][::-1])[::-1]
+    return out
+
+
+def _ranges(starts, lengths):
+    """Concatenated np.arange(s, s + l) for each (s, l)."""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+class AuditCube:
+    def __init__(self, frame):
+        c = frame.cols
+        self.frame = frame
+        cell, first = group_rows(c["star"], c["catch"], c["event"], c["date"])
+        self.size = len(first)
+        self.keys = {k: c[k][first] for k in ("star", "catch", "event", "date")}
+
+        # Rows grouped by cell (cells in first-appearance order), by total_n inside a cell
+        order = np.lexsort((c["n"], cell)) if len(cell) else np.empty(0, dtype=np.int64)
+        self.order = order
+        self.bounds = np.searchsorted(cell[order], np.arange(self.size + 1))
+        self.n_sorted = c["n"][order]
+        # (cell, n) packed into one sorted int64 key for the threshold searches
+        self.n_span = int(self.n_sorted.max()) + 2 if len(order) else 2
+        self.search_key = cell[order].astype(np.int64) * self.n_span + self.n_sorted
+
+        per_row = {"n": c["n"]}
+        for t, _ in OUTCOMES:
+            exp, var = frame.expected(t)
+            per_row[f"{t}_obs"] = c[f"{t}_obs"]
+            per_row[f"{t}_exp"] = exp
+            per_row[f"{t}_var"] = var
+        self.suffix = {k: _segment_suffix(per_row[k][order], self.bounds) for k in STATS}
+        self.z_sorted = {t: c[f"{t}_z"][order] for t, _ in OUTCOMES}
+        self.z_sums = {}
+        for t, z in self.z_sorted.items():
+            if np.isfinite(z).all():
+                xs, scale = scaled_ints(z)
+                self.z_sums[t] = (
+                    _segment_suffix(xs, self.bounds), _segment_suffix(xs * xs, self.bounds), scale
+                )
+        # Earliest record at or above each sorted position, to keep record order after a threshold
+        self.first_row = _segment_suffix(order, self.bounds, np.minimum)
+
+    def _position(self, cells, threshold):
+        """First sorted row of each cell with total_n >= threshold."""
+        t = min(max(int(threshold), 0), self.n_span - 1)
+        return np.searchsorted(self.search_key, cells * self.n_span + t)
+
+    def select(self, events=None, stars=None, catches=None, min_samples=None):
+        """CubeSlice for the same predicates as AuditFrame.mask()."""
+        keep = np.ones(self.size, dtype=bool)
+        if events:
+            keep &= np.isin(self.keys["event"], self.frame.codes(events, self.frame.events))
+        if stars:
+            keep &= np.isin(self.keys["star"], list(stars))
+        if catches is not None:
+            keep &= np.isin(self.keys["catch"], list(catches))
+        cells = np.flatnonzero(keep)
+        end = self.bounds[cells + 1]
+        start = self._position(cells, min_samples) if min_samples is not None else self.bounds[cells]
+        live = end > start
+        cells, start, end = cells[live], start[live], end[live]
+        # Cells in order of their first selected record, so group-bys see groups
+        # in the same first-appearance order as a record-level filter
+        appearance = np.argsort(self.first_row[start], kind="stable")
+        return CubeSlice(self, cells[appearance], start[appearance], end[appearance])
+
+
+class CubeSlice:
+    """
+    Selected cells with their min_samples-filtered sums. Exposes the same
+    cols/expected()/z_rows() surface as AuditFrame, one row per cell, and
+    iterates the underlying records for the record-level views.
+    """
+
+    def __init__(self, cube, cells, start, end):
+        self.cube = cube
+        self.cells = cells
+        self.start = start
+        self.end = end
+        self.dates = cube.frame.dates
+        self.events = cube.frame.events
+        self.cols = {k: v[cells] for k, v in cube.keys.items()}
+        for k in STATS:
+            self.cols[k] = cube.suffix[k][start] if len(start) else cube.suffix[k][:0]
+        self.n_records = int((end - start).sum())
+
+    def __len__(self):
+        return len(self.start)
+
+    def record_rows(self):
+        """(frame, sorted frame rows) of the selected records."""
+        return self.cube.frame, np.sort(self.cube.order[_ranges(self.start, self.end - self.start)])
+
+    def __iter__(self):
+        frame, rows = self.record_rows()
+        source = frame.source
+        return (source[i] for i in frame.idx[rows].tolist())
+
+    def records(self):
+        return list(self)
+
+    def expected(self, t):
+        return self.cols[f"{t}_exp"], self.cols[f"{t}_var"]
+
+    def z_variances(self, t, group, size):
+        """Var-ratio inputs per group: (z count, z variance or None)."""
+        sums = self.cube.z_sums.get(t)
+        if sums is None:
+            rows, values = self.z_rows(t)
+            return list_variances(group[rows], values, size)
+        suffix_x, suffix_xx, scale = sums
+        z_start = np.maximum(self.start, self.cube._position(self.cells, Z_MIN_N + 1))
+        counts = group_int_sum(group, np.maximum(self.end - z_start, 0), size)
+        sx, sxx = [0] * size, [0] * size
+        live = z_start < self.end
+        for g, p in zip(group[live].tolist(), z_start[live].tolist()):
+            sx[g] += suffix_x[p]
+            sxx[g] += suffix_xx[p]
+        return counts, [
+            variance_from_sums(n, sx[g], sxx[g], scale) if n > 1 else None
+            for g, n in enumerate(counts)
+        ]
+
+    def z_rows(self, t):
+        """(cell row, z) for every selected record with total_n > 100."""
+        z_start = np.maximum(self.start, self.cube._position(self.cells, Z_MIN_N + 1))
+        lengths = np.maximum(self.end - z_start, 0)
+        idx = _ranges(z_start, lengths)
+        return np.repeat(np.arange(len(self.start)), lengths), self.cube.z_sorted[t][idx]
+
+
+class DateIndex:
+    """
+    Per-date success sums of a frame or slice, in date order, with prefix
+    and suffix sums over the dates. Drift is one pass over the dates, and
+    a before/after split at any date is a bisect plus two lookups. "After"
+    reads the suffix sums rather than total − prefix, so neither side
+    picks up cancellation error from the other.
+
+    Per-date sums add records in row order. Across dates they add in date
+    order, not record order, so period sums may differ from a record-at-a-
+    time loop in the last ulp.
+    """
+
+    FLOAT = ("exp", "var", "diff", "meso")
+    INT = ("n", "act")
+
+    def __init__(self, frame, costs):
+        c = frame.cols
+        valid = c["n"] > 0
+        # Every date with a row, even if none of its rows count toward the sums
+        codes, g = np.unique(c["date"], return_inverse=True)
+        g = g.reshape(-1)[valid]
+        size = len(codes)
+        self.dates = [frame.dates[i] for i in codes.tolist()]
+
+        exp, var = frame.expected("succ")
+        act = c["succ_obs"][valid]
+        exp = exp[valid]
+        err = act - exp
+        per_date = {
+            "exp": np.bincount(g, weights=exp, minlength=size),
+            "var": np.bincount(g, weights=var[valid], minlength=size),
+            "diff": np.bincount(g, weights=err, minlength=size),
+            "meso": np.bincount(g, weights=err * costs[valid], minlength=size),
+        }
+        for k, v in (("n", c["n"][valid]), ("act", act)):
+            out = np.zeros(size, dtype=np.int64)
+            np.add.at(out, g, v)
+            per_date[k] = out
+        self.per_date = per_date
+        # prefix[k][i] = dates[:i], suffix[k][i] = dates[i:]; accumulate adds sequentially
+        self.prefix = {k: np.concatenate([[0], np.cumsum(v)]).astype(v.dtype) for k, v in per_date.items()}
+        self.suffix = {k: np.concatenate([np.cumsum(v[::-1])[::-1], [0]]).astype(v.dtype) for k, v in per_date.items()}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _totals(self, table, i):
+        return {k: table[k][i].item() for k in self.FLOAT + self.INT}
+
+    def split(self, split_date):
+        """(sums over dates < split_date, sums over dates >= split_date)."""
+        i = bisect.bisect_left(self.dates, split_date)
+        return self._totals(self.prefix, i), self._totals(self.suffix, i)
+
+    def period(self, mask):
+        """Sums over the dates where mask (one bool per date) is set, in date order."""
+        mask = np.asarray(mask, dtype=bool)
+        out = {}
+        for k, v in self.per_date.items():
+            picked = v[mask]
+            out[k] = np.cumsum(picked)[-1].item() if len(picked) else v.dtype.type(0).item()
+        return out
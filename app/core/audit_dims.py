@@ -0,0 +1,61 @@
+"""
+Dimension index of one audit snapshot.
+
+Built once when the data is loaded or reloaded, from the frame's
+dictionary-encoded columns. /meta and the unfiltered event calendar then
+read it directly instead of walking the record dicts on every request.
+"""
+
+import numpy as np
+
+# Substrings marking a file's event as "no event" in the calendar
+CALENDAR_NO_EVENT = ("이벤트 미적용", "no_event", "No Event")
+
+
+def _is_event(name):
+    return not any(marker in name for marker in CALENDAR_NO_EVENT)
+
+
+def event_calendar(frame):
+    """Per date (sorted): its real events and whether it was an event period."""
+    c = frame.cols
+    if len(c["date"]) == 0:
+        return []
+    # Every (date, event) pair present, sorted by date code then event code
+    pairs = np.unique(c["date"].astype(np.int64) * len(frame.events) + c["event"])
+    real = [_is_event(e) for e in frame.events]
+
+    results = []
+    date_code = None
+    for key in pairs.tolist():
+        d, e = divmod(key, len(frame.events))
+        if d != date_code:
+            date_code = d
+            entry = {"date": frame.dates[d], "events": [], "is_event_period": False}
+            results.append(entry)
+        if real[e]:
+            entry["events"].append(frame.events[e])
+            entry["is_event_period"] = True
+    for entry in results:
+        if not entry["events"]:
+            entry["events"] = ["이벤트 없음"]
+    return results
+
+
+class AuditDimensions:
+    def __init__(self, frame):
+        c = frame.cols
+        self.events = [frame.events[i] for i in np.unique(c["event"]).tolist()]
+        self.dates = [frame.dates[i] for i in np.unique(c["date"]).tolist()]
+        self.stars = np.unique(c["star"]).tolist()
+        self.catches = np.unique(c["catch"]).tolist()
+        self.total_records = len(frame)
+        self.calendar = event_calendar(frame)
+
+    def meta(self):
+        return {
+            "events": self.events,
+            "stars": self.stars,
+            "dates": self.dates,
+            "total_records": self.total_records
+        }
@@ -1,10 +1,26 @@
 import os
 import json
-import statistics
+import hashlib
 import math
-from scipy import stats as scipy_stats
+import threading
+import time
+from functools import lru_cache
 
-AUDIT_DB = []
+import numpy as np
+
+from . import metrics, audit_cache
+from .audit_frame import AuditFrame, OUTCOMES, group_rows, group_sum, group_int_sum, group_lists, exact_variance
+from .audit_cube import AuditCube, CubeSlice, DateIndex
+from .audit_dims import AuditDimensions, event_calendar
+
+AUDIT_DIR = "audit_data"
+
+# Current AuditSnapshot; replaced wholesale on reload, never mutated
+AUDIT_SNAPSHOT = None
+_LOAD_LOCK = threading.Lock()
+
+AUDIT_RELOADS = metrics.counter("audit_db_reloads_total", "Audit DB loads from audit_data/.")
+AUDIT_RECORDS = metrics.gauge("audit_db_records", "Records in the loaded audit DB.")
 
 # Approximate cost per attempt (in million Mesos) for level 200 items (representative)
 STARFORCE_COST_MAP = {
@@ -12,11 +28,51 @@ STARFORCE_COST_MAP = {
     20: 105.0, 21: 120.0, 22: 150.0, 23: 250.0, 24: 400.0
 }
 
-def load_audit_data(directory="audit_data"):
-    all_records = []
+class AuditSnapshot:
+    """Immutable view of one version of audit_data/: records, frame, cube, dimensions."""
+
+    def __init__(self, version, records, frame):
+        self.version = version
+        self.records = records  # list, or audit_cache.LazyRecords built on first use
+        self.frame = frame
+        self.cube = AuditCube(frame)
+        self.dims = AuditDimensions(frame)
+        # Derived data computed lazily for this version (e.g. deception baseline)
+        self.cache = {}
+
+
+def load_audit_data(directory=AUDIT_DIR):
+    return _load_snapshot(directory).records
+
+def _load_snapshot(directory, previous=None):
+    """
+    AuditSnapshot for the audit files. Through the column cache only new or
+    changed files are parsed, the columns are shared memory-mapped pages, and
+    record dicts are only built on demand (reusing `previous`'s where built).
+    """
+    version = audit_data_fingerprint(directory)
     if not os.path.exists(directory):
-        return []
-        
+        return AuditSnapshot(version, [], AuditFrame.from_records([]))
+    if os.environ.get("STARFORCE_AUDIT_CACHE", "1") != "0":
+        try:
+            columns = audit_cache.load(directory)
+            records = audit_cache.LazyRecords(columns, previous.records if previous else None)
+            return AuditSnapshot(version, records, AuditFrame.from_columns(columns, records))
+        except Exception as e:
+            print(f"Audit cache unavailable, parsing JSON: {e}")
+    records = _load_audit_json(directory)
+    return AuditSnapshot(version, records, AuditFrame.from_records(records))
+
+def publish_audit_cache(directory=AUDIT_DIR):
+    """
+    Bring audit_data/.cache/ up to date. Called by a parent process before
+    it forks workers, so each worker maps the shared columns instead of parsing.
+    """
+    if os.path.exists(directory) and os.environ.get("STARFORCE_AUDIT_CACHE", "1") != "0":
+        audit_cache.load(directory)
+
+def _load_audit_json(directory):
+    all_records = []
     for filename in os.listdir(directory):
         if filename.endswith(".json"):
             try:
@@ -46,78 +102,141 @@ def load_audit_data(directory="audit_data"):
                 continue
     return all_records
 
+@lru_cache(maxsize=1)
+def _scipy_stats():
+    # scipy.stats costs ~0.9s to import; only calculate_stats needs it
+    from scipy import stats
+    return stats
+
+def audit_data_fingerprint(directory=AUDIT_DIR):
+    """Cheap version string for the audit files (names, sizes, mtimes)."""
+    h = hashlib.sha1()
+    if os.path.exists(directory):
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                st = os.stat(os.path.join(directory, filename))
+                h.update(f"{filename}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _install(snapshot):
+    global AUDIT_SNAPSHOT
+    AUDIT_SNAPSHOT = snapshot
+    AUDIT_RELOADS.inc()
+    AUDIT_RECORDS.set(len(snapshot.records))
+
+def get_audit_snapshot():
+    snapshot = AUDIT_SNAPSHOT
+    if snapshot is None:
+        # Concurrent first requests wait for a single load
+        with _LOAD_LOCK:
+            if AUDIT_SNAPSHOT is None:
+                _install(_load_snapshot(AUDIT_DIR))
+            snapshot = AUDIT_SNAPSHOT
+    return snapshot
+
+def refresh_audit_db():
+    """
+    Reload if audit_data/ changed since the current snapshot (new, edited or
+    removed files). Requests keep the old snapshot until the new one is swapped
+    in. Returns True when a new version was installed.
+    """
+    current = get_audit_snapshot()
+    if audit_data_fingerprint(AUDIT_DIR) == current.version:
+        return False
+    with _LOAD_LOCK:
+        current = AUDIT_SNAPSHOT
+        if audit_data_fingerprint(AUDIT_DIR) == current.version:
+            return False
+        _install(_load_snapshot(AUDIT_DIR, previous=current))
+    return True
+
+def start_audit_poller(interval):
+    """Daemon thread calling refresh_audit_db() every `interval` seconds."""
+    def poll():
+        while True:
+            time.sleep(interval)
+            try:
+                if refresh_audit_db():
+                    print(f"Audit data reloaded (version {AUDIT_SNAPSHOT.version})")
+            except Exception as e:
+                print(f"Audit reload failed: {e}")
+
+    thread = threading.Thread(target=poll, name="audit-poller", daemon=True)
+    thread.start()
+    return thread
+
 def get_audit_db():
-    global AUDIT_DB
-    if not AUDIT_DB:
-        AUDIT_DB = load_audit_data()
-    return AUDIT_DB
-
-def filter_audit_data(events=None, stars=None, catch_ops=None, min_samples=100):
-    db = get_audit_db()
-    filtered = []
-    
-    target_events = set(events) if events else None
-    target_stars = set(stars) if stars else None
-    
+    return get_audit_snapshot().records
+
+def get_audit_frame():
+    """Columnar view of get_audit_db()."""
+    return get_audit_snapshot().frame
+
+def get_audit_cube():
+    """Pre-aggregated star x catch x event x date cube of get_audit_db()."""
+    return get_audit_snapshot().cube
+
+def get_audit_dimensions():
+    """Dimension index (events, stars, dates, event calendar) of get_audit_db()."""
+    return get_audit_snapshot().dims
+
+def _as_frame(db):
+    if db is None:
+        return get_audit_cube().select()
+    if isinstance(db, (AuditFrame, CubeSlice)):
+        return db
+    return AuditFrame.from_records(list(db))
+
+def get_audit_version():
+    """Version of the records currently served by get_audit_db()."""
+    return get_audit_snapshot().version
+
+def filter_audit_data(events=None, stars=None, catch_ops=None, min_samples=100, snapshot=None):
+    """
+    Returns (CubeSlice, included, skipped, db_size). The slice iterates
+    like the old list of record dicts, so loop-based callers still work.
+    `snapshot` pins the data version (default: the current one).
+    """
+    cube = (snapshot or get_audit_snapshot()).cube
+
     target_catch = None
     if catch_ops:
         target_catch = set()
         if "ON" in catch_ops: target_catch.add(True)
         if "OFF" in catch_ops: target_catch.add(False)
 
-    total_skipped = 0
-    total_included = 0
-
-    for r in db:
-        if target_events and r["_event"] not in target_events: 
-            total_skipped += 1
-            continue
-        if target_stars and r["star"] not in target_stars:
-            total_skipped += 1
-            continue
-        if target_catch is not None and r["_is_catch"] not in target_catch: 
-            total_skipped += 1
-            continue
-        if r["total_n"] < min_samples: 
-            total_skipped += 1
-            continue
-        
-        filtered.append(r)
-        total_included += 1
-        
-    return filtered, total_included, total_skipped, len(db)
+    filtered = cube.select(events=events, stars=stars, catches=target_catch, min_samples=min_samples)
+    total = len(cube.frame)
+    return filtered, filtered.n_records, total - filtered.n_records, total
 
 def calculate_stats(filtered_data):
+    frame = _as_frame(filtered_data)
+    c = frame.cols
+    group, first = group_rows(c["star"], c["catch"])
+    size = len(first)
+
+    totals = group_int_sum(group, c["n"], size)
+    sums = {}
+    for t, _ in OUTCOMES:
+        exp, var_exp = frame.expected(t)
+        var_n, z_var = frame.z_variances(t, group, size)
+        sums[t] = {
+            "obs": group_int_sum(group, c[f"{t}_obs"], size),
+            "exp": group_sum(group, exp, size).tolist(),
+            "var_exp": group_sum(group, var_exp, size).tolist(),
+            "var_n": var_n,
+            "z_var": z_var
+        }
+
     stats_map = {}
-    
-    for r in filtered_data:
-        key = (r["star"], r["_is_catch"])
-        if key not in stats_map:
-            stats_map[key] = {
-                "star": r["star"],
-                "catch": "ON" if r["_is_catch"] else "OFF",
-                "total_n": 0,
-                "succ": {"obs": 0, "exp": 0.0, "var_exp": 0.0, "z_list": []},
-                "fail": {"obs": 0, "exp": 0.0, "var_exp": 0.0, "z_list": []},
-                "boom": {"obs": 0, "exp": 0.0, "var_exp": 0.0, "z_list": []},
-            }
-        
-        entry = stats_map[key]
-        n = r["total_n"]
-        entry["total_n"] += n
-        
-        for t, prefix in [("succ", "success"), ("fail", "fail"), ("boom", "boom")]:
-            target_p = r.get(f"{prefix}_p_target", 0.0)
-            obs = r.get(f"{prefix}_n", 0)
-            
-            entry[t]["obs"] += obs
-            entry[t]["exp"] += n * target_p
-            # Theoretical variance N*p*(1-p)
-            entry[t]["var_exp"] += n * target_p * (1.0 - target_p)
-            
-            if n > 100: 
-                z = r.get(f"{prefix}_z_score", 0.0)
-                entry[t]["z_list"].append(z)
+    for g, row in enumerate(first.tolist()):
+        is_catch = bool(c["catch"][row])
+        stats_map[g] = {
+            "star": int(c["star"][row]),
+            "catch": "ON" if is_catch else "OFF",
+            "total_n": totals[g],
+            **{t: {k: v[g] for k, v in sums[t].items()} for t, _ in OUTCOMES}
+        }
 
     results = []
     for key, d in stats_map.items():
@@ -140,15 +259,14 @@ def calculate_stats(filtered_data):
                 z_score = 0.0
             
             # VAR Ratio: Observed Z Variance / Expected (1.0)
-            z_list = d[t]["z_list"]
-            var_n = len(z_list)
+            var_n = d[t]["var_n"]
             if var_n > 1:
-                z_observed_var = statistics.variance(z_list)
+                z_observed_var = d[t]["z_var"]
                 var_ratio = float(z_observed_var)  # Expected Var(Z) ~= 1.0 under iid binomial model
                 df = var_n - 1
                 chi_stat = df * var_ratio
-                var_p_under = float(scipy_stats.chi2.cdf(chi_stat, df))
-                var_p_over = float(scipy_stats.chi2.sf(chi_stat, df))
+                var_p_under = float(_scipy_stats().chi2.cdf(chi_stat, df))
+                var_p_over = float(_scipy_stats().chi2.sf(chi_stat, df))
                 var_p_two = float(min(1.0, 2.0 * min(var_p_under, var_p_over)))
             else:
                 var_ratio = 1.0
@@ -157,7 +275,7 @@ def calculate_stats(filtered_data):
                 var_p_two = 1.0
                 
             # p-value for rare event detection
-            p_val = float(scipy_stats.norm.sf(abs(z_score)) * 2)
+            p_val = float(_scipy_stats().norm.sf(abs(z_score)) * 2)
 
             # Effect size (weighted by total_n across merged records)
             p_target = float(exp / safe_total_n)
@@ -187,42 +305,37 @@ def calculate_stats(filtered_data):
 
 def get_heatmap_stats(filtered_db=None):
     """Returns combined Z-score per (star, date)."""
-    db = filtered_db if filtered_db is not None else get_audit_db()
+    frame = _as_frame(filtered_db)
+    c = frame.cols
+    group, first = group_rows(c["star"], c["date"])
+    size = len(first)
+    # Every (star, date) gets a cell; only n > 0 rows contribute to it
+    valid = c["n"] > 0
+    g = group[valid]
+
+    totals = group_int_sum(g, c["n"][valid], size)
+    sums = {}
+    for t in ("succ", "boom"):
+        exp, var = frame.expected(t)
+        sums[t] = (
+            group_int_sum(g, c[f"{t}_obs"][valid], size),
+            group_sum(g, exp[valid], size).tolist(),
+            group_sum(g, var[valid], size).tolist()
+        )
+
     heatmap_data = {}
-    
-    for r in db:
-        key = (r["star"], r["_date"])
-        if key not in heatmap_data:
-            heatmap_data[key] = {
-                "star": r["star"],
-                "date": r["_date"],
-                "total_n": 0,
-                "succ_obs": 0,
-                "succ_exp": 0.0,
-                "succ_var": 0.0,
-                "boom_obs": 0,
-                "boom_exp": 0.0,
-                "boom_var": 0.0
-            }
-        
-        entry = heatmap_data[key]
-        n = int(r.get("total_n", 0))
-        if n <= 0:
-            continue
-
-        # Success
-        p_s = float(r.get("success_p_target", 0.0))
-        entry["succ_obs"] += int(r.get("success_n", 0))
-        entry["succ_exp"] += n * p_s
-        entry["succ_var"] += n * p_s * (1.0 - p_s)
-
-        # Boom
-        p_b = float(r.get("boom_p_target", 0.0))
-        entry["boom_obs"] += int(r.get("boom_n", 0))
-        entry["boom_exp"] += n * p_b
-        entry["boom_var"] += n * p_b * (1.0 - p_b)
-
-        entry["total_n"] += n
+    for i, row in enumerate(first.tolist()):
+        heatmap_data[i] = {
+            "star": int(c["star"][row]),
+            "date": frame.dates[c["date"][row]],
+            "total_n": totals[i],
+            "succ_obs": sums["succ"][0][i],
+            "succ_exp": sums["succ"][1][i],
+            "succ_var": sums["succ"][2][i],
+            "boom_obs": sums["boom"][0][i],
+            "boom_exp": sums["boom"][1][i],
+            "boom_var": sums["boom"][2][i]
+        }
     
     results = []
     for entry in heatmap_data.values():
@@ -239,90 +352,77 @@ def get_heatmap_stats(filtered_db=None):
             
     return results
 
-def get_drift_stats(filtered_db=None):
-    db = filtered_db if filtered_db is not None else get_audit_db()
-    date_stats = {}
-    
-    for r in db:
-        date = r["_date"]
-        if date not in date_stats:
-            date_stats[date] = {
-                "succ_diff": 0.0,
-                "succ_var": 0.0,
-                "succ_error": 0.0,
-                "meso_loss": 0.0
-            }
+def _star_costs(stars):
+    """STARFORCE_COST_MAP per row (default 10M if unknown)."""
+    unique, inverse = np.unique(stars, return_inverse=True)
+    table = np.array([STARFORCE_COST_MAP.get(s, 10.0) for s in unique.tolist()], dtype=np.float64)
+    return table[inverse.reshape(-1)]
+
+def _date_index(filtered_db=None):
+    """DateIndex of the filtered data; the unfiltered one is built once per data version."""
+    if filtered_db is not None:
+        frame = _as_frame(filtered_db)
+        return DateIndex(frame, _star_costs(frame.cols["star"]))
+    snapshot = get_audit_snapshot()
+    index = snapshot.cache.get("date_index")
+    if index is None:
+        frame = snapshot.cube.select()
+        index = snapshot.cache["date_index"] = DateIndex(frame, _star_costs(frame.cols["star"]))
+    return index
 
-        n = int(r.get("total_n", 0))
-        if n <= 0:
-            continue
-
-        act = int(r.get("success_n", 0))
-        p = float(r.get("success_p_target", 0.0))
-        exp = n * p
-        var = n * p * (1.0 - p)
-        err = act - exp
-
-        date_stats[date]["succ_diff"] += err
-        date_stats[date]["succ_var"] += var
-        date_stats[date]["succ_error"] += err
+def get_drift_stats(filtered_db=None):
+    index = _date_index(filtered_db)
+    per_date = index.per_date
+    succ_diff = per_date["diff"].tolist()
+    succ_var = per_date["var"].tolist()
+    # Running totals are the prefix sums (sequential adds in date order)
+    cumulative_error = index.prefix["diff"][1:].tolist()
+    cumulative_meso = index.prefix["meso"][1:].tolist()
 
-        star = r.get("star", 0)
-        cost_per = STARFORCE_COST_MAP.get(star, 10.0) # Default 10M if unknown
-        date_stats[date]["meso_loss"] += err * cost_per
-    
     results = []
     cumulative_z = 0.0
-    cumulative_error = 0.0
-    cumulative_meso = 0.0
-    
-    for date in sorted(date_stats.keys()):
-        stats = date_stats[date]
-        day_z = (stats["succ_diff"] / (stats["succ_var"] ** 0.5)) if stats["succ_var"] > 0 else 0.0
+    for i, date in enumerate(index.dates):
+        day_z = (succ_diff[i] / (succ_var[i] ** 0.5)) if succ_var[i] > 0 else 0.0
         cumulative_z += day_z
-        cumulative_error += stats["succ_error"]
-        cumulative_meso += stats["meso_loss"]
-        
+
         results.append({
             "date": date,
             "avg_succ_z": round(float(day_z), 2),
             "cumulative_succ_z": round(cumulative_z, 2),
-            "cumulative_error": round(cumulative_error, 1),
-            "cumulative_meso": round(cumulative_meso, 1)
+            "cumulative_error": round(cumulative_error[i], 1),
+            "cumulative_meso": round(cumulative_meso[i], 1)
         })
     return results
 
 def get_monthly_stats(filtered_db=None):
-    db = filtered_db if filtered_db is not None else get_audit_db()
-    monthly_stats = {}
-    
-    for r in db:
-        date_str = r["_date"]
-        if len(date_str) >= 6:
-            yyyymm = date_str[:6]
-            formatted_month = f"{yyyymm[:4]}-{yyyymm[4:]}"
-        else:
-            continue
-            
-        if formatted_month not in monthly_stats:
-            monthly_stats[formatted_month] = {
-                "succ_obs": 0, "succ_exp": 0.0, "succ_var": 0.0,
-                "boom_obs": 0, "boom_exp": 0.0, "boom_var": 0.0,
-            }
-
-        n = int(r.get("total_n", 0))
-        if n <= 0:
-            continue
+    frame = _as_frame(filtered_db)
+    c = frame.cols
+
+    months = sorted({d[:6] for d in frame.dates if len(d) >= 6})
+    month_code = {m: i for i, m in enumerate(months)}
+    # Dates too short to carry a month are skipped entirely
+    date_month = np.array([month_code.get(d[:6], -1) if len(d) >= 6 else -1 for d in frame.dates] or [-1])
+    row_month = date_month[c["date"]] if len(frame) else np.empty(0, dtype=np.int64)
+    size = len(months)
+    valid = (c["n"] > 0) & (row_month >= 0)
+    g = row_month[valid]
+
+    sums = {}
+    for t in ("succ", "boom"):
+        exp, var = frame.expected(t)
+        sums[t] = (
+            group_int_sum(g, c[f"{t}_obs"][valid], size),
+            group_sum(g, exp[valid], size).tolist(),
+            group_sum(g, var[valid], size).tolist()
+        )
 
-        p_s = float(r.get("success_p_target", 0.0))
-        monthly_stats[formatted_month]["succ_obs"] += int(r.get("success_n", 0))
-        monthly_stats[formatted_month]["succ_exp"] += n * p_s
-        monthly_stats[formatted_month]["succ_var"] += n * p_s * (1.0 - p_s)
-
-        p_b = float(r.get("boom_p_target", 0.0))
-        monthly_stats[formatted_month]["boom_obs"] += int(r.get("boom_n", 0))
-        monthly_stats[formatted_month]["boom_exp"] += n * p_b
-        monthly_stats[formatted_month]["boom_var"] += n * p_b * (1.0 - p_b)
+    monthly_stats = {}
+    for code in np.unique(row_month[row_month >= 0]).tolist():
+        yyyymm = months[code]
+        monthly_stats[f"{yyyymm[:4]}-{yyyymm[4:]}"] = {
+            "succ_obs": sums["succ"][0][code], "succ_exp": sums["succ"][1][code], "succ_var": sums["succ"][2][code],
+            "boom_obs": sums["boom"][0][code], "boom_exp": sums["boom"][1][code], "boom_var": sums["boom"][2][code],
+        }
     
     results = []
     for month in sorted(monthly_stats.keys()):
@@ -337,106 +437,120 @@ def get_monthly_stats(filtered_db=None):
     return results
 
 def get_event_comparison_stats():
-    db = get_audit_db()
-    
-    event_stats = {"succ_z_sum": 0.0, "boom_z_sum": 0.0, "total_n": 0, "count": 0}
-    no_event_stats = {"succ_z_sum": 0.0, "boom_z_sum": 0.0, "total_n": 0, "count": 0}
-    
-    for r in db:
-        is_event = "이벤트 미적용" not in r["_event"] and "no_event" not in r["_event"] and "No Event" not in r["_event"]
-        target = event_stats if is_event else no_event_stats
-        
-        target["succ_z_sum"] += r.get("success_z_score", 0.0)
-        target["boom_z_sum"] += r.get("boom_z_score", 0.0)
-        target["total_n"] += r.get("total_n", 0)
-        target["count"] += 1
-    
-    return {
-        "event": {
-            "avg_succ_z": round(event_stats["succ_z_sum"] / event_stats["count"], 3) if event_stats["count"] else 0,
-            "avg_boom_z": round(event_stats["boom_z_sum"] / event_stats["count"], 3) if event_stats["count"] else 0,
-            "total_n": event_stats["total_n"],
-            "record_count": event_stats["count"]
-        },
-        "no_event": {
-            "avg_succ_z": round(no_event_stats["succ_z_sum"] / no_event_stats["count"], 3) if no_event_stats["count"] else 0,
-            "avg_boom_z": round(no_event_stats["boom_z_sum"] / no_event_stats["count"], 3) if no_event_stats["count"] else 0,
-            "total_n": no_event_stats["total_n"],
-            "record_count": no_event_stats["count"]
+    frame = get_audit_frame()
+    c = frame.cols
+
+    # Row group: 0 = event, 1 = no event
+    no_event = np.array(
+        ["이벤트 미적용" in e or "no_event" in e or "No Event" in e for e in frame.events] or [False]
+    )
+    g = no_event[c["event"]].astype(np.int64) if len(frame) else np.empty(0, dtype=np.int64)
+    succ_z_sum = group_sum(g, c["succ_z"], 2).tolist()
+    boom_z_sum = group_sum(g, c["boom_z"], 2).tolist()
+    total_n = group_int_sum(g, c["n"], 2)
+    count = np.bincount(g, minlength=2).tolist()
+
+    def summarize(i):
+        return {
+            "avg_succ_z": round(succ_z_sum[i] / count[i], 3) if count[i] else 0,
+            "avg_boom_z": round(boom_z_sum[i] / count[i], 3) if count[i] else 0,
+            "total_n": total_n[i],
+            "record_count": count[i]
         }
-    }
 
-def get_event_deception_index(filtered_db=None):
-    db = filtered_db if filtered_db is not None else get_audit_db()
-    full_db = get_audit_db()
-    
-    MIN_SAMPLES_FOR_VALID_METRIC = 1000  # Minimum total_n across records to consider valid
-    MIN_RECORDS_FOR_GROUP = 3  # Minimum number of records to form a valid group
-    
-    # Baseline: No-Event data
-    no_evt_map = {}
-    no_evt_keys = list(set([r["_event"] for r in full_db if any(x in r["_event"] for x in ["미적용", "no_event", "No Event"])]))
-    
-    for r in full_db:
-        if r["_event"] not in no_evt_keys: continue
-        star = r["star"]
-        if star < 12: continue
-        if r.get("total_n", 0) < 100: continue  # Skip low-N records
-        if star not in no_evt_map: no_evt_map[star] = {"actual":[], "target":[], "z_list":[], "n_sum": 0}
-        no_evt_map[star]["actual"].append(r.get("success_p_actual", 0))
-        no_evt_map[star]["target"].append(r.get("success_p_target", 0))
-        no_evt_map[star]["z_list"].append(r.get("success_z_score", 0))
-        no_evt_map[star]["n_sum"] += r.get("total_n", 0)
-
-    def calc_metrics(data_map):
-        all_actuals = []
-        all_targets = []
-        all_z_vars = []
-        total_n = 0
-        record_count = 0
-        
-        for star, vals in data_map.items():
-            all_actuals.extend(vals["actual"])
-            all_targets.extend(vals["target"])
-            total_n += vals.get("n_sum", 0)
-            record_count += len(vals["actual"])
-            if len(vals["z_list"]) > 1:
-                all_z_vars.append(statistics.variance(vals["z_list"]))
-        
-        # Safeguard: Not enough data
-        if total_n < MIN_SAMPLES_FOR_VALID_METRIC or record_count < MIN_RECORDS_FOR_GROUP:
-            return None, None, total_n, record_count
-        
-        avg_dev = 0.0
-        if all_targets:
-            devs = [(a - t) / t for a, t in zip(all_actuals, all_targets) if t > 0]
-            avg_dev = sum(devs) / len(devs) if devs else 0.0
-            
-        avg_var = sum(all_z_vars) / len(all_z_vars) if all_z_vars else 1.0
-        return avg_dev, avg_var, total_n, record_count
+    return {"event": summarize(0), "no_event": summarize(1)}
+
+MIN_SAMPLES_FOR_VALID_METRIC = 1000  # Minimum total_n across records to consider valid
+MIN_RECORDS_FOR_GROUP = 3  # Minimum number of records to form a valid group
+NO_EVENT_MARKERS = ("미적용", "no_event", "No Event")
+
+def _deception_groups(frame, rows, by_event):
+    """
+    Success deviation entries for records with star >= 12 and total_n >= 100,
+    grouped by (event code, star) or by star in first-appearance order.
+    Each entry has devs ((actual - target) / target, target > 0), z_list,
+    n_sum and count.
+    """
+    c = frame.cols
+    no_event = np.array([any(x in e for x in NO_EVENT_MARKERS) for e in frame.events] or [False])
+    rows = rows[(c["star"][rows] >= 12) & (c["n"][rows] >= 100)]
+    is_base = no_event[c["event"][rows]] if len(rows) else np.zeros(0, dtype=bool)
+    rows = rows[~is_base] if by_event else rows[is_base]
+
+    star, event = c["star"][rows], c["event"][rows]
+    target = c["succ_p"][rows]
+    keys = (event, star) if by_event else (star,)
+    group, first = group_rows(*keys)
+    size = len(first)
+    has_dev = target > 0
+    dev_target = target[has_dev]
+    devs = group_lists(group[has_dev], (c["succ_actual"][rows][has_dev] - dev_target) / dev_target, size)
+    z_lists = group_lists(group, c["succ_z"][rows], size)
+    n_sums = group_int_sum(group, c["n"][rows], size)
+    counts = np.bincount(group, minlength=size).tolist()
+
+    out = {}
+    for g, row in enumerate(first.tolist()):
+        entry = {"devs": devs[g], "z_list": z_lists[g], "n_sum": n_sums[g], "count": counts[g]}
+        if by_event:
+            out.setdefault(frame.events[event[row]], {})[int(star[row])] = entry
+        else:
+            out[int(star[row])] = entry
+    return out
+
+def _z_var(entry):
+    if "z_var" not in entry:
+        entry["z_var"] = exact_variance(entry["z_list"]) if len(entry["z_list"]) > 1 else None
+    return entry["z_var"]
 
-    base_dev, base_var, base_n, base_count = calc_metrics(no_evt_map)
+def _calc_deception_metrics(data_map):
+    """(avg deviation, avg z variance, total_n, record count); (None, None, ...) if too small."""
+    total_n = sum(vals["n_sum"] for vals in data_map.values())
+    record_count = sum(vals["count"] for vals in data_map.values())
+
+    # Safeguard: Not enough data
+    if total_n < MIN_SAMPLES_FOR_VALID_METRIC or record_count < MIN_RECORDS_FOR_GROUP:
+        return None, None, total_n, record_count
+
+    # Sequential sum in star order, record order
+    devs = [d for vals in data_map.values() for d in vals["devs"]]
+    avg_dev = sum(devs) / len(devs) if devs else 0.0
+
+    all_z_vars = [v for v in map(_z_var, data_map.values()) if v is not None]
+    avg_var = sum(all_z_vars) / len(all_z_vars) if all_z_vars else 1.0
+    return avg_dev, avg_var, total_n, record_count
+
+def _merge_deception(entries):
+    return {
+        "devs": [d for e in entries for d in e["devs"]],
+        "z_list": [z for e in entries for z in e["z_list"]],
+        "n_sum": sum(e["n_sum"] for e in entries),
+        "count": sum(e["count"] for e in entries)
+    }
+
+def _no_event_baseline(snapshot=None):
+    """Per-star no-event entries (z variances filled in), once per data version."""
+    snapshot = snapshot or get_audit_snapshot()
+    baseline = snapshot.cache.get("no_event_baseline")
+    if baseline is None:
+        frame = snapshot.frame
+        baseline = _deception_groups(frame, np.arange(len(frame)), by_event=False)
+        for entry in baseline.values():
+            _z_var(entry)
+        snapshot.cache["no_event_baseline"] = baseline
+    return baseline
+
+def get_event_deception_index(filtered_db=None, snapshot=None):
+    # Baseline: No-Event data over the full DB
+    no_evt_map = _no_event_baseline(snapshot)
+
+    base_dev, base_var, base_n, base_count = _calc_deception_metrics(no_evt_map)
     if base_dev is None:
         base_dev, base_var = 0.0, 1.0  # Fallback for baseline
 
     # Filtered Data analysis
-    target_grouped = {}
-    for r in db:
-        evt = r["_event"]
-        star = r["star"]
-        if star < 12: continue
-        if evt in no_evt_keys: continue
-        if r.get("total_n", 0) < 100: continue  # Skip low-N records
-        
-        if evt not in target_grouped: target_grouped[evt] = {}
-        if star not in target_grouped[evt]:
-            target_grouped[evt][star] = {"actual": [], "target": [], "z_list": [], "n_sum": 0}
-            
-        entry = target_grouped[evt][star]
-        entry["actual"].append(r.get("success_p_actual", 0))
-        entry["target"].append(r.get("success_p_target", 0))
-        entry["z_list"].append(r.get("success_z_score", 0))
-        entry["n_sum"] += r.get("total_n", 0)
+    frame, rows = _as_frame(filtered_db).record_rows()
+    target_grouped = _deception_groups(frame, rows, by_event=True)
 
     # Star Groups
     groups = {
@@ -447,20 +561,17 @@ def get_event_deception_index(filtered_db=None):
     
     star_group_results = {}
     for g_name, star_list in groups.items():
-        g_evt_map = {}
+        g_parts = {}
         for evt, stars in target_grouped.items():
             for s in star_list:
                 if s in stars:
-                    if s not in g_evt_map: g_evt_map[s] = {"actual":[], "target":[], "z_list":[], "n_sum": 0}
-                    g_evt_map[s]["actual"].extend(stars[s]["actual"])
-                    g_evt_map[s]["target"].extend(stars[s]["target"])
-                    g_evt_map[s]["z_list"].extend(stars[s]["z_list"])
-                    g_evt_map[s]["n_sum"] += stars[s]["n_sum"]
+                    g_parts.setdefault(s, []).append(stars[s])
+        g_evt_map = {s: _merge_deception(parts) for s, parts in g_parts.items()}
         
         g_base_map = {s: no_evt_map[s] for s in star_list if s in no_evt_map}
         
-        evt_dev, evt_var, evt_n, evt_cnt = calc_metrics(g_evt_map)
-        b_dev, b_var, _, _ = calc_metrics(g_base_map)
+        evt_dev, evt_var, evt_n, evt_cnt = _calc_deception_metrics(g_evt_map)
+        b_dev, b_var, _, _ = _calc_deception_metrics(g_base_map)
         
         if evt_dev is None or b_dev is None:
             star_group_results[g_name] = {"deception": 0.0, "var_suppression": 1.0, "insufficient_data": True}
@@ -474,14 +585,14 @@ def get_event_deception_index(filtered_db=None):
     # Individual Events
     event_results = []
     for evt, stars in target_grouped.items():
-        e_dev, e_var, e_n, e_cnt = calc_metrics(stars)
+        e_dev, e_var, e_n, e_cnt = _calc_deception_metrics(stars)
         if e_dev is None:
             continue  # Skip events with insufficient data
 
         # Calculate a localized baseline for the same set of stars
         e_stars_list = list(stars.keys())
         e_base_map = {s: no_evt_map[s] for s in e_stars_list if s in no_evt_map}
-        b_dev_local, b_var_local, _, _ = calc_metrics(e_base_map)
+        b_dev_local, b_var_local, _, _ = _calc_deception_metrics(e_base_map)
         
         # Fallback to global baseline values if local one is insufficient
         final_b_dev = b_dev_local if b_dev_local is not None else base_dev
@@ -494,16 +605,13 @@ def get_event_deception_index(filtered_db=None):
         })
 
     # Global Deception
-    global_evt_map = {}
+    global_parts = {}
     for evt, stars in target_grouped.items():
         for s, vals in stars.items():
-            if s not in global_evt_map: global_evt_map[s] = {"actual":[], "target":[], "z_list":[], "n_sum": 0}
-            global_evt_map[s]["actual"].extend(vals["actual"])
-            global_evt_map[s]["target"].extend(vals["target"])
-            global_evt_map[s]["z_list"].extend(vals["z_list"])
-            global_evt_map[s]["n_sum"] += vals["n_sum"]
+            global_parts.setdefault(s, []).append(vals)
+    global_evt_map = {s: _merge_deception(parts) for s, parts in global_parts.items()}
             
-    global_evt_dev, global_evt_var, global_n, global_cnt = calc_metrics(global_evt_map)
+    global_evt_dev, global_evt_var, global_n, global_cnt = _calc_deception_metrics(global_evt_map)
     
     if global_evt_dev is None:
         return {
@@ -529,102 +637,82 @@ def get_event_deception_index(filtered_db=None):
     }
 
 
-def get_event_dates(filtered_db=None):
-    db = filtered_db if filtered_db is not None else get_audit_db()
-    date_events = {}
-    
-    for r in db:
-        date = r["_date"]
-        event = r["_event"]
-        
-        if date not in date_events:
-            date_events[date] = set()
-        date_events[date].add(event)
-    
-    results = []
-    for date in sorted(date_events.keys()):
-        events = list(date_events[date])
-        is_event = False
-        real_events = []
-        for e in events:
-            if "이벤트 미적용" not in e and "no_event" not in e and "No Event" not in e:
-                is_event = True
-                real_events.append(e)
-        
-        results.append({
-            "date": date,
-            "events": real_events if real_events else ["이벤트 없음"],
-            "is_event_period": is_event
-        })
-    
-    return results
+def get_event_dates(filtered_db=None, snapshot=None):
+    if filtered_db is None:
+        return (snapshot or get_audit_snapshot()).dims.calendar
+    return event_calendar(_as_frame(filtered_db))
+
+def _summarize_period(tag, d):
+    if d["n"] <= 0:
+        return {"period": tag, "avg_z": 0, "total_n": 0, "error_count": 0, "deception_index": 0}
+    avg_z = (d["diff"] / (d["var"] ** 0.5)) if d["var"] > 0 else 0.0
+    err = d["act"] - d["exp"]
+    return {
+        "period": tag,
+        "avg_z": round(float(avg_z), 3),
+        "total_n": d["n"],
+        "error_count": round(err, 1),
+        "deception_index": round(-err / d["exp"] * 100, 3) if d["exp"] > 0 else 0
+    }
+
+def _split_z(before, after):
+    """
+    z of the change in success-rate deviation (actual − expected per try)
+    from before to after; None when either side has no variance.
+    """
+    if before["n"] <= 0 or after["n"] <= 0 or before["var"] <= 0 or after["var"] <= 0:
+        return None
+    rate_before = before["diff"] / before["n"]
+    rate_after = after["diff"] / after["n"]
+    se = (before["var"] / before["n"] ** 2 + after["var"] / after["n"] ** 2) ** 0.5
+    return (rate_after - rate_before) / se
 
 def get_season_contrast_stats(split_date=None, filtered_db=None):
-    db = filtered_db if filtered_db is not None else get_audit_db()
-    
-    before_data = {"succ_diff": 0.0, "succ_var": 0.0, "total_n": 0, "actual_succ": 0, "exp_succ": 0.0}
-    after_data = {"succ_diff": 0.0, "succ_var": 0.0, "total_n": 0, "actual_succ": 0, "exp_succ": 0.0}
-    
-    # Estimate cost factor from starforce map (approx average)
-    avg_cost = 10.0 # Default fallback
-    if STARFORCE_COST_MAP:
-        avg_cost = sum(STARFORCE_COST_MAP.values()) / len(STARFORCE_COST_MAP)
+    index = _date_index(filtered_db)
 
-    for r in db:
-        date_str = r["_date"]
-        
-        target = None
-        if split_date:
-            if date_str < split_date:
-                target = before_data
-            else:
-                target = after_data
-        else:
-            # Fallback to original logic if no split_date (though UI should always provide one now)
-            # Keeping legacy logic as default for safety
-            month = int(date_str[4:6])
-            if 5 <= month <= 9:
-                target = before_data
-            elif month >= 10 or month <= 1:
-                target = after_data
-        
-        if target:
-            n = int(r.get("total_n", 0))
-            if n <= 0:
-                continue
-            act = int(r.get("success_n", 0))
-            p = float(r.get("success_p_target", 0.0))
-            exp = n * p
-            var = n * p * (1.0 - p)
-
-            target["succ_diff"] += act - exp
-            target["succ_var"] += var
-            target["total_n"] += n
-            target["actual_succ"] += act
-            target["exp_succ"] += exp
-        
-    def summarize(tag, d):
-        if d["total_n"] <= 0:
-            return {"period": tag, "avg_z": 0, "total_n": 0, "error_count": 0, "deception_index": 0}
-        avg_z = (d["succ_diff"] / (d["succ_var"] ** 0.5)) if d["succ_var"] > 0 else 0.0
-        err = d["actual_succ"] - d["exp_succ"]
-        return {
-            "period": tag,
-            "avg_z": round(float(avg_z), 3),
-            "total_n": d["total_n"],
-            "error_count": round(err, 1),
-            "deception_index": round(-err / d["exp_succ"] * 100, 3) if d["exp_succ"] > 0 else 0
-        }
-        
     if split_date:
+        before_data, after_data = index.split(split_date)
         tag_before = f"{split_date} 이전 (Period A)"
         tag_after = f"{split_date} 이후 (Period B)"
     else:
+        # Fallback to original logic if no split_date (though UI should always provide one now)
+        # Keeping legacy logic as default for safety
+        months = [int(d[4:6]) for d in index.dates]
+        before_data = index.period([5 <= m <= 9 for m in months])
+        after_data = index.period([m >= 10 or m <= 1 for m in months])
         tag_before = "5월~9월 (성수기)"
         tag_after = "10월~1월 (비성수기)"
 
     return {
-        "before": summarize(tag_before, before_data),
-        "after": summarize(tag_after, after_data),
+        "before": _summarize_period(tag_before, before_data),
+        "after": _summarize_period(tag_after, after_data),
         "cost_factor": 0.4 # Keeping the 0.4 multiplier for Meso calculation as per original logic, or make it dynamic if needed
     }
+
+def get_season_split_scan(split_dates=None, filtered_db=None):
+    """
+    Season contrast at many candidate split dates in one pass over the
+    DateIndex (every date but the first when none are given). "best" is
+    the split with the largest |split_z|, the most likely patch date.
+    """
+    index = _date_index(filtered_db)
+    candidates = sorted(set(split_dates)) if split_dates else index.dates[1:]
+
+    splits = []
+    for split_date in candidates:
+        before, after = index.split(split_date)
+        z = _split_z(before, after)
+        splits.append({
+            "split_date": split_date,
+            "before": _summarize_period(f"{split_date} 이전 (Period A)", before),
+            "after": _summarize_period(f"{split_date} 이후 (Period B)", after),
+            "split_z": round(z, 3) if z is not None else None
+        })
+
+    scored = [s for s in splits if s["split_z"] is not None]
+    best = max(scored, key=lambda s: abs(s["split_z"])) if scored else None
+    return {
+        "splits": splits,
+        "best": best["split_date"] if best else None,
+        "best_z": best["split_z"] if best else None
+    }
@@ -0,0 +1,207 @@
+"""
+Columnar view of the audit records.
+
+One NumPy array per field (star, n, S/F/B counts, targets, z-scores) plus
+integer codes for the per-file strings (date, event). Filters are boolean
+masks, and group-bys are np.bincount over group codes.
+
+Weighted np.bincount adds in input order, like the dict loops it replaces.
+The per-record terms are computed with the same expression order. Sums are
+therefore bit-identical to the record-at-a-time code, so rounded API
+outputs don't move.
+"""
+
+import statistics
+
+import numpy as np
+
+OUTCOMES = (("succ", "success"), ("fail", "fail"), ("boom", "boom"))
+
+
+class AuditFrame:
+    def __init__(self, source, idx, cols, dates, events):
+        self.source = source    # record dicts the rows come from
+        self.idx = idx          # row -> index into source
+        self.cols = cols        # name -> np.ndarray, one entry per row
+        self.dates = dates      # sorted date strings; cols["date"] holds codes
+        self.events = events    # sorted event names; cols["event"] holds codes
+
+    @classmethod
+    def from_records(cls, records):
+        dates = sorted({r["_date"] for r in records})
+        events = sorted({r["_event"] for r in records})
+        date_code = {d: i for i, d in enumerate(dates)}
+        event_code = {e: i for i, e in enumerate(events)}
+        cols = {
+            "star": np.array([r["star"] for r in records], dtype=np.int64),
+            "n": np.array([r.get("total_n", 0) for r in records], dtype=np.int64),
+            "catch": np.array([bool(r["_is_catch"]) for r in records], dtype=bool),
+            "date": np.array([date_code[r["_date"]] for r in records], dtype=np.int32),
+            "event": np.array([event_code[r["_event"]] for r in records], dtype=np.int32),
+        }
+        for t, prefix in OUTCOMES:
+            cols[f"{t}_obs"] = np.array([r.get(f"{prefix}_n", 0) for r in records], dtype=np.int64)
+            cols[f"{t}_p"] = np.array([r.get(f"{prefix}_p_target", 0.0) for r in records], dtype=np.float64)
+            cols[f"{t}_z"] = np.array([r.get(f"{prefix}_z_score", 0.0) for r in records], dtype=np.float64)
+        cols["succ_actual"] = np.array([r.get("success_p_actual", 0) for r in records], dtype=np.float64)
+        return cls(records, np.arange(len(records)), cols, dates, events)
+
+    @classmethod
+    def from_columns(cls, audit_columns, records):
+        """
+        From audit_cache.AuditColumns, whose records are `records`. File
+        segments are contiguous, so the record columns are read-only views
+        of the (memory-mapped) cache arrays rather than copies.
+        """
+        files = [e for e in audit_columns.files if not e.get("error")]
+        dates = sorted({e["date"] for e in files})
+        events = sorted({e["event"] for e in files})
+        rows = np.array([e["rows"] for e in files], dtype=np.int64)
+        src = audit_columns.columns
+        total = int(rows.sum())
+        col = lambda name: np.asarray(src[name])[:total]
+        cols = {
+            "star": col("star"),
+            "n": col("total_n"),
+            "catch": np.repeat(np.array([bool(e["is_catch"]) for e in files], dtype=bool), rows),
+            "date": np.repeat(np.array([dates.index(e["date"]) for e in files], dtype=np.int32), rows),
+            "event": np.repeat(np.array([events.index(e["event"]) for e in files], dtype=np.int32), rows),
+        }
+        for t, prefix in OUTCOMES:
+            cols[f"{t}_obs"] = col(f"{prefix}_n")
+            cols[f"{t}_p"] = col(f"{prefix}_p_target")
+            cols[f"{t}_z"] = col(f"{prefix}_z_score")
+        cols["succ_actual"] = col("success_p_actual")
+        return cls(records, np.arange(len(records)), cols, dates, events)
+
+    def __len__(self):
+        return len(self.idx)
+
+    def __iter__(self):
+        source = self.source
+        return (source[i] for i in self.idx.tolist())
+
+    def records(self):
+        return list(self)
+
+    def record_rows(self):
+        return self, np.arange(len(self.idx))
+
+    def take(self, mask):
+        return AuditFrame(
+            self.source, self.idx[mask], {k: v[mask] for k, v in self.cols.items()},
+            self.dates, self.events
+        )
+
+    def codes(self, values, vocabulary):
+        lookup = {v: i for i, v in enumerate(vocabulary)}
+        return [lookup[v] for v in values if v in lookup]
+
+    def mask(self, events=None, stars=None, catches=None, min_samples=0):
+        """Same predicates as filter_audit_data; None/empty means no filter."""
+        keep = self.cols["n"] >= min_samples
+        if events:
+            keep &= np.isin(self.cols["event"], self.codes(events, self.events))
+        if stars:
+            keep &= np.isin(self.cols["star"], list(stars))
+        if catches is not None:
+            keep &= np.isin(self.cols["catch"], list(catches))
+        return keep
+
+    def z_rows(self, t):
+        """(row, z) for every record with total_n > 100 (the var-ratio inputs)."""
+        rows = np.flatnonzero(self.cols["n"] > 100)
+        return rows, self.cols[f"{t}_z"][rows]
+
+    def z_variances(self, t, group, size):
+        """Var-ratio inputs per group: (z count, z variance or None)."""
+        rows, values = self.z_rows(t)
+        return list_variances(group[rows], values, size)
+
+    def expected(self, t):
+        """Per-row n·p and n·p·(1−p), evaluated like the scalar code."""
+        n = self.cols["n"]
+        p = self.cols[f"{t}_p"]
+        return n * p, n * p * (1.0 - p)
+
+
+def group_rows(*keys):
+    """
+    (group id per row, first row of each group) for the composite key,
+    with groups numbered in first-appearance order like dict insertion.
+    """
+    if not keys or len(keys[0]) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Pack the (small-range) key columns into one int64 so np.unique stays 1-D
+    packed = np.zeros(len(keys[0]), dtype=np.int64)
+    for k in keys:
+        k = np.asarray(k, dtype=np.int64)
+        lo = k.min()
+        packed = packed * (int(k.max() - lo) + 1) + (k - lo)
+    _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.reshape(-1)], first[order]
+
+
+def group_sum(group, values, size):
+    """Per-group sums, accumulated in row order."""
+    return np.bincount(group, weights=values, minlength=size)
+
+
+def group_int_sum(group, values, size):
+    """Exact per-group integer sums as Python ints."""
+    out = np.zeros(size, dtype=np.int64)
+    np.add.at(out, group, values)
+    return out.tolist()
+
+
+def group_lists(group, values, size):
+    """Per-group Python lists of values, keeping their order within a group."""
+    order = np.argsort(group, kind="stable")
+    bounds = np.searchsorted(group[order], np.arange(size + 1))
+    v = values[order].tolist()
+    return [v[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+
+def scaled_ints(values):
+    """
+    (ints, scale) with values == ints * 2**scale exactly; ints is an object
+    array of Python ints so sums and squares never overflow.
+    """
+    mant, exp = np.frexp(np.asarray(values, dtype=np.float64))
+    ints = (mant * 2.0 ** 53).astype(np.int64)
+    nonzero = ints != 0
+    if not nonzero.any():
+        return np.zeros(len(ints), dtype=object), 0
+    emin = int(exp[nonzero].min())
+    shift = np.where(nonzero, exp - emin, 0)
+    return ints.astype(object) << shift.astype(object), emin - 53
+
+
+def variance_from_sums(n, sx, sxx, scale):
+    """Sample variance of n values from their exact scaled sums, rounded once."""
+    num = n * sxx - sx * sx
+    den = n * (n - 1)
+    if scale >= 0:
+        return (num << 2 * scale) / den
+    return num / (den << -2 * scale)
+
+
+def exact_variance(values):
+    """
+    statistics.variance() without Fractions. Both are the exact sample
+    variance rounded once to float (int / int division rounds correctly).
+    """
+    v = np.asarray(values, dtype=np.float64)
+    if len(v) < 2 or not np.isfinite(v).all():
+        return statistics.variance(values)
+    xs, scale = scaled_ints(v)
+    return variance_from_sums(len(xs), xs.sum(), (xs * xs).sum(), scale)
+
+
+def list_variances(group, values, size):
+    """(count, exact variance or None) per group of the values."""
+    lists = group_lists(group, values, size)
+    return [len(z) for z in lists], [exact_variance(z) if len(z) > 1 else None for z in lists]
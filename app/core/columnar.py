@@ -0,0 +1,197 @@
+"""
+Dependency-free columnar encoding for large API payloads.
+
+Layout (little endian):
+    b"SFC1" | uint32 header length | header JSON (utf-8) | pad to 8 |
+    buffers, each starting on an 8-byte boundary
+
+The header holds the payload tree with every list of flat, same-keyed
+records replaced by {"$table": i} and every list of plain numbers by
+{"$array": i}. Tables store one buffer per column:
+
+    f64   float64 (nullable columns use NaN for null)
+    i32   int32
+    bool  uint8
+    dict  int32 codes into the column's "dictionary" (-1 = null)
+    json  values kept inline in the header (mixed / rare shapes)
+
+Decoding gives back the same JSON shape (see static/js/modules/columnar.js).
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+
+
+MEDIA_TYPE = "application/vnd.starforce.columnar"
+MAGIC = b"SFC1"
+
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+_SCALARS = (type(None), bool, int, float, str)
+
+
+def encode(payload):
+    """Encodes a JSON-compatible payload (dicts, lists, scalars) into bytes."""
+    enc = _Encoder()
+    root = enc.walk(payload)
+    header = json.dumps(
+        {"root": root, "tables": enc.tables, "arrays": enc.arrays},
+        separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+
+    out = bytearray(MAGIC)
+    out += struct.pack("<I", len(header))
+    out += header
+    # Column offsets in the header are relative to the first buffer
+    out += b"\0" * (-len(out) % 8)
+    for buf in enc.buffers:
+        out += buf
+        out += b"\0" * (-len(buf) % 8)
+    return bytes(out)
+
+
+class _Encoder:
+    def __init__(self):
+        self.tables = []
+        self.arrays = []
+        self.buffers = []
+        self.size = 0
+
+    def walk(self, node):
+        if isinstance(node, dict):
+            return {k: self.walk(v) for k, v in node.items()}
+        if isinstance(node, (list, tuple)):
+            if _is_table(node):
+                return {"$table": self.table(node)}
+            if _is_numeric(node):
+                col = self.column(node)
+                self.arrays.append(col)
+                return {"$array": len(self.arrays) - 1}
+            return [self.walk(v) for v in node]
+        if isinstance(node, float) and not math.isfinite(node):
+            return None
+        return node
+
+    def table(self, rows):
+        keys = list(rows[0].keys())
+        columns = []
+        for k in keys:
+            col = self.column([r[k] for r in rows])
+            col["name"] = k
+            columns.append(col)
+        self.tables.append({"length": len(rows), "columns": columns})
+        return len(self.tables) - 1
+
+    def column(self, values):
+        kinds = {type(v) for v in values}
+        has_null = type(None) in kinds
+        kinds.discard(type(None))
+
+        if kinds == {bool} and not has_null:
+            return self.buffer("bool", _pack("B", values))
+        if kinds and kinds <= {int, float}:
+            if kinds == {int} and not has_null and _fits_int32(values):
+                return self.buffer("i32", _pack("i", values))
+            # Non-finite floats are null, as they are outside tables
+            values = [v if v is None or math.isfinite(v) else None for v in values]
+            has_null = has_null or None in values
+            col = self.buffer("f64", _pack("d", [math.nan if v is None else v for v in values]))
+            if has_null:
+                col["nullable"] = True
+            return col
+        if kinds == {str}:
+            dictionary = {}
+            codes = [-1 if v is None else dictionary.setdefault(v, len(dictionary)) for v in values]
+            col = self.buffer("dict", _pack("i", codes))
+            col["dictionary"] = list(dictionary)
+            return col
+        return {"type": "json", "values": [self.walk(v) for v in values]}
+
+    def buffer(self, kind, data):
+        col = {"type": kind, "offset": self.size, "byteLength": len(data)}
+        self.buffers.append(data)
+        self.size += len(data) + (-len(data) % 8)
+        return col
+
+
+def _pack(typecode, values):
+    # array keeps this module NumPy-free; 'i' is 4 bytes on every supported platform
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack(typecode, raw):
+    arr = array(typecode)
+    arr.frombytes(raw)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tolist()
+
+
+def _is_table(node):
+    if not node or not isinstance(node[0], dict) or not node[0]:
+        return False
+    keys = node[0].keys()
+    for row in node:
+        if not isinstance(row, dict) or row.keys() != keys:
+            return False
+        for v in row.values():
+            if not isinstance(v, _SCALARS):
+                return False
+    return True
+
+
+def _is_numeric(node):
+    # Short lists are cheaper inline than as a buffer reference
+    if len(node) < 16:
+        return False
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in node)
+
+
+def _fits_int32(values):
+    return _INT32_MIN <= min(values) and max(values) <= _INT32_MAX
+
+
+def decode(data):
+    """Python decoder (mirror of the JS one), mainly for tests and tooling."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    (hlen,) = struct.unpack_from("<I", data, 4)
+    header = json.loads(data[8:8 + hlen].decode("utf-8"))
+    base = 8 + hlen + (-(8 + hlen) % 8)
+
+    def column(col):
+        kind = col["type"]
+        if kind == "json":
+            return [restore(v) for v in col["values"]]
+        raw = data[base + col["offset"]: base + col["offset"] + col["byteLength"]]
+        if kind == "bool":
+            return [bool(v) for v in _unpack("B", raw)]
+        if kind == "i32":
+            return _unpack("i", raw)
+        if kind == "f64":
+            values = _unpack("d", raw)
+            if col.get("nullable"):
+                values = [None if math.isnan(v) else v for v in values]
+            return values
+        dictionary = col["dictionary"]
+        return [None if c < 0 else dictionary[c] for c in _unpack("i", raw)]
+
+    def restore(node):
+        if isinstance(node, dict):
+            if len(node) == 1 and "$table" in node:
+                table = header["tables"][node["$table"]]
+                cols = [(c["name"], column(c)) for c in table["columns"]]
+                return [{name: vals[i] for name, vals in cols} for i in range(table["length"])]
+            if len(node) == 1 and "$array" in node:
+                return column(header["arrays"][node["$array"]])
+            return {k: restore(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [restore(v) for v in node]
+        return node
+
+    return restore(header["root"])
@@ -1,6 +1,11 @@
+import os
+
 # Constants
 S, F, B = 0, 1, 2
 
+# Upper bound for CompareRequest.workers (local worker processes per request)
+MAX_WORKERS = int(os.environ.get("STARFORCE_MAX_WORKERS") or os.cpu_count() or 1)
+
 PROB = {
     12: (0.40, 0.60, 0.00), 13: (0.35, 0.65, 0.00), 14: (0.30, 0.70, 0.00),
     15: (0.30, 0.679, 0.021), 16: (0.30, 0.679, 0.021), 17: (0.15, 0.782, 0.068),
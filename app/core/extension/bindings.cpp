@@ -39,25 +39,34 @@ PYBIND11_MODULE(starforce_sim_core, m) {
       .def_readwrite("b_streaks", &SimResult::b_streaks)
       .def_readwrite("lvl_stats", &SimResult::lvl_stats)
       .def_readwrite("cost", &SimResult::cost)
-      .def_readwrite("clicks", &SimResult::clicks);
+      .def_readwrite("clicks", &SimResult::clicks)
+      .def_readwrite("log_weight", &SimResult::log_weight);
 
   m.def("simulate_rigged_cpp", &simulate_rigged_cpp,
         "Simulate with Rigged Decks (C++)", py::arg("users"),
         py::arg("runs_per_user"), py::arg("prob"), py::arg("config"),
         py::arg("start_mode") = "carry", py::arg("seed") = 42,
-        py::arg("sequential") = false);
+        py::arg("sequential") = false, py::arg("on_batch") = py::none(),
+        py::arg("batch_size") = 0);
 
   m.def("simulate_sticky_cpp", &simulate_sticky_cpp,
         "Simulate with Sticky RNG (Cluster Decks)", py::arg("users"),
         py::arg("runs_per_user"), py::arg("prob"), py::arg("rho"),
-        py::arg("seed") = 42, py::arg("sequential") = false);
+        py::arg("seed") = 42, py::arg("sequential") = false,
+        py::arg("on_batch") = py::none(), py::arg("batch_size") = 0);
 
   m.def("simulate_markov_cpp", &simulate_markov_cpp,
         "Simulate with Markov Chain Engine", py::arg("users"),
         py::arg("runs_per_user"), py::arg("prob"), py::arg("rho"),
-        py::arg("seed") = 42);
+        py::arg("seed") = 42, py::arg("common_streams") = false,
+        py::arg("antithetic") = false, py::arg("tilt") = 0.0,
+        py::arg("tilt_after") = 10, py::arg("on_batch") = py::none(),
+        py::arg("batch_size") = 0);
 
   m.def("simulate_fair_cpp", &simulate_fair_cpp, "Simulate Fair World (IID)",
         py::arg("users"), py::arg("runs_per_user"), py::arg("prob"),
-        py::arg("seed") = 42);
+        py::arg("seed") = 42, py::arg("common_streams") = false,
+        py::arg("antithetic") = false, py::arg("tilt") = 0.0,
+        py::arg("tilt_after") = 10, py::arg("on_batch") = py::none(),
+        py::arg("batch_size") = 0);
 }
@@ -0,0 +1,52 @@
+#ifndef BATCH_HOOK_H
+#define BATCH_HOOK_H
+
+#include "deck.h"
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+// Optional progress hook shared by the engines. Every `batch_size` finished
+// results, the slice produced since the previous call is handed to
+// on_batch(list[SimResult]); a falsy return (other than None) stops the run
+// and the engine returns what it has so far. Disabled when on_batch is None
+// or batch_size <= 0, in which case the engines behave exactly as before.
+class BatchHook {
+public:
+  BatchHook(py::object on_batch, int batch_size)
+      : fn_(on_batch), batch_size_(batch_size), emitted_(0), stopped_(false) {}
+
+  bool enabled() const { return !fn_.is_none() && batch_size_ > 0; }
+
+  // Returns false once the callback asked to stop.
+  bool step(const std::vector<SimResult> &results) {
+    if (!enabled() || stopped_)
+      return !stopped_;
+    if (results.size() - emitted_ < static_cast<size_t>(batch_size_))
+      return true;
+    return emit(results);
+  }
+
+  // Hands over the tail that did not fill a whole batch.
+  void flush(const std::vector<SimResult> &results) {
+    if (enabled() && !stopped_ && results.size() > emitted_)
+      emit(results);
+  }
+
+private:
+  bool emit(const std::vector<SimResult> &results) {
+    std::vector<SimResult> batch(results.begin() + emitted_, results.end());
+    emitted_ = results.size();
+    py::object ret = fn_(batch);
+    stopped_ = !(ret.is_none() || py::bool_(ret));
+    return !stopped_;
+  }
+
+  py::object fn_;
+  int batch_size_;
+  size_t emitted_;
+  bool stopped_;
+};
+
+#endif // BATCH_HOOK_H
@@ -3,6 +3,7 @@
 
 #include <algorithm>
 #include <cmath>
+#include <cstdint>
 #include <iostream>
 #include <map>
 #include <memory>
@@ -48,6 +49,81 @@ struct SimResult {
   std::vector<std::vector<int>> lvl_stats;
   long long cost;
   int clicks;
+  double log_weight = 0.0; // importance-sampling log likelihood ratio
+};
+
+// Importance-sampling proposal. Once the running streak is a fail streak of at
+// least `after` draws, a fraction `tilt` of the success mass is moved onto
+// extending it. Tilting only inside streaks keeps the likelihood ratio close
+// to 1 for ordinary paths, while long fail streaks become common. Booms are
+// not tilted: a boom resets to 12, where p_b = 0, so they never chain. The
+// likelihood ratio of a token is p / q.
+inline void tilt_probs(double p_s, double p_f, double p_b, double tilt,
+                       int after, int streak_type, int streak_len,
+                       double &q_s, double &q_f, double &q_b) {
+  q_s = p_s;
+  q_f = p_f;
+  q_b = p_b;
+  double moved = p_s * tilt;
+  if (streak_type == F && streak_len >= after && p_f > 0) {
+    q_s -= moved;
+    q_f += moved;
+  }
+}
+
+inline double tilt_log_ratio(int token, double p_s, double p_f, double p_b,
+                             double q_s, double q_f, double q_b) {
+  if (token == S)
+    return std::log(p_s / q_s);
+  if (token == F)
+    return std::log(p_f / q_f);
+  return std::log(p_b / q_b);
+}
+
+// Uniform source for variance reduction. When enabled, the k-th attempt at a
+// given level of a given user draws a counter-based uniform keyed by
+// (seed, user, level, k), so engines sharing a seed stay in lock-step per
+// level even after their paths diverge (common random numbers). With
+// antithetic pairing, users 2j and 2j+1 share a key and the second one sees
+// 1 - u. When disabled it is a plain pass-through to the engine's RNG, so the
+// default stream is unchanged.
+class LevelStreams {
+  uint64_t seed;
+  bool enabled;
+  bool antithetic;
+  uint64_t user_key = 0;
+  bool mirror = false;
+  std::vector<uint64_t> visits = std::vector<uint64_t>(32, 0);
+
+  static uint64_t mix(uint64_t x) {
+    x += 0x9E3779B97F4A7C15ULL;
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return x ^ (x >> 31);
+  }
+
+public:
+  LevelStreams(int seed, bool common, bool antithetic)
+      : seed((uint64_t)(uint32_t)seed), enabled(common || antithetic),
+        antithetic(antithetic) {}
+
+  void begin_user(int user_idx) {
+    if (!enabled)
+      return;
+    user_key = antithetic ? (uint64_t)(user_idx / 2) : (uint64_t)user_idx;
+    mirror = antithetic && (user_idx % 2 == 1);
+    std::fill(visits.begin(), visits.end(), 0);
+  }
+
+  double next(int level, std::mt19937 &rng,
+              std::uniform_real_distribution<double> &dist) {
+    if (!enabled)
+      return dist(rng);
+    uint64_t k = visits[level & 31]++;
+    uint64_t h = mix(mix(mix(seed) ^ user_key) ^ (((uint64_t)level << 40) | k));
+    double u = (double)(h >> 11) * (1.0 / 9007199254740992.0);
+    return mirror ? 1.0 - u : u;
+  }
 };
 
 class ClusterDeck {
@@ -3,15 +3,20 @@
 py::tuple
 simulate_fair_cpp(int users, int runs_per_user,
                   std::map<int, std::tuple<double, double, double>> prob,
-                  int seed) {
+                  int seed, bool common_streams, bool antithetic,
+                  double tilt, int tilt_after, py::object on_batch,
+                  int batch_size) {
 
   std::vector<SimResult> all_results;
   all_results.reserve(users * runs_per_user);
+  BatchHook hook(on_batch, batch_size);
 
   std::mt19937 rng(seed);
   std::uniform_real_distribution<double> dist(0.0, 1.0);
+  LevelStreams uniform(seed, common_streams, antithetic);
 
   for (int i = 0; i < users; ++i) {
+    uniform.begin_user(i);
     SimResult res;
     res.lvl_stats.resize(10, std::vector<int>(4, 0));
     res.cost = 0;
@@ -29,17 +34,25 @@ simulate_fair_cpp(int users, int runs_per_user,
 
         double p_s = std::get<0>(prob[curr]);
         double p_b = std::get<2>(prob[curr]);
+        double p_f = 1.0 - p_s - p_b;
+        double q_s = p_s, q_f = p_f, q_b = p_b;
+        if (tilt > 0)
+          tilt_probs(p_s, p_f, p_b, tilt, tilt_after, curr_type, curr_len, q_s,
+                     q_f, q_b);
 
-        // IID Draw
-        double val = dist(rng);
+        // IID Draw (from the tilted proposal when importance sampling)
+        double val = uniform.next(curr, rng, dist);
         int token = F;
-        if (val < p_s)
+        if (val < q_s)
           token = S;
-        else if (val < p_s + (1.0 - p_s - p_b))
+        else if (val < q_s + q_f)
           token = F; // Fail range
         else
           token = B;
 
+        if (tilt > 0)
+          res.log_weight += tilt_log_ratio(token, p_s, p_f, p_b, q_s, q_f, q_b);
+
         int idx = curr - 12;
         if (idx >= 0 && idx < 10) {
           res.lvl_stats[idx][0]++;
@@ -90,7 +103,10 @@ simulate_fair_cpp(int users, int runs_per_user,
       res.clicks += clicks_run;
     }
     all_results.push_back(res);
+    if (!hook.step(all_results))
+      break;
   }
+  hook.flush(all_results);
 
   // Fair simulation doesn't use decks, so stats are 0
   return py::make_tuple(all_results, 0, 0, 0);
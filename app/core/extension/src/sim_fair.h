@@ -1,6 +1,7 @@
 #ifndef SIM_FAIR_H
 #define SIM_FAIR_H
 
+#include "batch_hook.h"
 #include "deck.h"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -10,6 +11,8 @@ namespace py = pybind11;
 py::tuple
 simulate_fair_cpp(int users, int runs_per_user,
                   std::map<int, std::tuple<double, double, double>> prob,
-                  int seed);
+                  int seed, bool common_streams, bool antithetic,
+                  double tilt, int tilt_after, py::object on_batch,
+                  int batch_size);
 
 #endif // SIM_FAIR_H
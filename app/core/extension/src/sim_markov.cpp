@@ -3,13 +3,17 @@
 py::tuple
 simulate_markov_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
-                    double rho, int seed) {
+                    double rho, int seed, bool common_streams,
+                    bool antithetic, double tilt, int tilt_after,
+                    py::object on_batch, int batch_size) {
 
   std::vector<SimResult> all_results;
   all_results.reserve(users * runs_per_user);
+  BatchHook hook(on_batch, batch_size);
 
   std::mt19937 rng(seed);
   std::uniform_real_distribution<double> dist(0.0, 1.0);
+  LevelStreams uniform(seed, common_streams, antithetic);
 
   // Transition Matrices
   std::map<int, std::vector<std::vector<double>>> transitions;
@@ -54,6 +58,7 @@ simulate_markov_cpp(int users, int runs_per_user,
   }
 
   for (int i = 0; i < users; ++i) {
+    uniform.begin_user(i);
     SimResult res;
     res.lvl_stats.resize(10, std::vector<int>(4, 0));
     res.cost = 0;
@@ -84,15 +89,24 @@ simulate_markov_cpp(int users, int runs_per_user,
           p_b_eff = T[prev_token][2];
         }
 
-        double val = dist(rng);
+        double q_s = p_s_eff, q_f = p_f_eff, q_b = p_b_eff;
+        if (tilt > 0)
+          tilt_probs(p_s_eff, p_f_eff, p_b_eff, tilt, tilt_after, curr_type,
+                     curr_len, q_s, q_f, q_b);
+
+        double val = uniform.next(curr, rng, dist);
         int token = F;
-        if (val < p_s_eff)
+        if (val < q_s)
           token = S;
-        else if (val < p_s_eff + p_f_eff)
+        else if (val < q_s + q_f)
           token = F;
         else
           token = B;
 
+        if (tilt > 0)
+          res.log_weight +=
+              tilt_log_ratio(token, p_s_eff, p_f_eff, p_b_eff, q_s, q_f, q_b);
+
         if (idx >= 0 && idx < 10) {
           res.lvl_stats[idx][0]++;
           if (token == S)
@@ -142,7 +156,10 @@ simulate_markov_cpp(int users, int runs_per_user,
       res.clicks += clicks_run;
     }
     all_results.push_back(res);
+    if (!hook.step(all_results))
+      break;
   }
+  hook.flush(all_results);
 
   return py::make_tuple(all_results, 0, 0, 0);
 }
@@ -1,6 +1,7 @@
 #ifndef SIM_MARKOV_H
 #define SIM_MARKOV_H
 
+#include "batch_hook.h"
 #include "deck.h"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -10,6 +11,8 @@ namespace py = pybind11;
 py::tuple
 simulate_markov_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
-                    double rho, int seed);
+                    double rho, int seed, bool common_streams, bool antithetic,
+                    double tilt, int tilt_after,
+                    py::object on_batch, int batch_size);
 
 #endif // SIM_MARKOV_H
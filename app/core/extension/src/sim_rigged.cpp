@@ -4,10 +4,12 @@ py::tuple
 simulate_rigged_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
                     RunDeckConfig config, std::string start_mode, int seed,
-                    bool sequential) {
+                    bool sequential, py::object on_batch, int batch_size) {
 
   std::vector<SimResult> all_results;
   all_results.reserve(users * runs_per_user);
+  BatchHook hook(on_batch, batch_size);
+  bool stopped = false;
 
   RunDeckManager manager(prob, config, seed);
   manager.start_run(start_mode);
@@ -80,6 +82,8 @@ simulate_rigged_cpp(int users, int runs_per_user,
         res.clicks += clicks_run;
       }
       all_results.push_back(res);
+      if (!hook.step(all_results))
+        break;
     }
 
   } else {
@@ -98,7 +102,7 @@ simulate_rigged_cpp(int users, int runs_per_user,
 
     int active = users;
 
-    while (active > 0) {
+    while (active > 0 && !stopped) {
       for (int i = 0; i < users; ++i) {
         if (runs_done[i] >= runs_per_user)
           continue;
@@ -181,11 +185,17 @@ simulate_rigged_cpp(int users, int runs_per_user,
           } else {
             active--;
           }
+          if (!hook.step(all_results)) {
+            stopped = true;
+            break;
+          }
         }
       }
     }
   }
 
+  hook.flush(all_results);
+
   auto s = manager.stats();
   return py::make_tuple(all_results, std::get<0>(s), std::get<1>(s),
                         std::get<2>(s));
@@ -1,6 +1,7 @@
 #ifndef SIM_RIGGED_H
 #define SIM_RIGGED_H
 
+#include "batch_hook.h"
 #include "deck.h"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -11,6 +12,6 @@ py::tuple
 simulate_rigged_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
                     RunDeckConfig config, std::string start_mode, int seed,
-                    bool sequential);
+                    bool sequential, py::object on_batch, int batch_size);
 
 #endif // SIM_RIGGED_H
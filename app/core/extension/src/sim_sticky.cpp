@@ -3,10 +3,12 @@
 py::tuple
 simulate_sticky_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
-                    double rho, int seed, bool sequential) {
+                    double rho, int seed, bool sequential, py::object on_batch, int batch_size) {
 
   std::vector<SimResult> all_results;
   all_results.reserve(users * runs_per_user);
+  BatchHook hook(on_batch, batch_size);
+  bool stopped = false;
 
   std::map<int, std::unique_ptr<ClusterDeck>> deck_manager;
   int DECK_SIZE = 100000;
@@ -101,6 +103,8 @@ simulate_sticky_cpp(int users, int runs_per_user,
         res.clicks += clicks_run;
       }
       all_results.push_back(res);
+      if (!hook.step(all_results))
+        break;
     }
 
   } else {
@@ -118,7 +122,7 @@ simulate_sticky_cpp(int users, int runs_per_user,
     std::vector<int> u_curr_len(users, 0);
 
     int active = users;
-    while (active > 0) {
+    while (active > 0 && !stopped) {
       for (int i = 0; i < users; ++i) {
         if (runs_done[i] >= runs_per_user)
           continue;
@@ -203,10 +207,15 @@ simulate_sticky_cpp(int users, int runs_per_user,
           } else {
             active--;
           }
+          if (!hook.step(all_results)) {
+            stopped = true;
+            break;
+          }
         }
       }
     }
   }
+  hook.flush(all_results);
 
   return py::make_tuple(all_results, 0, 0, 0);
 }
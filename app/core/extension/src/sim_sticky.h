@@ -1,6 +1,7 @@
 #ifndef SIM_STICKY_H
 #define SIM_STICKY_H
 
+#include "batch_hook.h"
 #include "deck.h"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -10,6 +11,6 @@ namespace py = pybind11;
 py::tuple
 simulate_sticky_cpp(int users, int runs_per_user,
                     std::map<int, std::tuple<double, double, double>> prob,
-                    double rho, int seed, bool sequential);
+                    double rho, int seed, bool sequential, py::object on_batch, int batch_size);
 
 #endif // SIM_STICKY_H
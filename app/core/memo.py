@@ -0,0 +1,74 @@
+"""
+Thread-safe LRU memo cache with data-version invalidation and single-flight.
+
+Entries are tied to the data version they were computed from. The first
+lookup under a new version drops everything older. Concurrent misses on
+the same key share one computation: the first caller computes and the
+others wait for its result (or its exception).
+"""
+
+import threading
+from collections import OrderedDict
+
+from . import metrics
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MemoCache:
+    def __init__(self, name, maxsize=64):
+        self.name = name
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._version = None
+
+    def get(self, key, version, compute):
+        """Cached compute() result for (key, version)."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                metrics.record_cache(self.name, True)
+                return self._entries[key]
+            flight = self._inflight.get((version, key))
+            leader = flight is None
+            if leader:
+                flight = self._inflight[(version, key)] = _Flight()
+        metrics.record_cache(self.name, not leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop((version, key), None)
+                if flight.error is None and version == self._version:
+                    self._entries[key] = flight.value
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
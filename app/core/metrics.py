@@ -0,0 +1,350 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and fixed-bucket histograms keyed by label tuples. An
+update is a dict lookup plus an add under one lock, which is cheap enough
+to leave on in production. Collectors registered with add_collector() run
+at scrape time for values that are cheaper to read than to track, like
+lru_cache stats, DB size and the crawler's state file.
+
+Each process has its own registry. Under several uvicorn workers
+(STARFORCE_METRICS_DIR set, see main.py) every worker also flushes its
+counters and histograms to <dir>/<pid>.json about once a second, and a
+scrape adds the other workers' files to its own live values. Gauges and
+totals mirrored by collectors (set_total) describe the process answering
+the scrape.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_METRICS = {}
+_COLLECTORS = []
+_LOCAL = threading.local()
+
+SHARED_DIR = os.environ.get("STARFORCE_METRICS_DIR")
+FLUSH_SECONDS = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(l, "")) for l in self.labels)
+
+    def samples(self, values=None):
+        for key, value in (self.values if values is None else values).items():
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.mirrored = set()   # keys written by set_total; never merged across processes
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with _LOCK:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set_total(self, value, **labels):
+        """For collectors mirroring a cumulative count kept elsewhere."""
+        key = self._key(labels)
+        with _LOCK:
+            self.mirrored.add(key)
+            self.values[key] = float(value)
+
+    def shared(self):
+        return {k: v for k, v in self.values.items() if k not in self.mirrored}
+
+    def merge(self, values, other):
+        for key, value in other:
+            key = tuple(key)
+            if key not in self.mirrored:
+                values[key] = values.get(key, 0.0) + value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with _LOCK:
+            self.values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with _LOCK:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def shared(self):
+        return self.values
+
+    def merge(self, values, other):
+        for key, (counts, total, n) in other:
+            key = tuple(key)
+            state = values.get(key)
+            if state is None:
+                values[key] = [list(counts), total, n]
+            else:
+                values[key] = [[a + b for a, b in zip(state[0], counts)], state[1] + total, state[2] + n]
+
+    def samples(self, values=None):
+        for key, (counts, total, n) in (self.values if values is None else values).items():
+            labels = dict(zip(self.labels, key))
+            cum = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cum += c
+                yield self.name + "_bucket", {**labels, "le": _fmt(bound)}, cum
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, n
+
+
+def _register(metric):
+    with _LOCK:
+        existing = _METRICS.get(metric.name)
+        if existing is not None:
+            return existing
+        _METRICS[metric.name] = metric
+        return metric
+
+
+def counter(name, help_text, labels=()):
+    return _register(Counter(name, help_text, labels))
+
+def gauge(name, help_text, labels=()):
+    return _register(Gauge(name, help_text, labels))
+
+def histogram(name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help_text, labels, buckets))
+
+def add_collector(fn):
+    """fn() runs at scrape time and updates gauges/counters itself."""
+    _COLLECTORS.append(fn)
+    return fn
+
+
+def _fmt(v):
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v)) if abs(v) < 1e15 else repr(float(v))
+    return repr(float(v))
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render():
+    """Prometheus text format (version 0.0.4)."""
+    for fn in list(_COLLECTORS):
+        try:
+            fn()
+        except Exception:
+            logger.exception("Metrics collector %s failed", getattr(fn, "__name__", fn))
+
+    others = _read_shared() if SHARED_DIR else {}
+    lines = []
+    with _LOCK:
+        metrics = sorted(_METRICS.values(), key=lambda m: m.name)
+        snapshot = []
+        for m in metrics:
+            if m.name in others:
+                values = {k: ([list(v[0]), v[1], v[2]] if isinstance(v, list) else v) for k, v in m.values.items()}
+                for other in others[m.name]:
+                    m.merge(values, other)
+                snapshot.append((m, list(m.samples(values))))
+            else:
+                snapshot.append((m, list(m.samples())))
+    for metric, samples in snapshot:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in samples:
+            if labels:
+                body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{body}}} {_fmt(value)}")
+            else:
+                lines.append(f"{name} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Multi-process (uvicorn workers) ---
+
+def _shared_state():
+    with _LOCK:
+        return {
+            m.name: [[list(k), v] for k, v in m.shared().items()]
+            for m in _METRICS.values() if isinstance(m, (Counter, Histogram))
+        }
+
+def flush_shared():
+    """Writes this process's counters and histograms to SHARED_DIR/<pid>.json."""
+    path = Path(SHARED_DIR) / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_shared_state(), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def _read_shared():
+    """{metric name: [values of each other process]} from SHARED_DIR."""
+    merged = {}
+    own = f"{os.getpid()}.json"
+    for path in Path(SHARED_DIR).glob("*.json"):
+        if path.name == own:
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, values in state.items():
+            if name in _METRICS:
+                merged.setdefault(name, []).append(values)
+    return merged
+
+_FLUSHER = None
+
+def start_sharing():
+    """Starts the background flush when running under several workers; idempotent."""
+    global _FLUSHER
+    if not SHARED_DIR or _FLUSHER is not None:
+        return
+
+    def loop():
+        while True:
+            time.sleep(FLUSH_SECONDS)
+            try:
+                flush_shared()
+            except OSError:
+                logger.exception("Metrics flush to %s failed", SHARED_DIR)
+
+    _FLUSHER = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+    _FLUSHER.start()
+
+
+# --- Shared instruments ---
+
+HTTP_LATENCY = histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route")
+)
+HTTP_REQUESTS = counter(
+    "http_requests_total", "Requests by route template and status.", ("method", "route", "status")
+)
+ENGINE_CLICKS = counter(
+    "engine_clicks_total", "Simulated clicks by engine and share scope.", ("engine", "scope")
+)
+ENGINE_SECONDS = counter(
+    "engine_seconds_total",
+    "Wall time spent in the engines; clicks/sec = rate(clicks) / rate(seconds).",
+    ("engine", "scope")
+)
+ENGINE_SESSIONS = counter(
+    "engine_results_total", "Results returned by the engines.", ("engine", "scope")
+)
+DECK_BUILDS = counter("deck_builds_total", "Rigged deck builds.", ("scope",))
+DECK_WRAPS = counter("deck_wraps_total", "Rigged deck wrap-arounds.", ("scope",))
+DECK_DRAWS = counter("deck_draws_total", "Rigged deck draws.", ("scope",))
+CACHE_REQUESTS = counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")
+)
+
+
+@contextmanager
+def suppressed():
+    """Drops record_*() updates made by the current thread (start-up warm-up)."""
+    previous = getattr(_LOCAL, "suppressed", False)
+    _LOCAL.suppressed = True
+    try:
+        yield
+    finally:
+        _LOCAL.suppressed = previous
+
+def _recording():
+    return not getattr(_LOCAL, "suppressed", False)
+
+def record_engine(engine, scope, clicks, seconds, results):
+    if not _recording():
+        return
+    ENGINE_CLICKS.inc(clicks, engine=engine, scope=scope)
+    ENGINE_SECONDS.inc(seconds, engine=engine, scope=scope)
+    ENGINE_SESSIONS.inc(results, engine=engine, scope=scope)
+
+def record_deck(scope, draws, builds, wraps):
+    if not _recording():
+        return
+    DECK_DRAWS.inc(draws, scope=scope)
+    DECK_BUILDS.inc(builds, scope=scope)
+    DECK_WRAPS.inc(wraps, scope=scope)
+
+def record_cache(cache, hit):
+    if not _recording():
+        return
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# --- Crawler pipeline (separate process; see crawler/metrics.py) ---
+
+# Same file as crawler.config.METRICS_FILE, resolved from the repo root rather
+# than the working directory (importing crawler.config would create its data dir)
+CRAWLER_METRICS_FILE = Path(__file__).resolve().parents[2] / "crawler" / "sessions" / "crawler_metrics.json"
+
+CRAWLER_LAST = gauge(
+    "crawler_stage_last_duration_seconds", "Duration of the latest run of each crawler stage.", ("stage",)
+)
+CRAWLER_SECONDS = counter(
+    "crawler_stage_seconds_total", "Total time spent per crawler stage.", ("stage",)
+)
+CRAWLER_RUNS = counter(
+    "crawler_stage_runs_total", "Crawler stage runs by result.", ("stage", "result")
+)
+CRAWLER_LAST_END = gauge(
+    "crawler_stage_last_end_timestamp_seconds", "Unix time the stage last finished.", ("stage",)
+)
+
+@add_collector
+def _collect_crawler():
+    try:
+        with open(CRAWLER_METRICS_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return
+    for name, s in state.items():
+        CRAWLER_LAST.set(s.get("last_seconds", 0.0), stage=name)
+        CRAWLER_SECONDS.set_total(s.get("total_seconds", 0.0), stage=name)
+        CRAWLER_RUNS.set_total(s.get("count", 0) - s.get("failures", 0), stage=name, result="ok")
+        CRAWLER_RUNS.set_total(s.get("failures", 0), stage=name, result="error")
+        CRAWLER_LAST_END.set(s.get("last_end", 0.0), stage=name)
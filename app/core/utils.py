@@ -1,5 +1,8 @@
 
 import math
+from functools import lru_cache
+
+from . import metrics
 
 def unit_size_for_probs(prob_tuple):
     """
@@ -36,3 +39,49 @@ def get_b_val(val_b, val_a):
 def auto_cap_b(mean_len, kind):
     """Duplicate of auto_cap for Deck B contexts?"""
     return auto_cap(mean_len, kind)
+
+def fair_expectations(prob, cost_table, max_clicks=5000):
+    """
+    Exact per-run expectations of (clicks, cost) in the fair (IID) world.
+    Propagates the level distribution click by click, mirroring the engine:
+    start at 12, S -> +1 (22 absorbs), F -> stay, B -> back to 12, and the
+    run is truncated at max_clicks.
+    """
+    key = tuple(sorted((int(k), tuple(v)) for k, v in prob.items()))
+    costs = tuple(int(cost_table.get(level, 0)) for level, _ in key)
+    return _fair_expectations_cached(key, costs, int(max_clicks))
+
+@lru_cache(maxsize=16)
+def _fair_expectations_cached(prob_items, costs, max_clicks):
+    levels = [level for level, _ in prob_items]
+    pos = {level: i for i, level in enumerate(levels)}
+    start = pos.get(12, 0)
+    dist = [0.0] * len(levels)
+    dist[start] = 1.0
+    exp_clicks = 0.0
+    exp_cost = 0.0
+    for _ in range(max_clicks):
+        alive = sum(dist)
+        if alive < 1e-15:
+            break
+        exp_clicks += alive
+        nxt = [0.0] * len(levels)
+        for i, (level, (p_s, _p_f, p_b)) in enumerate(prob_items):
+            mass = dist[i]
+            if mass <= 0:
+                continue
+            exp_cost += mass * costs[i]
+            p_f = 1.0 - p_s - p_b
+            if level + 1 in pos:
+                nxt[pos[level + 1]] += mass * p_s
+            nxt[i] += mass * p_f
+            nxt[start] += mass * p_b
+        dist = nxt
+    return exp_clicks, exp_cost
+
+
+@metrics.add_collector
+def _collect_cache_stats():
+    info = _fair_expectations_cached.cache_info()
+    metrics.CACHE_REQUESTS.set_total(info.hits, cache="fair_expectations", result="hit")
+    metrics.CACHE_REQUESTS.set_total(info.misses, cache="fair_expectations", result="miss")
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from ..core.config import MAX_WORKERS
+
 class CompareRequest(BaseModel):
     total_tries: int = 100
     block_intensity: int = 40  # legacy
@@ -28,6 +30,21 @@ class CompareRequest(BaseModel):
     sticky_rho: float = 0.0
     fixed_length_mode: bool = True
 
+    # Variance Reduction
+    common_random_numbers: bool = False  # fair & Markov worlds share one uniform stream
+    antithetic: bool = False  # pair consecutive users with mirrored draws (1 - u)
+    control_variate: bool = False  # correct avg_cost/avg_clicks with exact fair expectations
+
+    # Importance Sampling (fair & Markov engines)
+    importance_sampling: bool = False
+    is_tilt: float = 0.5  # fraction of success mass moved onto the running fail streak
+    is_tilt_after: int = 10  # fail-streak length that switches the tilt on
+    tail_clicks: Optional[List[int]] = None  # default: 2x/3x/5x the exact fair mean
+    tail_max_f: Optional[List[int]] = None  # default: 25/40/55
+
+    # Worker Mode
+    workers: int = Field(0, ge=0, le=MAX_WORKERS)  # >1: shard users across local worker processes
+
     # Markov Mode
     markov_mode: bool = False
     markov_rho: float = 0.0
@@ -60,6 +77,10 @@ class AuditQuery(BaseModel):
     stars: List[int] = []
     catch_ops: List[str] = []
     min_samples: int = 100
+    split_date: Optional[str] = None  # season contrast split (YYYYMMDD); None = legacy month seasons
 
 class SeasonContrastQuery(AuditQuery):
-    split_date: Optional[str] = None
+    pass
+
+class SeasonScanQuery(AuditQuery):
+    split_dates: List[str] = []  # candidate splits; empty = every date in the data
@@ -0,0 +1,121 @@
+import queue
+import threading
+import uuid
+
+from .sim_summary import SimSummary
+
+
+class CompareProgress:
+    """
+    Receives engine batches during run_compare and emits partial snapshots.
+
+    Each batch is folded into a running SimSummary, so a snapshot costs one
+    pass over the new results plus a to_aggregate() over value tables.
+    Importance-sampled phases only report counts (the snapshot would be
+    unweighted).
+    """
+
+    def __init__(self, emit, batch_size=2000):
+        self.emit = emit
+        self.batch_size = max(1, int(batch_size))
+        self.stopped = False
+        self.phase = None
+        self.total = 0
+        self.weighted = False
+        self.summary = SimSummary()
+        self._pending = []
+
+    def begin(self, phase, weighted=False):
+        self.phase = phase
+        self.total = 0
+        self.weighted = weighted
+        self.summary = SimSummary()
+        self._pending = []
+
+    def expect(self, n):
+        self.total += int(n)
+
+    def engine_args(self):
+        """Trailing (on_batch, batch_size) arguments for the C++ engines."""
+        return self.on_batch, self.batch_size
+
+    def feed(self, results):
+        """Batches results from Python-level loops (one engine call per user/session)."""
+        self._pending.extend(results)
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return not self.stopped
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        if pending:
+            return self.on_batch(pending)
+        return not self.stopped
+
+    def on_batch(self, results):
+        if self.stopped:
+            return False
+        self.summary.add(results)
+        self.emit("snapshot", {
+            "phase": self.phase,
+            "done": self.summary.n,
+            "total": self.total,
+            "snapshot": None if self.weighted else self.summary.to_aggregate()
+        })
+        return not self.stopped
+
+    def stop(self):
+        self.stopped = True
+
+
+_ACTIVE = {}
+_ACTIVE_LOCK = threading.Lock()
+
+
+def stop_stream(run_id):
+    with _ACTIVE_LOCK:
+        progress = _ACTIVE.get(run_id)
+    if progress is None:
+        return False
+    progress.stop()
+    return True
+
+
+def stream_compare(service, req, batch_size=2000):
+    """
+    Runs service.run_compare in a background thread and yields
+    (event, data) pairs: `started` with the run id, `snapshot` while the
+    engines run, then one `result` (the normal /compare payload plus
+    "stopped") or `error`. stop_stream(run_id) or closing the generator
+    stops the engines at their next batch; the result then covers the
+    sessions finished so far.
+    """
+    run_id = uuid.uuid4().hex
+    events = queue.Queue()
+    progress = CompareProgress(lambda kind, data: events.put((kind, data)), batch_size)
+    with _ACTIVE_LOCK:
+        _ACTIVE[run_id] = progress
+
+    def work():
+        try:
+            result = service.run_compare(req, progress=progress)
+            result["stopped"] = progress.stopped
+            events.put(("result", result))
+        except Exception as e:
+            events.put(("error", {"detail": str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=work, daemon=True).start()
+
+    try:
+        yield "started", {"run_id": run_id}
+        while True:
+            item = events.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        progress.stop()
+        with _ACTIVE_LOCK:
+            _ACTIVE.pop(run_id, None)
@@ -0,0 +1,189 @@
+import math
+from collections import Counter
+from fractions import Fraction
+
+import numpy as np
+
+
+class SimSummary:
+    """
+    Mergeable sufficient statistics of a batch of simulation results.
+
+    Everything aggregate() reports can be rebuilt from level-stat totals,
+    exact cost/click sums and value->count tables for clicks, streaks and
+    cost buckets, so summaries built on different shards (or processes)
+    can be merged and turned into the same payload. to_dict()/from_dict()
+    keep the wire format plain JSON.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.lvl_stats = np.zeros((10, 4), dtype=np.int64)
+        self.cost_sum = 0
+        self.cost_sq_sum = 0
+        self.clicks = Counter()
+        self.s_streaks = Counter()
+        self.f_streaks = Counter()
+        self.b_streaks = Counter()
+        self.cost_billions = Counter()
+
+    def add(self, results):
+        lvl_total = np.zeros((10, 4), dtype=np.int64)
+        costs = []
+        clicks = []
+        all_streaks = []
+        all_b_streaks = []
+        for r in results:
+            if isinstance(r, dict):
+                lvl_total += np.asarray(r['lvl_stats'], dtype=np.int64)
+                costs.append(int(r.get('cost', 0)))
+                clicks.append(int(r.get('clicks', 0)))
+                all_streaks.extend(r['streaks'])
+                all_b_streaks.extend(r.get('b_streaks', []))
+            else:
+                lvl_total += np.array(r.lvl_stats, dtype=np.int64)
+                costs.append(int(r.cost))
+                clicks.append(int(r.clicks))
+                all_streaks.extend(r.streaks)
+                all_b_streaks.extend(r.b_streaks)
+
+        self.n += len(costs)
+        self.lvl_stats += lvl_total
+        # Python ints: cost^2 overflows int64
+        self.cost_sum += sum(costs)
+        self.cost_sq_sum += sum(c * c for c in costs)
+        _count_into(self.clicks, clicks)
+        _count_into(self.cost_billions, [int(c / 1000000000) for c in costs])
+        streaks = np.asarray(all_streaks, dtype=np.int64)
+        b_streaks = np.asarray(all_b_streaks, dtype=np.int64)
+        _count_into(self.s_streaks, streaks[streaks > 0])
+        _count_into(self.f_streaks, -streaks[streaks < 0])
+        _count_into(self.b_streaks, b_streaks[b_streaks > 0])
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        self.lvl_stats += other.lvl_stats
+        self.cost_sum += other.cost_sum
+        self.cost_sq_sum += other.cost_sq_sum
+        self.clicks.update(other.clicks)
+        self.s_streaks.update(other.s_streaks)
+        self.f_streaks.update(other.f_streaks)
+        self.b_streaks.update(other.b_streaks)
+        self.cost_billions.update(other.cost_billions)
+        return self
+
+    def to_dict(self):
+        def table(c):
+            return [[int(k), int(v)] for k, v in sorted(c.items())]
+        return {
+            "n": self.n,
+            "lvl_stats": self.lvl_stats.tolist(),
+            "cost_sum": self.cost_sum,
+            "cost_sq_sum": self.cost_sq_sum,
+            "clicks": table(self.clicks),
+            "s_streaks": table(self.s_streaks),
+            "f_streaks": table(self.f_streaks),
+            "b_streaks": table(self.b_streaks),
+            "cost_billions": table(self.cost_billions),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls()
+        s.n = int(d["n"])
+        s.lvl_stats = np.asarray(d["lvl_stats"], dtype=np.int64)
+        s.cost_sum = int(d["cost_sum"])
+        s.cost_sq_sum = int(d["cost_sq_sum"])
+        for name in ("clicks", "s_streaks", "f_streaks", "b_streaks", "cost_billions"):
+            setattr(s, name, Counter({int(k): int(v) for k, v in d[name]}))
+        return s
+
+    def to_aggregate(self):
+        """Same payload as aggregate() over the summarised results."""
+        if self.n == 0:
+            from .simulation_service import aggregate
+            return aggregate([])
+
+        level_table = {}
+        level_avg_tries = {}
+        for i in range(10):
+            level = 12 + i
+            row = self.lvl_stats[i]
+            tries = int(row[0])
+            safe_tries = tries if tries > 0 else 1
+            level_table[str(level)] = {
+                "try": tries,
+                "s": int(row[1]), "f": int(row[2]), "b": int(row[3]),
+                "success_rate": float(row[1]) / safe_tries * 100,
+                "fail_rate": float(row[2]) / safe_tries * 100,
+                "boom_rate": float(row[3]) / safe_tries * 100
+            }
+            level_avg_tries[str(level)] = tries / self.n
+
+        n = self.n
+        cost_var = 0.0
+        if n > 1:
+            cost_var = float(Fraction(n * self.cost_sq_sum - self.cost_sum ** 2, n * (n - 1)))
+        clicks_sum = sum(k * v for k, v in self.clicks.items())
+
+        return {
+            "s_var": _count_var(self.s_streaks),
+            "f_var": _count_var(self.f_streaks),
+            "b_var": _count_var(self.b_streaks),
+            "max_f": max(self.f_streaks) if self.f_streaks else 0,
+            "max_s": max(self.s_streaks) if self.s_streaks else 0,
+            "max_b": max(self.b_streaks) if self.b_streaks else 0,
+            "level_stats": level_table,
+            "histogram": _count_hist(self.f_streaks),
+            "s_histogram": _count_hist(self.s_streaks),
+            "b_histogram": _count_hist(self.b_streaks),
+            "m_histogram": _count_hist(self.cost_billions),
+            "avg_cost": float(Fraction(self.cost_sum, n)),
+            "cost_var": cost_var,
+            "avg_clicks": float(Fraction(clicks_sum, n)),
+            "clicks_p50": _count_percentile(self.clicks, 50),
+            "clicks_p90": _count_percentile(self.clicks, 90),
+            "clicks_p95": _count_percentile(self.clicks, 95),
+            "clicks_p99": _count_percentile(self.clicks, 99),
+            "level_avg_tries": level_avg_tries
+        }
+
+
+def _count_into(counter, values):
+    if len(values) == 0:
+        return
+    unique, counts = np.unique(values, return_counts=True)
+    for k, v in zip(unique.tolist(), counts.tolist()):
+        counter[k] += v
+
+def _count_hist(counter):
+    return [{"x": int(k), "y": int(v)} for k, v in sorted(counter.items())]
+
+def _count_var(counter):
+    # Exact sample variance; np.var can differ from it in the last ulp.
+    total = sum(counter.values())
+    if total < 2:
+        return 0.0
+    s1 = sum(k * v for k, v in counter.items())
+    s2 = sum(k * k * v for k, v in counter.items())
+    return float(Fraction(total * s2 - s1 * s1, total * (total - 1)))
+
+def _count_percentile(counter, q):
+    """np.percentile (linear interpolation) over the expanded value table."""
+    if not counter:
+        return 0.0
+    values = np.array(sorted(counter), dtype=np.float64)
+    cum = np.cumsum([counter[int(v)] for v in values])
+    n = int(cum[-1])
+    h = (q / 100.0) * (n - 1)
+    lo = int(math.floor(h))
+    hi = min(lo + 1, n - 1)
+    a = values[np.searchsorted(cum, lo, side="right")]
+    b = values[np.searchsorted(cum, hi, side="right")]
+    t = h - lo
+    diff = b - a
+    # Same lerp as numpy (exact at both ends of the bracket).
+    if t >= 0.5:
+        return float(b - diff * (1 - t))
+    return float(a + diff * t)
@@ -9,9 +9,30 @@ from dataclasses import replace, dataclass, field
 from ..models.schemas import CompareRequest
 # from ..core.simulator_engine import iid_draw_factory, simulate_detailed, simulate_interleaved, aggregate
 from ..core.config import PROB, S, F, B, COST_TABLE
-from ..core.utils import unit_size_for_probs, auto_cap, get_b_val, auto_cap_b
+from ..core.utils import unit_size_for_probs, auto_cap, get_b_val, auto_cap_b, fair_expectations
+from ..core import metrics
 
-import starforce_sim_core as cpp_engine
+class _LazyEngine:
+    """Imports the C++ extension on first use; falsy when it is not built."""
+    _module = None
+
+    def _load(self):
+        if _LazyEngine._module is None:
+            import starforce_sim_core
+            _LazyEngine._module = starforce_sim_core
+        return _LazyEngine._module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __bool__(self):
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+cpp_engine = _LazyEngine()
 
 @dataclass
 class RunDeckConfig:
@@ -44,7 +65,7 @@ class SimulationService:
     def __init__(self):
         pass
 
-    def run_compare(self, req: CompareRequest):
+    def run_compare(self, req: CompareRequest, progress=None):
         start_time = time.time()
 
         # Resolve simulation counts
@@ -60,15 +81,28 @@ class SimulationService:
         # Config setup
         cfg = self._build_config(req)
 
+        if progress is None and self._use_workers(req):
+            return self._run_compare_sharded(req, cfg, users, runs_per_user, total_sessions, start_time)
+
         # Fair world (C++)
+        fair_seed = random.randint(0, 1000000)
+        tilt = self._resolve_tilt(req)
+        if progress is not None:
+            progress.begin("fair", weighted=tilt > 0)
+            progress.expect(users)
         if cpp_engine:
-            res_tuple = cpp_engine.simulate_fair_cpp(users, runs_per_user, PROB, random.randint(0, 1000000))
+            res_tuple = cpp_engine.simulate_fair_cpp(
+                users, runs_per_user, PROB, fair_seed,
+                bool(req.common_random_numbers), bool(req.antithetic),
+                tilt, self._resolve_tilt_after(req), *_hook_args(progress)
+            )
             fair_results = res_tuple[0]
         else:
             raise RuntimeError("C++ Engine not available")
         
         fair_time = time.time()
-        fair_res = aggregate(fair_results)
+        _record_engine("fair", "iid", fair_results, fair_time - start_time)
+        fair_res = aggregate_weighted(fair_results) if tilt > 0 else aggregate(fair_results)
 
         # Calculate deck sizes based on fair results
         cfg = self._adjust_deck_sizes(cfg, fair_res)
@@ -81,11 +115,16 @@ class SimulationService:
 
         # --- Markov Engine Routing ---
         if req.markov_mode and cpp_engine:
-            return self._run_markov(req, users, runs_per_user, fair_res, total_sessions, start_time, fair_time)
+            return self._run_markov(
+                req, users, runs_per_user, fair_results, fair_res, fair_seed,
+                total_sessions, start_time, fair_time, progress
+            )
 
         # Main Simulation
+        if progress is not None:
+            progress.begin("rigged")
         rigged_results, rigged_draws, rigged_builds, rigged_wraps = self._run_rigged_simulation(
-            req, cfg, cfg_a, cfg_b, users, runs_per_user
+            req, cfg, cfg_a, cfg_b, users, runs_per_user, progress
         )
         
         rigged_time = time.time()
@@ -112,6 +151,12 @@ class SimulationService:
                 "rigged_time": float(rigged_time - fair_time)
             },
             "calibration": None,
+            "variance_reduction": self._variance_reduction_report(
+                req, fair_results, rigged_results, runs_per_user
+            ),
+            "importance_sampling": self._tail_report(
+                req, tilt, fair_results, None, runs_per_user
+            ),
             "deck_stats": {
                 "rigged_draws": rigged_draws,
                 "rigged_builds": rigged_builds,
@@ -204,16 +249,109 @@ class SimulationService:
             "markov_mode": req.markov_mode,
             "markov_rho": req.markov_rho,
             "fixed_length_mode": getattr(cfg, "fixed_length_mode", True),
-            "dual_mode": req.dual_mode
+            "dual_mode": req.dual_mode,
+            "common_random_numbers": req.common_random_numbers,
+            "antithetic": req.antithetic,
+            "control_variate": req.control_variate
+        }
+
+    def _use_workers(self, req: CompareRequest) -> bool:
+        # Workers only ship mergeable summaries, so the per-user pairing of
+        # the variance-reduction and importance-sampling reports stays local.
+        return (
+            int(req.workers or 0) > 1
+            and not (req.common_random_numbers or req.antithetic or req.control_variate)
+            and not req.importance_sampling
+        )
+
+    def _run_compare_sharded(self, req, cfg, users, runs_per_user, total_sessions, start_time):
+        """
+        Same flow as run_compare with each world sharded across the local
+        worker cluster. Shared-deck scopes are per shard (each worker builds
+        its own decks), which matches the single-process result in
+        distribution but not draw-for-draw.
+        """
+        from .worker_cluster import get_cluster, run_sharded_phase
+
+        cluster = get_cluster()
+        restarts_before = cluster.restarts
+
+        fair_sum, _, fair_shards, fair_wall = run_sharded_phase(
+            cluster, "fair", req, users, runs_per_user
+        )
+        fair_res = fair_sum.to_aggregate()
+        _record_sharded("fair", "iid", fair_sum, fair_shards)
+        cfg = self._adjust_deck_sizes(cfg, fair_res)
+
+        if req.markov_mode:
+            rigged_sum, deck_stats, rigged_shards, rigged_wall = run_sharded_phase(
+                cluster, "markov", req, users, runs_per_user
+            )
+            deck_analysis = {}
+            config = {"markov_mode": True}
+            share_scope = "markov"
+        else:
+            cfg_b = self._build_dual_config(cfg, req) if req.dual_mode else None
+            rigged_sum, deck_stats, rigged_shards, rigged_wall = run_sharded_phase(
+                cluster, "rigged", req, users, runs_per_user, cfg=cfg, cfg_b=cfg_b
+            )
+            deck_analysis = self._generate_deck_analysis(cfg)
+            config = self._serialize_config(cfg, req)
+            share_scope = req.share_scope or "global-relay"
+        engine = "markov" if req.markov_mode else ("sticky" if req.sticky_rng else "rigged")
+        _record_sharded(engine, share_scope.lower(), rigged_sum, rigged_shards)
+        if not req.markov_mode:
+            metrics.record_deck(share_scope.lower(), *deck_stats)
+
+        return {
+            "fair": fair_res,
+            "rigged": rigged_sum.to_aggregate(),
+            "deck_analysis": deck_analysis,
+            "theory": {str(k): v for k, v in PROB.items()},
+            "simulation_count": total_sessions,
+            "users": users,
+            "runs_per_user": runs_per_user,
+            "share_scope": share_scope,
+            "config": config,
+            "execution_time": float(time.time() - start_time),
+            "timing": {
+                "fair_time": float(fair_wall),
+                "rigged_time": float(rigged_wall)
+            },
+            "calibration": None,
+            "variance_reduction": None,
+            "importance_sampling": None,
+            "cluster": {
+                "workers": min(cluster.size, int(req.workers)),
+                "restarts": cluster.restarts - restarts_before,
+                "shards": fair_shards + rigged_shards
+            },
+            "deck_stats": {
+                "rigged_draws": deck_stats[0],
+                "rigged_builds": deck_stats[1],
+                "rigged_wraps": deck_stats[2]
+            }
         }
 
-    def _run_markov(self, req, users, runs_per_user, fair_res, total_sessions, start_time, fair_time):
+    def _run_markov(self, req, users, runs_per_user, fair_results, fair_res, fair_seed,
+                    total_sessions, start_time, fair_time, progress=None):
+        # CRN: reuse the fair world's seed so the k-th attempt at each level of
+        # user i draws the same uniform in both worlds (the Markov draw reduces
+        # to the IID draw at rho = 0). Deck engines have no comparable stream.
+        seed = fair_seed if req.common_random_numbers else random.randint(0, 1000000)
+        tilt = self._resolve_tilt(req)
+        if progress is not None:
+            progress.begin("markov", weighted=tilt > 0)
+            progress.expect(users)
         res_tuple = cpp_engine.simulate_markov_cpp(
-            users, runs_per_user, PROB, float(req.markov_rho), random.randint(0, 1000000)
+            users, runs_per_user, PROB, float(req.markov_rho), seed,
+            bool(req.common_random_numbers), bool(req.antithetic),
+            tilt, self._resolve_tilt_after(req), *_hook_args(progress)
         )
         markov_results_list = res_tuple[0]
         markov_time = time.time()
-        markov_res = aggregate(markov_results_list)
+        _record_engine("markov", "markov", markov_results_list, markov_time - fair_time)
+        markov_res = aggregate_weighted(markov_results_list) if tilt > 0 else aggregate(markov_results_list)
         total_time = time.time() - start_time
         
         return {
@@ -229,9 +367,75 @@ class SimulationService:
             "execution_time": float(total_time),
             "timing": {"fair_time": fair_time - start_time, "rigged_time": markov_time - fair_time},
             "calibration": None,
+            "variance_reduction": self._variance_reduction_report(
+                req, fair_results, markov_results_list, runs_per_user
+            ),
+            "importance_sampling": self._tail_report(
+                req, tilt, fair_results, markov_results_list, runs_per_user
+            ),
             "deck_stats": {"rigged_draws": 0, "rigged_builds": 0,"rigged_wraps": 0}
         }
 
+    def _variance_reduction_report(self, req, fair_results, rigged_results, runs_per_user):
+        """
+        Rigged-vs-fair differences of avg_clicks/avg_cost under the requested
+        variance reduction (CRN pairing, antithetic pairs, control variate on
+        the exact fair expectation), with the variance ratio against the naive
+        independent-sample estimator.
+        """
+        if not (req.common_random_numbers or req.antithetic or req.control_variate):
+            return None
+        # Paired estimators below assume equally weighted sessions.
+        if self._resolve_tilt(req) > 0:
+            return None
+
+        exp_clicks, exp_cost = fair_expectations(PROB, COST_TABLE)
+        report = {
+            "common_random_numbers": bool(req.common_random_numbers),
+            "antithetic": bool(req.antithetic),
+            "control_variate": bool(req.control_variate),
+            "paired": len(fair_results) == len(rigged_results),
+            "fair_exact": {
+                "avg_clicks": exp_clicks * runs_per_user,
+                "avg_cost": exp_cost * runs_per_user
+            }
+        }
+        for key, getter in (("avg_clicks", _result_clicks), ("avg_cost", _result_cost)):
+            report[key] = _reduced_difference(
+                [getter(r) for r in fair_results],
+                [getter(r) for r in rigged_results],
+                report["fair_exact"][key],
+                antithetic=bool(req.antithetic),
+                control_variate=bool(req.control_variate)
+            )
+        return report
+
+    def _resolve_tilt(self, req: CompareRequest) -> float:
+        if not req.importance_sampling:
+            return 0.0
+        return max(0.0, min(0.95, float(req.is_tilt or 0.0)))
+
+    def _resolve_tilt_after(self, req: CompareRequest) -> int:
+        return max(1, int(req.is_tilt_after or 1))
+
+    def _tail_report(self, req, tilt, fair_results, markov_results, runs_per_user):
+        """Exceedance probabilities (with standard errors) for the tilted engines."""
+        if tilt <= 0:
+            return None
+
+        exp_clicks, _ = fair_expectations(PROB, COST_TABLE)
+        mean_clicks = exp_clicks * runs_per_user
+        thresholds = {
+            "clicks": req.tail_clicks or [int(round(mean_clicks * m)) for m in (2, 3, 5)],
+            "max_f": req.tail_max_f or [25, 40, 55],
+        }
+        return {
+            "tilt": tilt,
+            "tilt_after": self._resolve_tilt_after(req),
+            "fair": tail_exceedance(fair_results, thresholds),
+            "rigged": tail_exceedance(markov_results, thresholds) if markov_results is not None else None
+        }
+
     def _resolve_calibration_bias(self, req: CompareRequest) -> float:
         # "Auto Calibrate" logic moved to setup
         if req.auto_calibrate:
@@ -240,7 +444,7 @@ class SimulationService:
              return 0.0 
         return 0.0
 
-    def _run_rigged_simulation(self, req, cfg, cfg_a, cfg_b, users, runs_per_user):
+    def _run_rigged_simulation(self, req, cfg, cfg_a, cfg_b, users, runs_per_user, progress=None):
         # 1. Setup Phase: Calibration
         bias = self._resolve_calibration_bias(req)
         
@@ -255,20 +459,21 @@ class SimulationService:
             
             if users_a > 0:
                 # Deck A (supports Anti-Cluster if configured)
-                r, d, b, w = self._execute_rigged(req, cfg_a, users_a, runs_per_user, bias)
+                r, d, b, w = self._execute_rigged(req, cfg_a, users_a, runs_per_user, bias, progress)
                 res_all.extend(r); d_all += d; b_all += b; w_all += w
             
             if users_b > 0:
                 # Deck B (No Anti-Cluster, High Variance typically)
-                r, d, b, w = self._execute_rigged(req, cfg_b, users_b, runs_per_user, bias)
+                r, d, b, w = self._execute_rigged(req, cfg_b, users_b, runs_per_user, bias, progress)
                 res_all.extend(r); d_all += d; b_all += b; w_all += w
                 
             return res_all, d_all, b_all, w_all
         
         # Single Deck Mode
-        return self._execute_rigged(req, cfg, users, runs_per_user, bias)
+        return self._execute_rigged(req, cfg, users, runs_per_user, bias, progress)
 
-    def _execute_rigged(self, req, cfg, users, runs, bias):
+    def _execute_rigged(self, req, cfg, users, runs, bias, progress=None):
+        started = time.time()
         share_scope = (req.share_scope or "global-relay").lower()
         use_sticky = bool(req.sticky_rng)
         sticky_rho = float(req.sticky_rho or 0.0)
@@ -283,6 +488,12 @@ class SimulationService:
             
             is_sequential = share_scope in ["global-relay", "global"]
 
+            if progress is not None:
+                if progress.stopped:
+                    return [], 0, 0, 0
+                # Sequential engines return one result per user, the others one per session
+                progress.expect(users if is_sequential or share_scope == "account" else users * runs)
+
             if use_sticky:
                 if share_scope == "account":
                     for _ in range(users):
@@ -294,6 +505,8 @@ class SimulationService:
                         rigged_draws_local += r_d
                         rigged_builds_local += r_b
                         rigged_wraps_local += r_w
+                        if progress is not None and not progress.feed(r_res):
+                            break
                 elif share_scope == "session":
                     for _ in range(users * runs):
                         res_tuple = cpp_engine.simulate_sticky_cpp(
@@ -304,9 +517,12 @@ class SimulationService:
                         rigged_draws_local += r_d
                         rigged_builds_local += r_b
                         rigged_wraps_local += r_w
+                        if progress is not None and not progress.feed(r_res):
+                            break
                 else:
                     res_tuple = cpp_engine.simulate_sticky_cpp(
-                        users, runs, PROB, sticky_rho, bias, random.randint(0, 1000000), is_sequential
+                        users, runs, PROB, sticky_rho, bias, random.randint(0, 1000000), is_sequential,
+                        *_hook_args(progress)
                     )
                     r_res, r_d, r_b, r_w = res_tuple
                     rigged_results_local.extend(r_res)
@@ -326,6 +542,8 @@ class SimulationService:
                         rigged_draws_local += r_d
                         rigged_builds_local += r_b
                         rigged_wraps_local += r_w
+                        if progress is not None and not progress.feed(r_res):
+                            break
                 elif share_scope == "session":
                     for _ in range(users * runs):
                         res_tuple = cpp_engine.simulate_rigged_cpp(
@@ -336,9 +554,12 @@ class SimulationService:
                         rigged_draws_local += r_d
                         rigged_builds_local += r_b
                         rigged_wraps_local += r_w
+                        if progress is not None and not progress.feed(r_res):
+                            break
                 else:
                     res_tuple = cpp_engine.simulate_rigged_cpp(
-                        users, runs, PROB, cfg_cpp, start_mode, random.randint(0, 1000000), is_sequential
+                        users, runs, PROB, cfg_cpp, start_mode, random.randint(0, 1000000), is_sequential,
+                        *_hook_args(progress)
                     )
                     r_res, r_d, r_b, r_w = res_tuple
                     rigged_results_local.extend(r_res)
@@ -346,6 +567,11 @@ class SimulationService:
                     rigged_builds_local += r_b
                     rigged_wraps_local += r_w
 
+            if progress is not None:
+                progress.flush()
+            _record_engine("sticky" if use_sticky else "rigged", share_scope,
+                           rigged_results_local, time.time() - started)
+            metrics.record_deck(share_scope, rigged_draws_local, rigged_builds_local, rigged_wraps_local)
             return rigged_results_local, rigged_draws_local, rigged_builds_local, rigged_wraps_local
         
         except Exception as e:
@@ -458,6 +684,241 @@ class SimulationService:
             }
         return analysis
 
+def _record_engine(engine, scope, results, seconds):
+    clicks = sum(_result_clicks(r) for r in results)
+    metrics.record_engine(engine, scope, clicks, seconds, len(results))
+
+def _record_sharded(engine, scope, summary, shards):
+    # Worker seconds, so the ratio stays per-core throughput
+    clicks = sum(k * v for k, v in summary.clicks.items())
+    metrics.record_engine(engine, scope, clicks, sum(s["elapsed"] for s in shards), summary.n)
+
+def _hook_args(progress):
+    """(on_batch, batch_size) for the engines; (None, 0) disables the hook."""
+    return progress.engine_args() if progress is not None else (None, 0)
+
+def _result_clicks(r):
+    return r.get('clicks', 0) if isinstance(r, dict) else r.clicks
+
+def _result_cost(r):
+    return r.get('cost', 0) if isinstance(r, dict) else r.cost
+
+def _result_weight(r):
+    return math.exp(r.get('log_weight', 0.0) if isinstance(r, dict) else r.log_weight)
+
+def _result_fields(r):
+    if isinstance(r, dict):
+        return r['lvl_stats'], r.get('cost', 0), r.get('clicks', 0), r['streaks'], r.get('b_streaks', [])
+    return r.lvl_stats, r.cost, r.clicks, r.streaks, r.b_streaks
+
+def _weighted_hist(values, weights):
+    if not values:
+        return []
+    unique, inverse = np.unique(np.asarray(values), return_inverse=True)
+    sums = np.bincount(inverse, weights=np.asarray(weights, dtype=float))
+    return [{"x": int(k), "y": round(float(v), 4)} for k, v in zip(unique, sums)]
+
+def _weighted_var(values, weights):
+    if len(values) < 2:
+        return 0.0
+    x = np.asarray(values, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    total = w.sum()
+    if total <= 1:
+        return 0.0
+    mean = float((w * x).sum() / total)
+    return float((w * (x - mean) ** 2).sum() / (total - 1))
+
+def _weighted_percentile(values, weights, q):
+    order = np.argsort(values, kind="stable")
+    x = np.asarray(values, dtype=float)[order]
+    cum = np.cumsum(np.asarray(weights, dtype=float)[order])
+    idx = int(np.searchsorted(cum, cum[-1] * q / 100.0, side="left"))
+    return float(x[min(idx, len(x) - 1)])
+
+def _weighted_population_max(values, weights):
+    """Largest value whose expected count across the population is still >= 1."""
+    x = np.asarray(values)
+    if not len(x):
+        return 0
+    order = np.argsort(-x, kind="stable")
+    cum = np.cumsum(np.asarray(weights, dtype=float)[order])
+    idx = int(np.searchsorted(cum, 1.0, side="left"))
+    return int(x[order][min(idx, len(x) - 1)])
+
+def aggregate_weighted(results):
+    """
+    Importance-sampling counterpart of aggregate(). Every session counts with
+    its likelihood-ratio weight, self-normalised so that totals stay on the
+    scale of len(results) plain sessions; counts in level_stats and histograms
+    are therefore fractional. max_* report the largest value expected to occur
+    at least once in a population of that size.
+    """
+    if not results:
+        return aggregate(results)
+
+    raw = np.array([_result_weight(r) for r in results], dtype=float)
+    w = raw * (len(results) / raw.sum())
+
+    total_lvl_stats = np.zeros((10, 4), dtype=float)
+    costs, clicks = [], []
+    s_vals, s_w, f_vals, f_w, b_vals, b_w = [], [], [], [], [], []
+    sess_max_s, sess_max_f, sess_max_b = [], [], []
+    for r, wi in zip(results, w):
+        lvl_stats, cost, n_clicks, streaks, b_streaks = _result_fields(r)
+        total_lvl_stats += wi * np.asarray(lvl_stats, dtype=float)
+        costs.append(cost)
+        clicks.append(n_clicks)
+        ss = [s for s in streaks if s > 0]
+        fs = [-s for s in streaks if s < 0]
+        bs = [int(s) for s in b_streaks if s > 0]
+        s_vals.extend(ss); s_w.extend([wi] * len(ss))
+        f_vals.extend(fs); f_w.extend([wi] * len(fs))
+        b_vals.extend(bs); b_w.extend([wi] * len(bs))
+        sess_max_s.append(max(ss) if ss else 0)
+        sess_max_f.append(max(fs) if fs else 0)
+        sess_max_b.append(max(bs) if bs else 0)
+
+    run_count = len(results)
+    level_table = {}
+    level_avg_tries = {}
+    for i in range(10):
+        level = 12 + i
+        row = total_lvl_stats[i]
+        tries = float(row[0])
+        safe_tries = tries if tries > 0 else 1
+        level_table[str(level)] = {
+            "try": round(tries, 4),
+            "s": round(float(row[1]), 4), "f": round(float(row[2]), 4), "b": round(float(row[3]), 4),
+            "success_rate": float(row[1]) / safe_tries * 100,
+            "fail_rate": float(row[2]) / safe_tries * 100,
+            "boom_rate": float(row[3]) / safe_tries * 100
+        }
+        level_avg_tries[str(level)] = tries / run_count
+
+    costs_arr = np.asarray(costs, dtype=float)
+    clicks_arr = np.asarray(clicks, dtype=float)
+    cost_billions = [int(c / 1000000000) for c in costs]
+
+    return {
+        "s_var": _weighted_var(s_vals, s_w),
+        "f_var": _weighted_var(f_vals, f_w),
+        "b_var": _weighted_var(b_vals, b_w),
+        "max_f": _weighted_population_max(sess_max_f, w),
+        "max_s": _weighted_population_max(sess_max_s, w),
+        "max_b": _weighted_population_max(sess_max_b, w),
+        "level_stats": level_table,
+        "histogram": _weighted_hist(f_vals, f_w),
+        "s_histogram": _weighted_hist(s_vals, s_w),
+        "b_histogram": _weighted_hist(b_vals, b_w),
+        "m_histogram": _weighted_hist(cost_billions, w),
+        "avg_cost": float((w * costs_arr).sum() / run_count),
+        "cost_var": _weighted_var(costs, w),
+        "avg_clicks": float((w * clicks_arr).sum() / run_count),
+        "clicks_p50": _weighted_percentile(clicks, w, 50),
+        "clicks_p90": _weighted_percentile(clicks, w, 90),
+        "clicks_p95": _weighted_percentile(clicks, w, 95),
+        "clicks_p99": _weighted_percentile(clicks, w, 99),
+        "level_avg_tries": level_avg_tries,
+        "effective_sample_size": float(raw.sum() ** 2 / (raw ** 2).sum())
+    }
+
+def tail_exceedance(results, thresholds):
+    """
+    Unbiased likelihood-ratio estimates of P(metric >= t) per session for
+    clicks and the longest fail streak (max_f). Boom chains are left out:
+    a boom resets to 12, where p_b = 0, so they never exceed one.
+    equivalent_sessions is how many plain Monte Carlo sessions would give
+    the same standard error.
+    """
+    if not results:
+        return None
+    w = np.array([_result_weight(r) for r in results], dtype=float)
+    n = len(results)
+    series = {"clicks": [], "max_f": []}
+    for r in results:
+        _, _, n_clicks, streaks, _ = _result_fields(r)
+        series["clicks"].append(n_clicks)
+        series["max_f"].append(max([-s for s in streaks if s < 0], default=0))
+
+    report = {"sessions": n, "effective_sample_size": float(w.sum() ** 2 / (w ** 2).sum())}
+    for name, values in series.items():
+        x = np.asarray(values)
+        rows = []
+        for t in thresholds.get(name, []):
+            hit = x >= t
+            contrib = w * hit
+            p = float(contrib.mean())
+            se = float(contrib.std(ddof=1) / math.sqrt(n)) if n > 1 else 0.0
+            rows.append({
+                "threshold": int(t),
+                "p": p,
+                "se": se,
+                "rel_err": se / p if p > 0 else None,
+                "hits": int(hit.sum()),
+                "equivalent_sessions": p * (1.0 - p) / (se * se) if se > 0 else None
+            })
+        report[name] = rows
+    return report
+
+def _pair_units(values, antithetic):
+    """Collapse antithetic pairs (users 2k, 2k+1) into their means."""
+    a = np.asarray(values, dtype=float)
+    if antithetic and len(a) >= 4:
+        m = len(a) // 2 * 2
+        return (a[0:m:2] + a[1:m:2]) / 2.0
+    return a
+
+def _reduced_difference(fair, rigged, fair_exact, antithetic=False, control_variate=False):
+    x = np.asarray(fair, dtype=float)
+    y = np.asarray(rigged, dtype=float)
+    fair_mean = float(x.mean()) if len(x) else 0.0
+    rigged_mean = float(y.mean()) if len(y) else 0.0
+
+    naive_var = 0.0
+    if len(x) > 1:
+        naive_var += float(x.var(ddof=1)) / len(x)
+    if len(y) > 1:
+        naive_var += float(y.var(ddof=1)) / len(y)
+
+    out = {
+        "fair": fair_mean,
+        "rigged": rigged_mean,
+        "diff": rigged_mean - fair_mean,
+        "se_naive": math.sqrt(naive_var),
+        "se": math.sqrt(naive_var),
+        "variance_reduction": 1.0
+    }
+
+    # Antithetic pairing alone already shrinks the fair-world mean's variance.
+    x_u = _pair_units(x, antithetic)
+    if len(x) > 1 and len(x_u) > 1:
+        fair_naive = float(x.var(ddof=1)) / len(x)
+        fair_var = float(x_u.var(ddof=1)) / len(x_u)
+        out["fair_se"] = math.sqrt(fair_var)
+        out["fair_variance_reduction"] = fair_naive / fair_var if fair_var > 0 else 1.0
+
+    # Paired estimators need one fair sample per rigged sample.
+    if len(x) != len(y) or len(x) < 2:
+        return out
+
+    y_u = _pair_units(y, antithetic)
+    if control_variate:
+        var_x = float(x_u.var(ddof=1))
+        beta = float(np.cov(x_u, y_u, ddof=1)[0, 1]) / var_x if var_x > 0 else 0.0
+        rigged_cv = rigged_mean - beta * (fair_mean - fair_exact)
+        resid = y_u - beta * x_u
+        out["beta"] = beta
+        out["rigged_cv"] = rigged_cv
+        out["diff"] = rigged_cv - fair_exact
+        reduced_var = float(resid.var(ddof=1)) / len(resid)
+    else:
+        reduced_var = float((y_u - x_u).var(ddof=1)) / len(y_u)
+
+    out["se"] = math.sqrt(reduced_var)
+    out["variance_reduction"] = naive_var / reduced_var if reduced_var > 0 else 1.0
+    return out
+
 # Helper functions removed (migrated to C++)
 def aggregate(results):
     if not results:
@@ -0,0 +1,197 @@
+"""
+Streaming reader for the crawler's per-session hourly snapshot files.
+
+The crawler appends to each session's hourly_snapshots(_relabel).jsonl in
+time order. Sessions are therefore combined with a heap-based k-way merge
+on timestamp instead of a global load-and-sort. Some files hold backfilled
+lines out of order, so a cheap pre-scan splits each file into time-ordered
+runs (byte ranges), and the runs are merged. Duplicate snapshots (same
+window_end and total successes) are dropped as they stream past, keeping
+the first one in time order. Duplicates are the same crawl recorded by
+more than one session, so they share a timestamp: only the signatures at
+the merge frontier's timestamp are kept. Memory holds one pending
+snapshot per run plus those signatures, not the whole history.
+
+Ties on timestamp keep os.walk session order and then line order, like a
+stable sort of the concatenated files.
+"""
+
+import heapq
+import json
+import os
+import re
+
+BATCH_SIZE = 512
+RELABELED = "hourly_snapshots_relabel.jsonl"
+ORIGINAL = "hourly_snapshots.jsonl"
+# The crawler writes "timestamp" as the first key; anything else is parsed in full
+_LEADING_TIMESTAMP = re.compile(rb'^\s*\{\s*"timestamp"\s*:\s*"([^"\\]*)"')
+
+
+def session_files(base_dir):
+    """(session dir, snapshot file) in os.walk order; relabeled snapshots win."""
+    sessions = []
+    if not os.path.exists(base_dir):
+        return sessions
+    for root, _, _ in os.walk(base_dir):
+        relabeled = os.path.join(root, RELABELED)
+        original = os.path.join(root, ORIGINAL)
+        path = relabeled if os.path.exists(relabeled) else original
+        if os.path.exists(path):
+            sessions.append((root, path))
+    return sessions
+
+
+def parse_line(raw):
+    """Snapshot dict for one JSONL line (bytes), or None if blank/invalid/empty."""
+    try:
+        line = raw.decode("utf-8").strip()
+        if not line:
+            return None
+        entry = json.loads(line)
+        return entry if entry.get("data_by_key") else None
+    except Exception:
+        return None
+
+
+def _peek_timestamp(raw):
+    m = _LEADING_TIMESTAMP.match(raw)
+    if m:
+        return m.group(1).decode("utf-8", "replace")
+    entry = parse_line(raw)
+    return entry["timestamp"] if entry is not None else None
+
+
+def signature(entry):
+    total_s = sum(v.get("success_count", 0) for v in entry["data_by_key"].values())
+    return f"{entry.get('window_end')}_{total_s}"
+
+
+class SnapshotReader:
+    """One snapshot file, read incrementally from a byte offset."""
+
+    def __init__(self, path):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+
+    def replaced(self):
+        """True if the file was swapped or truncated since the last read."""
+        st = os.stat(self.path)
+        return self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset)
+
+    def read(self):
+        """
+        Yield snapshots from the current offset to the end of the file,
+        advancing the offset line by line. A last line without its newline
+        is only consumed if it already parses (otherwise it is still being
+        written).
+        """
+        with open(self.path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset)
+            for raw in f:
+                entry = parse_line(raw)
+                if not raw.endswith(b"\n") and entry is None:
+                    return
+                self.offset += len(raw)
+                if entry is not None:
+                    yield entry
+
+    def scan(self):
+        """
+        Byte ranges [start, end) of the time-ordered runs from the current
+        offset to the end of the complete lines. Only timestamps are looked
+        at. Advances the offset past them; read_range() yields their snapshots.
+        """
+        runs = []
+        with open(self.path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset)
+            start = pos = self.offset
+            last = None
+            for raw in f:
+                if not raw.endswith(b"\n") and parse_line(raw) is None:
+                    break
+                ts = _peek_timestamp(raw)
+                if ts is not None:
+                    if last is not None and ts < last:
+                        runs.append((start, pos))
+                        start = pos
+                    last = ts
+                pos += len(raw)
+        if pos > start:
+            runs.append((start, pos))
+        self.offset = pos
+        return runs
+
+    def read_range(self, start, end):
+        """Yield the snapshots of the complete lines in [start, end)."""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            pos = start
+            while pos < end:
+                raw = f.readline()
+                if not raw:
+                    return
+                pos += len(raw)
+                entry = parse_line(raw)
+                if entry is not None:
+                    yield entry
+
+    def read_runs(self):
+        """Time-ordered snapshot streams for everything from the offset on."""
+        return [self.read_range(start, end) for start, end in self.scan()]
+
+
+def _timestamp(entry):
+    return entry["timestamp"]
+
+
+class Dedup:
+    """Signatures of the snapshots already emitted at the latest timestamp."""
+
+    def __init__(self):
+        self.timestamp = None
+        self.signatures = set()
+
+    def seen(self, entry):
+        """True if entry repeats an earlier snapshot; records it otherwise."""
+        if entry["timestamp"] != self.timestamp:
+            self.timestamp = entry["timestamp"]
+            self.signatures = set()
+        sig = signature(entry)
+        if sig in self.signatures and entry.get("window_end"):
+            return True
+        self.signatures.add(sig)
+        return False
+
+
+def merge(streams, dedup=None):
+    """
+    k-way merge of time-ordered snapshot streams. Duplicates are dropped
+    (`dedup` is a Dedup carried across calls; None disables dedup).
+    """
+    for entry in heapq.merge(*streams, key=_timestamp):
+        if dedup is not None and dedup.seen(entry):
+            continue
+        yield entry
+
+
+def batches(entries, size=BATCH_SIZE):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_snapshots(base_dir, dedup=True):
+    """All snapshots under base_dir in time order, streamed."""
+    streams = []
+    for _, path in session_files(base_dir):
+        streams.extend(SnapshotReader(path).read_runs())
+    return merge(streams, Dedup() if dedup else None)
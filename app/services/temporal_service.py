@@ -1,223 +1,518 @@
 import json
 import os
+import hashlib
 import math
+import threading
 import numpy as np
 from pathlib import Path
 
+from ..core import audit_cache
+from ..core.memo import MemoCache
+from . import snapshot_stream
+
+# Replicate series per null ensemble, and the draw budget per vectorized batch
+NULL_REPLICATES = 2000
+NULL_BATCH_VALUES = 4_000_000
+NULL_STATS = ("variance", "autocorr", "skew", "kurt")
+
+# Ensembles depend only on (n, p), so they never go stale; keyed by a hash of both
+NULL_CACHE = MemoCache("temporal_null", maxsize=128)
+
+# Shared series cache (same generation/manifest scheme as the audit column cache)
+CACHE_FORMAT = 1
+SERIES_DTYPES = {"n": np.int64, "s_n": np.int64, "p_s": np.float64,
+                 "expected": np.float64, "z": np.float64, "timestamp": np.str_}
+
+
+def _row_stats(z):
+    """variance/autocorr/skew/kurt of each row of z, as TemporalService computes them for one series."""
+    rows, length = z.shape
+    stats = {"variance": z.var(axis=1)}
+    if length < 5:
+        for name in NULL_STATS[1:]:
+            stats[name] = np.zeros(rows)
+        return stats
+    m = z.mean(axis=1, keepdims=True)
+    s = z.std(axis=1, keepdims=True)
+    flat = s[:, 0] == 0
+    u = np.divide(z - m, s, out=np.zeros_like(z), where=~flat[:, None])
+    stats["skew"] = np.where(flat, 0.0, (u ** 3).mean(axis=1))
+    stats["kurt"] = np.where(flat, 0.0, (u ** 4).mean(axis=1) - 3.0)
+    # Lag-1 Pearson correlation, like np.corrcoef(a[:-1], a[1:])
+    x = z[:, :-1] - z[:, :-1].mean(axis=1, keepdims=True)
+    y = z[:, 1:] - z[:, 1:].mean(axis=1, keepdims=True)
+    den = np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    r = np.divide((x * y).sum(axis=1), den, out=np.zeros(rows), where=den > 0)
+    stats["autocorr"] = np.where(flat, 0.0, r)
+    return stats
+
+
+def null_ensemble(n, p, replicates=NULL_REPLICATES):
+    """
+    Null distribution of the series statistics under IID Binomial(n, p)
+    hours: `replicates` z-score series drawn in batched vectorized calls.
+    Seeded from (n, p), so the same inputs give the same ensemble in every
+    process. Cached by that hash. Returns {stat: array}, plus "first" (the
+    first replicate series, used as the example IID realization).
+    """
+    n = np.ascontiguousarray(n, dtype=np.int64)
+    p = np.ascontiguousarray(p, dtype=np.float64)
+    digest = hashlib.sha1(n.tobytes() + p.tobytes() + str(replicates).encode()).hexdigest()
+
+    def compute():
+        rng = np.random.default_rng(int(digest[:16], 16))
+        expected = n * p
+        std = np.sqrt(n * p * (1 - p))
+        live = std > 0
+        batch = max(1, min(replicates, NULL_BATCH_VALUES // max(len(n), 1)))
+        parts, first = [], None
+        for start in range(0, replicates, batch):
+            draws = rng.binomial(n, p, size=(min(batch, replicates - start), len(n)))
+            z = np.divide(draws - expected, std, out=np.zeros(draws.shape), where=live)
+            if first is None:
+                first = z[0].copy()
+            parts.append(_row_stats(z))
+        out = {name: np.concatenate([part[name] for part in parts]) for name in NULL_STATS}
+        out["first"] = first
+        return out
+
+    return NULL_CACHE.get(digest, None, compute)
+
+
+def null_summary(null, observed):
+    """Quantiles of each null statistic and empirical p-values for the observed values."""
+    out = {"replicates": len(null["variance"])}
+    for name in NULL_STATS:
+        dist = null[name]
+        obs = observed[name]
+        total = len(dist) + 1
+        p_upper = (1 + int((dist >= obs).sum())) / total
+        p_lower = (1 + int((dist <= obs).sum())) / total
+        q = np.quantile(dist, [0.025, 0.5, 0.975]).tolist()
+        out[name] = {
+            "mean": float(dist.mean()),
+            "q025": q[0],
+            "median": q[1],
+            "q975": q[2],
+            "p_upper": p_upper,
+            "p_lower": p_lower,
+            "p_value": min(1.0, 2 * min(p_upper, p_lower))
+        }
+    return out
+
+
 class TemporalService:
-    def __init__(self, base_dir: str = "crawler/sessions"):
+    """
+    Real-vs-IID temporal gap analysis over the crawler's hourly snapshots.
+
+    Meant to be long-lived (see get_temporal_service()). Each session file
+    is tailed by byte offset, so a refresh parses only appended lines and
+    extends the delta and z-score series. Snapshots are never kept: a full
+    (re)build streams the k-way merge of all session files in batches
+    (snapshot_stream). Appends that land out of time order and
+    rewritten/truncated/removed files trigger such a rebuild.
+
+    The series and the tailing state are published to <base_dir>/.cache
+    as one memory-mapped generation, like the audit column cache. Under
+    `uvicorn --workers N` the first worker to see new lines extends and
+    publishes the series; the others map that generation and resume
+    tailing from its state, so the arrays exist once.
+    """
+
+    def __init__(self, base_dir: str = "crawler/sessions", cache_dir=None):
         self.base_dir = Path(base_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.base_dir / ".cache"
+        self._published = None  # cache generation the series currently match
         self._cache = {}
+        self._lock = threading.RLock()
+        self._readers = {}      # session dir -> SnapshotReader of its snapshot file
+        self._count = 0         # deduplicated snapshots consumed
+        self._last_ts = None    # timestamp of the latest consumed snapshot
+        self._dedup = snapshot_stream.Dedup()  # duplicates at the latest consumed timestamp
+        self._prev_data = None  # last non-empty data_by_key seen by the delta pass
+        self._series = {}       # key -> columnar deltas with their real z-scores
+        self._pending = {}      # key -> series chunks not yet concatenated into _series
+        self._generation = 0    # bumped whenever the series change
+        self._meta = {"source": "none", "sessions_total": 0, "sessions_relabel": 0, "sessions_original": 0}
+
+    def data_version(self):
+        """Version string for the snapshot files (paths, sizes, mtimes)."""
+        h = hashlib.sha1()
+        if self.base_dir.exists():
+            for root, _, files in sorted(os.walk(self.base_dir)):
+                for name in sorted(files):
+                    if name.startswith("hourly_snapshots") and name.endswith(".jsonl"):
+                        st = os.stat(os.path.join(root, name))
+                        h.update(f"{root}/{name}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+        return h.hexdigest()[:16]
 
     def get_temporal_gap_data(self, target_stars=None):
         if target_stars is None:
             target_stars = [12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22]
-            
-        raw_data, meta = self._load_all_data()
-        if not raw_data:
-            return {}
-
-        deltas_map = self._calculate_deltas(raw_data)
-        
-        result = {}
-        for key, deltas in deltas_map.items():
-            # Extract star level from key (e.g., no_event_catch_off_17)
-            try:
-                # Expecting format: {event}_{catch}_{star}
-                parts = key.split("_")
-                star = int(parts[-1])
-            except:
-                continue
-                
-            if star not in target_stars:
-                continue
 
-            # Calculate Real Z-scores
-            real_z = []
-            hourly_data = []
-            n_list = []
-            for d in deltas:
-                n = d["n"]
-                p = d["p_s"]
-                obs_s = d["s_n"]
-                exp_s = n * p
-                std = math.sqrt(n * p * (1 - p))
-                z = (obs_s - exp_s) / std if std > 0 else 0
-                
-                real_z.append(z)
-                n_list.append(n)
-                hourly_data.append({
-                    "timestamp": d["timestamp"],
-                    "n": n,
-                    "success": int(obs_s),
-                    "expected": float(exp_s),
-                    "z_score": float(z)
-                })
-
-            if len(real_z) < 2:
-                continue
+        with self._lock:
+            self.refresh()
+            if not self._count:
+                return {}
+            self._consolidate()
+            cache_key = (self._generation, tuple(target_stars))
+            if self._cache.get("key") == cache_key:
+                return self._cache["data"]
+
+            result = {}
+            for key, series in self._series.items():
+                # Extract star level from key (e.g., no_event_catch_off_17)
+                try:
+                    # Expecting format: {event}_{catch}_{star}
+                    parts = key.split("_")
+                    star = int(parts[-1])
+                except:
+                    continue
+
+                if star not in target_stars:
+                    continue
 
-            # Simulate IID Baseline
-            # For each hour, we sample from a Binomial(n, p)
-            iid_z = []
-            for d in deltas:
-                n = d["n"]
-                p = d["p_s"]
-                # Use numpy for binomial sampling
-                sim_s = np.random.binomial(n, p)
-                sim_exp = n * p
-                sim_std = math.sqrt(n * p * (1 - p))
-                sz = (sim_s - sim_exp) / sim_std if sim_std > 0 else 0
-                iid_z.append(float(sz))
-
-            result[str(star)] = {
-                "real": {
-                    "z_scores": [float(z) for z in real_z],
+                real_z = series["z"]
+                n = series["n"]
+                if len(real_z) < 2:
+                    continue
+                null = null_ensemble(n, series["p_s"])
+                iid_z = null["first"]
+                real_stats = {
                     "variance": float(np.var(real_z)),
                     "autocorr": float(self._autocorr(real_z)),
                     "skew": float(self._skewness(real_z)),
-                    "kurt": float(self._kurtosis(real_z)),
-                    "hourly": hourly_data
-                },
-                "iid": {
-                    "z_scores": iid_z,
-                    "variance": float(np.var(iid_z)),
-                    "autocorr": float(self._autocorr(iid_z)),
-                    "skew": float(self._skewness(iid_z)),
-                    "kurt": float(self._kurtosis(iid_z))
-                },
-                "summary": {
-                    "n_obs": len(real_z),
-                    "n_mean": float(np.mean(n_list)) if n_list else 0.0,
-                    "n_median": float(np.median(n_list)) if n_list else 0.0,
-                    "z_mean": float(np.mean(real_z)) if real_z else 0.0,
-                    "z_std": float(np.std(real_z)) if real_z else 0.0,
-                    "z_var": float(np.var(real_z)) if real_z else 0.0,
-                    "se_autocorr": float(1.0 / math.sqrt(len(real_z))) if len(real_z) > 0 else 0.0
+                    "kurt": float(self._kurtosis(real_z))
                 }
-            }
-            
-        result["_meta"] = meta
-        self._cache["data"] = result
-        return result
 
-    def _load_all_data(self):
-        all_entries = []
-        if not self.base_dir.exists():
-            return [], {"source": "none", "sessions_total": 0, "sessions_relabel": 0, "sessions_original": 0}
-            
-        # Prefer relabeled snapshots if present in a session folder
-        seen_snapshots = set()
-        sessions_total = 0
-        sessions_relabel = 0
-        sessions_original = 0
-        for root, _, _ in os.walk(self.base_dir):
-            relabeled = Path(root) / "hourly_snapshots_relabel.jsonl"
-            original = Path(root) / "hourly_snapshots.jsonl"
-            path = relabeled if relabeled.exists() else original
-            if not path.exists():
-                continue
-            sessions_total += 1
-            if relabeled.exists():
-                sessions_relabel += 1
+                hourly = [
+                    {"timestamp": ts, "n": dn, "success": ds, "expected": e, "z_score": z}
+                    for ts, dn, ds, e, z in zip(
+                        series["timestamp"].tolist(), n.tolist(), series["s_n"].tolist(),
+                        series["expected"].tolist(), real_z.tolist()
+                    )
+                ]
+                result[str(star)] = {
+                    "real": {
+                        "z_scores": real_z.tolist(),
+                        **real_stats,
+                        "hourly": hourly
+                    },
+                    "iid": {
+                        "z_scores": iid_z.tolist(),
+                        "variance": float(np.var(iid_z)),
+                        "autocorr": float(self._autocorr(iid_z)),
+                        "skew": float(self._skewness(iid_z)),
+                        "kurt": float(self._kurtosis(iid_z))
+                    },
+                    "null": null_summary(null, real_stats),
+                    "summary": {
+                        "n_obs": len(real_z),
+                        "n_mean": float(np.mean(n)),
+                        "n_median": float(np.median(n)),
+                        "z_mean": float(np.mean(real_z)),
+                        "z_std": float(np.std(real_z)),
+                        "z_var": float(np.var(real_z)),
+                        "se_autocorr": float(1.0 / math.sqrt(len(real_z)))
+                    }
+                }
+
+            result["_meta"] = dict(self._meta)
+            self._cache = {"key": cache_key, "data": result}
+            return result
+
+    def refresh(self):
+        """Read appended snapshot lines and extend the series. Returns True if anything changed."""
+        with self._lock:
+            if not self.base_dir.exists():
+                changed = self._tail()
             else:
-                sessions_original += 1
+                with audit_cache.locked(self.cache_dir):
+                    changed = self._refresh_shared()
+            if changed:
+                self._generation += 1
+            return changed
 
+    def _refresh_shared(self):
+        """Map the latest published generation, tail from its state and publish if it moved on."""
+        version = self.data_version()
+        manifest = audit_cache.read_manifest(self.cache_dir, CACHE_FORMAT)
+        attached = False
+        if manifest is not None and manifest["generation"] != self._published:
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                            if entry.get("data_by_key"):
-                                total_s = sum(v.get("success_count", 0) for v in entry["data_by_key"].values())
-                                sig = f"{entry.get('window_end')}_{total_s}"
-                                if sig in seen_snapshots and entry.get('window_end'):
-                                    continue
-                                seen_snapshots.add(sig)
-                                all_entries.append(entry)
-                        except:
-                            continue
-            except Exception as e:
-                print(f"Error reading {path}: {e}")
-                continue
-        
-        # Sort by timestamp globally
-        all_entries.sort(key=lambda x: x["timestamp"])
-        if sessions_relabel and sessions_original:
+                self._attach(manifest)
+                attached = True
+            except (OSError, ValueError, KeyError):
+                manifest = None
+        if manifest is not None and manifest["version"] == version:
+            return attached
+        changed = self._tail()
+        self._publish(version)
+        return changed or attached
+
+    def _tail(self):
+        """Tail (or rebuild from) the session files in this process. Returns True if anything changed."""
+        with self._lock:
+            sessions = snapshot_stream.session_files(self.base_dir)
+            self._meta = self._session_meta(sessions)
+            rebuild = not self._readers
+            readers = {}
+            for root, path in sessions:
+                reader = self._readers.get(root)
+                try:
+                    if reader is not None and (reader.path != path or reader.replaced()):
+                        # Switched to the relabeled file, or rewritten in place
+                        reader, rebuild = None, True
+                except OSError:
+                    reader, rebuild = None, True
+                readers[root] = reader or snapshot_stream.SnapshotReader(path)
+            if set(self._readers) - set(readers):
+                rebuild = True
+            self._readers = readers
+
+            changed = False
+            if not rebuild:
+                new = []
+                for root, reader in readers.items():
+                    try:
+                        new.extend(reader.read())
+                    except OSError as e:
+                        print(f"Error reading {reader.path}: {e}")
+                changed = bool(new)
+                rebuild = not self._append(new)
+            if rebuild:
+                changed = self._rebuild() or changed
+            return changed
+
+    def _publish(self, version):
+        """Write the series and tailing state as a new cache generation, then map it."""
+        self._consolidate()
+        keys, offset = [], 0
+        for key, series in self._series.items():
+            keys.append([key, offset, len(series["n"])])
+            offset += len(series["n"])
+        columns = {
+            name: np.concatenate([s[name] for s in self._series.values()]).astype(dtype, copy=False)
+            if self._series else np.empty(0, dtype=dtype)
+            for name, dtype in SERIES_DTYPES.items()
+        }
+        manifest = {
+            "format": CACHE_FORMAT,
+            "version": version,
+            "keys": keys,
+            "state": {
+                "readers": {root: [r.path, r.inode, r.offset] for root, r in self._readers.items()},
+                "count": self._count,
+                "last_ts": self._last_ts,
+                "dedup": [self._dedup.timestamp, sorted(self._dedup.signatures)],
+                "prev_data": self._prev_data,
+                "meta": self._meta
+            }
+        }
+        try:
+            manifest = audit_cache.write_generation(str(self.cache_dir), manifest, columns)
+        except OSError as e:
+            # Read-only checkout: keep serving the in-memory series
+            print(f"Temporal cache not written: {e}")
+            return
+        self._attach(manifest)
+
+    def _attach(self, manifest):
+        """Adopt a published generation: mapped series plus the state to keep tailing from."""
+        gen_dir = self.cache_dir / manifest["generation"]
+        columns = {name: np.load(gen_dir / f"{name}.npy", mmap_mode="r") for name in SERIES_DTYPES}
+        state = manifest["state"]
+        readers = {}
+        for root, (path, inode, offset) in state["readers"].items():
+            reader = readers[root] = snapshot_stream.SnapshotReader(path)
+            reader.inode, reader.offset = inode, offset
+        dedup = snapshot_stream.Dedup()
+        dedup.timestamp, dedup.signatures = state["dedup"][0], set(state["dedup"][1])
+
+        self._series = {
+            key: {name: col[start:start + rows] for name, col in columns.items()}
+            for key, start, rows in manifest["keys"]
+        }
+        self._pending = {}
+        self._readers = readers
+        self._count, self._last_ts, self._dedup = state["count"], state["last_ts"], dedup
+        self._prev_data, self._meta = state["prev_data"], state["meta"]
+        self._published = manifest["generation"]
+
+    def _append(self, new):
+        """
+        Extend the series with newly read snapshots. Returns False, changing
+        nothing, when they don't all come after the current history.
+        """
+        if not new:
+            return True
+        # Stable sort keeps walk order on ties, like the k-way merge
+        new.sort(key=lambda x: x["timestamp"])
+        if self._last_ts is not None and new[0]["timestamp"] <= self._last_ts:
+            return False
+        self._extend(list(snapshot_stream.merge([new], self._dedup)))
+        return True
+
+    def _rebuild(self):
+        """Recompute the series by streaming every session file from the start."""
+        had_data = bool(self._count)
+        for root, reader in self._readers.items():
+            self._readers[root] = snapshot_stream.SnapshotReader(reader.path)
+        self._count, self._last_ts, self._dedup = 0, None, snapshot_stream.Dedup()
+        self._series, self._pending, self._prev_data = {}, {}, None
+
+        streams = []
+        for reader in self._readers.values():
+            try:
+                streams.extend(reader.read_runs())
+            except OSError as e:
+                print(f"Error reading {reader.path}: {e}")
+        for batch in snapshot_stream.batches(snapshot_stream.merge(streams, self._dedup)):
+            self._extend(batch)
+        return had_data or bool(self._count)
+
+    def _extend(self, entries):
+        if not entries:
+            return
+        columns, self._prev_data = self._delta_columns(entries, self._prev_data)
+        for key, delta in columns.items():
+            # Placeholder keeps keys in order of their first delta
+            self._series.setdefault(key, None)
+            self._pending.setdefault(key, []).append(self._series_of(delta))
+        self._count += len(entries)
+        self._last_ts = entries[-1]["timestamp"]
+
+    def _consolidate(self):
+        """Concatenate pending chunks into the per-key series (once per change, not per batch)."""
+        for key, chunks in self._pending.items():
+            old = self._series.get(key)
+            parts = ([old] if old is not None else []) + chunks
+            self._series[key] = {k: np.concatenate([part[k] for part in parts]) for k in parts[0]}
+        self._pending = {}
+
+    @staticmethod
+    def _session_meta(sessions):
+        sessions_relabel = sum(1 for _, path in sessions if os.path.basename(path) == snapshot_stream.RELABELED)
+        sessions_original = len(sessions) - sessions_relabel
+        if not sessions:
+            source = "none"
+        elif sessions_relabel and sessions_original:
             source = "mixed"
         elif sessions_relabel:
             source = "relabel"
         else:
             source = "original"
-        meta = {
+        return {
             "source": source,
-            "sessions_total": sessions_total,
+            "sessions_total": len(sessions),
             "sessions_relabel": sessions_relabel,
             "sessions_original": sessions_original
         }
-        return all_entries, meta
+
+    @staticmethod
+    def _series_of(delta):
+        """Real z-scores for each delta, as the SERIES_DTYPES columns."""
+        n, p = delta["n"], delta["p_s"]
+        expected = n * p
+        std = np.sqrt(n * p * (1 - p))
+        z = np.zeros(len(n))
+        np.divide(delta["s_n"] - expected, std, out=z, where=std > 0)
+        return {"n": n, "s_n": delta["s_n"], "p_s": p, "expected": expected, "z": z,
+                "timestamp": np.array(delta["timestamp"], dtype=np.str_)}
+
+    def _load_all_data(self):
+        """All deduplicated snapshots in time order (read fresh), plus session meta."""
+        sessions = snapshot_stream.session_files(self.base_dir)
+        return list(snapshot_stream.iter_snapshots(self.base_dir)), self._session_meta(sessions)
 
     def _calculate_deltas(self, raw_data):
-        deltas_map = {}
-        prev_data = None
-        
-        for entry in raw_data:
-            curr_data = entry["data_by_key"]
-            curr_ts = entry["timestamp"]
-            
-            if prev_data:
-                for key, curr_vals in curr_data.items():
-                    if key not in prev_data: continue
-                    prev_vals = prev_data[key]
-                    
-                    # 1. 누적 데이터 역전 체크 (Data Glitch 방지)
-                    # 현재 값이 이전 값보다 작으면 '패치 리셋'이 아닐 경우(데이터 오염) 무시
-                    if curr_vals["success_count"] < prev_vals["success_count"] or \
-                       curr_vals["fail_count"] < prev_vals["fail_count"] or \
-                       curr_vals["boom_count"] < prev_vals["boom_count"]:
-                        # 넥슨 서버 리셋(50% 이상 폭락)이 아닌 미세한 감소는 글리치로 간주
-                        total_prev = prev_vals["success_count"] + prev_vals["fail_count"] + prev_vals["boom_count"]
-                        total_curr = curr_vals["success_count"] + curr_vals["fail_count"] + curr_vals["boom_count"]
-                        if total_curr < total_prev * 0.5:
-                            # 이건 패치 리셋으로 간주하고 현재 값을 Delta로 사용
-                            ds, df, db = curr_vals["success_count"], curr_vals["fail_count"], curr_vals["boom_count"]
-                        else:
-                            # 이건 데이터 오염(Glitch)이므로 건너뜀
-                            continue
-                    else:
-                        ds = curr_vals["success_count"] - prev_vals["success_count"]
-                        df = curr_vals["fail_count"] - prev_vals["fail_count"]
-                        db = curr_vals["boom_count"] - prev_vals["boom_count"]
-
-                    # 2. 확률 급변 체크 (설정 확률 p_s가 이전과 0.1% 이상 다르면 오염된 데이터로 간주)
-                    if abs(curr_vals["success_rate"] - prev_vals["success_rate"]) > 0.001:
-                        continue
-
-                    dn = ds + df + db
-                    if dn <= 0: continue
-                    
-                    # Store window_end if available for better temporal alignment
-                    window_end = curr_vals.get("window_end", curr_ts)
-                    
-                    if key not in deltas_map:
-                        deltas_map[key] = []
-                        
-                    deltas_map[key].append({
-                        "n": dn,
-                        "s_n": ds,
-                        "p_s": curr_vals["success_rate"],
-                        "timestamp": curr_ts,
-                        "window_end": window_end
-                    })
-            
-            # CRITICAL FIX: Only update prev_data if current snapshot is not empty
-            if curr_data and len(curr_data) > 0:
-                prev_data = curr_data
-                
-        return deltas_map
+        """{key: [delta dicts]} for the snapshots, in order of each key's first delta."""
+        columns, _ = self._delta_columns(raw_data, None)
+        return {
+            key: [
+                {"n": dn, "s_n": ds, "p_s": p, "timestamp": ts, "window_end": we}
+                for dn, ds, p, ts, we in zip(
+                    d["n"].tolist(), d["s_n"].tolist(), d["p_s"].tolist(), d["timestamp"], d["window_end"]
+                )
+            ]
+            for key, d in columns.items()
+        }
+
+    @staticmethod
+    def _pivot(snapshots):
+        """
+        Per key: the snapshot positions it appears at, its cumulative S/F/B
+        counts and success rate there, its window_end, and its place in the
+        snapshot's key order.
+        """
+        cols = {}
+        for i, (ts, data) in enumerate(snapshots):
+            for rank, (key, v) in enumerate(data.items()):
+                c = cols.get(key)
+                if c is None:
+                    c = cols[key] = ([], [], [], [], [], [], [])
+                c[0].append(i)
+                c[1].append(v["success_count"])
+                c[2].append(v["fail_count"])
+                c[3].append(v["boom_count"])
+                c[4].append(v["success_rate"])
+                c[5].append(v.get("window_end", ts))
+                c[6].append(rank)
+        return cols
+
+    def _delta_columns(self, raw_data, prev_data):
+        """
+        Per-key deltas of consecutive snapshots as arrays (n, s_n, p_s) plus
+        timestamp/window_end lists, keyed in order of each key's first delta.
+        prev_data is the data_by_key before raw_data (None at the start).
+        Returns (columns, the new prev_data).
+        """
+        # Empty snapshots don't reset the previous one
+        snapshots = [(e["timestamp"], e["data_by_key"]) for e in raw_data if e["data_by_key"]]
+        if prev_data:
+            snapshots.insert(0, (None, prev_data))
+        first = 1 if prev_data else 0
+        if not snapshots:
+            return {}, prev_data
+
+        found = []
+        for key, (pos, s, f, b, rate, window_end, rank) in self._pivot(snapshots).items():
+            pos = np.array(pos)
+            s, f, b = (np.array(v, dtype=np.int64) for v in (s, f, b))
+            rate = np.array(rate, dtype=np.float64)
+            # Pairs (j-1, j) of consecutive snapshots that both hold the key
+            j = np.flatnonzero(pos[1:] == pos[:-1] + 1) + 1
+            if len(j) == 0:
+                continue
+            i = j - 1
+
+            # 1. 누적 데이터 역전 체크 (Data Glitch 방지)
+            # 현재 값이 이전 값보다 작으면 '패치 리셋'이 아닐 경우(데이터 오염) 무시
+            dropped = (s[j] < s[i]) | (f[j] < f[i]) | (b[j] < b[i])
+            # 넥슨 서버 리셋(50% 이상 폭락)은 현재 값을 Delta로 사용, 미세한 감소는 글리치로 간주
+            reset = dropped & ((s[j] + f[j] + b[j]) < (s[i] + f[i] + b[i]) * 0.5)
+            ds = np.where(reset, s[j], s[j] - s[i])
+            df = np.where(reset, f[j], f[j] - f[i])
+            db = np.where(reset, b[j], b[j] - b[i])
+            dn = ds + df + db
+
+            # 2. 확률 급변 체크 (설정 확률 p_s가 이전과 0.1% 이상 다르면 오염된 데이터로 간주)
+            keep = ~(dropped & ~reset) & ~(np.abs(rate[j] - rate[i]) > 0.001) & (dn > 0)
+            if not keep.any():
+                continue
+            j = j[keep]
+            found.append((pos[j[0]], rank[j[0]], key, {
+                "n": dn[keep],
+                "s_n": ds[keep],
+                "p_s": rate[j],
+                "timestamp": [snapshots[k][0] for k in pos[j].tolist()],
+                # Store window_end if available for better temporal alignment
+                "window_end": [window_end[k] for k in j.tolist()]
+            }))
+
+        found.sort(key=lambda x: (x[0], x[1]))
+        columns = {key: delta for _, _, key, delta in found}
+        return columns, snapshots[-1][1] if len(snapshots) > first else prev_data
 
     def _autocorr(self, x):
         if len(x) < 5: return 0.0
@@ -240,3 +535,17 @@ class TemporalService:
         s = np.std(a)
         if s == 0: return 0.0
         return np.mean(((a - m) / s) ** 4) - 3.0
+
+
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_temporal_service():
+    """Process-wide TemporalService, so tailed offsets and series persist across requests."""
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = TemporalService()
+    return _SERVICE
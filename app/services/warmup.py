@@ -0,0 +1,51 @@
+"""
+Optional start-up warm-up (STARFORCE_WARMUP=1).
+
+Heavy imports are deferred until first use so the app starts quickly; this
+pays them in a background thread right after start-up instead of on the
+first request. Decks are built per request, so there is no deck cache to
+preload; a tiny /compare run covers the engine import and first-call costs.
+Warm-up runs with metrics.suppressed(), so it adds nothing to the engine,
+deck and cache counters.
+"""
+
+import threading
+import time
+
+from ..core import metrics
+
+
+def warm_audit():
+    from ..core.audit_engine import get_audit_snapshot, _scipy_stats
+    get_audit_snapshot()
+    _scipy_stats()
+
+
+def warm_simulator():
+    from ..core.config import PROB, COST_TABLE
+    from ..core.utils import fair_expectations
+    from ..models.schemas import CompareRequest
+    from ..services.simulation_service import SimulationService
+
+    fair_expectations(PROB, COST_TABLE)
+    SimulationService().run_compare(CompareRequest(users=10, total_tries=10))
+
+
+def run_warmup(routers):
+    start = time.perf_counter()
+    steps = [warm_audit] if "audit" in routers else []
+    if "simulator" in routers:
+        steps.append(warm_simulator)
+    for step in steps:
+        try:
+            with metrics.suppressed():
+                step()
+        except Exception as e:
+            print(f"Warm-up step {step.__name__} failed: {e}")
+    print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+def start_warmup(routers):
+    thread = threading.Thread(target=run_warmup, args=(routers,), name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,252 @@
+import atexit
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+import multiprocessing as mp
+from dataclasses import asdict
+
+from ..core import metrics
+from ..core.config import MAX_WORKERS
+from .sim_summary import SimSummary
+
+
+# Local stand-in for a multi-host cluster: one coordinator, N worker
+# processes, plain-JSON task/summary messages over multiprocessing queues.
+# Each worker has its own inbox so the coordinator always knows which shard
+# a worker holds; if the process dies the shard is re-queued on a fresh one.
+# Shard ids on the wire carry a per-run token, so messages left over from an
+# aborted run never match a later one.
+#
+# Workers record no metrics: their registry would never reach /metrics. The
+# coordinator records engine and deck metrics from the merged summaries and
+# the shard timings instead.
+
+MAX_ATTEMPTS = 3
+SHARDS_PER_WORKER = 4
+RUN_TIMEOUT = float(os.environ.get("STARFORCE_WORKER_TIMEOUT") or 600)  # seconds per run()
+
+
+def run_shard(task):
+    """Runs one shard and returns its mergeable summary (worker side)."""
+    import starforce_sim_core as cpp_engine
+    from ..core.config import PROB
+    from ..models.schemas import CompareRequest
+    from .simulation_service import SimulationService, RunDeckConfig
+
+    random.seed(task["seed"])
+    req = CompareRequest(**task["request"])
+    users, runs = task["users"], task["runs_per_user"]
+    draws = builds = wraps = 0
+
+    if task["phase"] == "fair":
+        results = cpp_engine.simulate_fair_cpp(users, runs, PROB, task["seed"])[0]
+    elif task["phase"] == "markov":
+        results = cpp_engine.simulate_markov_cpp(
+            users, runs, PROB, float(req.markov_rho), task["seed"]
+        )[0]
+    else:
+        cfg = RunDeckConfig(**task["cfg"])
+        cfg_b = RunDeckConfig(**task["cfg_b"]) if task.get("cfg_b") else None
+        results, draws, builds, wraps = SimulationService()._run_rigged_simulation(
+            req, cfg, cfg, cfg_b, users, runs
+        )
+
+    return {
+        "summary": SimSummary().add(results).to_dict(),
+        "deck_stats": [draws, builds, wraps]
+    }
+
+
+def _worker_main(inbox, outbox):
+    pid = os.getpid()
+    while True:
+        task = inbox.get()
+        if task is None:
+            break
+        outbox.put(("started", task["shard_id"], pid, None))
+        t0 = time.perf_counter()
+        try:
+            with metrics.suppressed():
+                payload = run_shard(task)
+            payload["elapsed"] = time.perf_counter() - t0
+            outbox.put(("done", task["shard_id"], pid, payload))
+        except Exception as e:
+            outbox.put(("error", task["shard_id"], pid, repr(e)))
+
+
+class WorkerCluster:
+    """
+    Pool of up to `size` persistent worker processes with shard restart on
+    worker loss. A run uses the first `workers` slots; slots are spawned on
+    first use and then kept, so runs of different widths share the pool.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self._ctx = mp.get_context("spawn")
+        self._outbox = self._ctx.Queue()
+        self._slots = [None] * self.size
+        self._lock = threading.Lock()
+        self._runs = itertools.count(1)
+        self.restarts = 0
+
+    def _spawn(self):
+        inbox = self._ctx.Queue()
+        proc = self._ctx.Process(target=_worker_main, args=(inbox, self._outbox), daemon=True)
+        proc.start()
+        return {"proc": proc, "inbox": inbox, "shard": None}
+
+    def run(self, tasks, workers=None, timeout=RUN_TIMEOUT):
+        """
+        Executes tasks (dicts with a unique shard_id) on `workers` slots
+        (default: all) and returns {shard_id: payload}. Payloads carry
+        elapsed, worker_pid and attempts. Raises RuntimeError on a failed
+        shard and TimeoutError after `timeout` seconds; workers still busy
+        with the run are replaced.
+        """
+        workers = max(1, min(self.size, int(workers or self.size)))
+        with self._lock:
+            try:
+                return self._run(tasks, workers, timeout)
+            except BaseException:
+                self._recycle_busy()
+                raise
+
+    def _run(self, tasks, workers, timeout):
+        token = next(self._runs)
+        deadline = time.monotonic() + timeout
+        # Wire id -> task; the caller's shard_id is restored in the result
+        by_id = {f"{token}/{t['shard_id']}": {**t, "shard_id": f"{token}/{t['shard_id']}"}
+                 for t in tasks}
+        pending = list(by_id.values())
+        attempts = {sid: 0 for sid in by_id}
+        done = {}
+
+        while len(done) < len(by_id):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Worker run timed out after {timeout:g}s "
+                                   f"({len(done)}/{len(by_id)} shards done)")
+            for i in range(workers):
+                slot = self._slots[i]
+                if slot is None:
+                    self._slots[i] = slot = self._spawn()
+                elif not slot["proc"].is_alive():
+                    lost = slot["shard"]
+                    self._slots[i] = slot = self._spawn()
+                    self.restarts += 1
+                    if lost in by_id and lost not in done:
+                        if attempts[lost] >= MAX_ATTEMPTS:
+                            raise RuntimeError(f"Shard {lost} failed {attempts[lost]} times (worker lost)")
+                        pending.insert(0, by_id[lost])
+                if slot["shard"] is None and pending:
+                    task = pending.pop(0)
+                    attempts[task["shard_id"]] += 1
+                    slot["shard"] = task["shard_id"]
+                    slot["inbox"].put(task)
+
+            try:
+                kind, sid, pid, payload = self._outbox.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            slot = next((s for s in self._slots if s is not None and s["shard"] == sid), None)
+            if kind == "started" or slot is None or sid not in by_id:
+                # Stale messages from a replaced worker or an earlier run are ignored
+                continue
+            slot["shard"] = None
+            if kind == "error":
+                raise RuntimeError(f"Shard {sid} failed: {payload}")
+            payload["worker_pid"] = pid
+            payload["attempts"] = attempts[sid]
+            done[sid] = payload
+        return {by_id[sid]["shard_id"].split("/", 1)[1]: payload for sid, payload in done.items()}
+
+    def _recycle_busy(self):
+        """Replaces workers still holding a shard of an aborted run."""
+        for i, slot in enumerate(self._slots):
+            if slot is not None and slot["shard"] is not None:
+                slot["proc"].terminate()
+                slot["proc"].join(timeout=2)
+                self._slots[i] = self._spawn()
+                self.restarts += 1
+
+    def shutdown(self):
+        slots = [slot for slot in self._slots if slot is not None]
+        for slot in slots:
+            try:
+                slot["inbox"].put(None)
+            except Exception:
+                pass
+        for slot in slots:
+            slot["proc"].join(timeout=2)
+            if slot["proc"].is_alive():
+                slot["proc"].terminate()
+        self._slots = [None] * self.size
+
+
+_CLUSTER = None
+_CLUSTER_LOCK = threading.Lock()
+
+
+def get_cluster():
+    """Process-wide pool sized MAX_WORKERS; requests pick their width per run."""
+    global _CLUSTER
+    if _CLUSTER is None:
+        with _CLUSTER_LOCK:
+            if _CLUSTER is None:
+                _CLUSTER = WorkerCluster(MAX_WORKERS)
+    return _CLUSTER
+
+
+@atexit.register
+def _shutdown_cluster():
+    if _CLUSTER is not None:
+        _CLUSTER.shutdown()
+
+
+def split_users(users, shards):
+    shards = max(1, min(users, shards))
+    base, extra = divmod(users, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def run_sharded_phase(cluster, phase, req, users, runs_per_user, cfg=None, cfg_b=None):
+    """
+    Shards one world across req.workers slots of the cluster and merges the
+    worker summaries. Returns (SimSummary, deck_stats, shard timing rows,
+    wall seconds).
+    """
+    t0 = time.time()
+    workers = min(cluster.size, int(req.workers))
+    tasks = []
+    for i, n in enumerate(split_users(users, workers * SHARDS_PER_WORKER)):
+        tasks.append({
+            "shard_id": f"{phase}-{i}",
+            "phase": phase,
+            "users": n,
+            "runs_per_user": runs_per_user,
+            "seed": random.randint(0, 1000000),
+            "request": req.model_dump(),
+            "cfg": asdict(cfg) if cfg is not None else None,
+            "cfg_b": asdict(cfg_b) if cfg_b is not None else None,
+        })
+    done = cluster.run(tasks, workers)
+
+    summary = SimSummary()
+    deck_stats = [0, 0, 0]
+    shards = []
+    for task in tasks:
+        payload = done[task["shard_id"]]
+        summary.merge(SimSummary.from_dict(payload["summary"]))
+        deck_stats = [a + b for a, b in zip(deck_stats, payload["deck_stats"])]
+        shards.append({
+            "shard": task["shard_id"],
+            "users": task["users"],
+            "elapsed": float(payload["elapsed"]),
+            "worker_pid": payload["worker_pid"],
+            "attempts": payload["attempts"]
+        })
+    return summary, deck_stats, shards, time.time() - t0
@@ -1,5 +1,11 @@
+import { fetchColumnar, readPayload } from '../modules/columnar.js';
+
 const API_BASE = '/api/audit';
 
+// POST responses are not cached by the browser, so bundles are revalidated by hand:
+// payload key -> { etag, data }, answered from here on 304 Not Modified.
+const bundleCache = new Map();
+
 export const api = {
     async fetchMeta() {
         const res = await fetch(`${API_BASE}/meta`);
@@ -7,12 +13,18 @@ export const api = {
     },
 
     async fetchBundle(payload) {
-        const res = await fetch(`${API_BASE}/bundle`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(payload)
-        });
-        return await res.json();
+        const body = JSON.stringify(payload);
+        const cached = bundleCache.get(body);
+        const headers = { 'Content-Type': 'application/json' };
+        if (cached) headers['If-None-Match'] = cached.etag;
+
+        const res = await fetchColumnar(`${API_BASE}/bundle`, { method: 'POST', headers, body });
+        if (res.status === 304 && cached) return cached.data;
+
+        const data = await readPayload(res);
+        const etag = res.headers.get('ETag');
+        if (res.ok && etag) bundleCache.set(body, { etag, data });
+        return data;
     },
 
     async fetchSeasonContrast(payload, date = null) {
@@ -1,4 +1,5 @@
 import { state } from './state.js';
+import { fetchColumnar, readPayload } from '../modules/columnar.js';
 
 export const gapAnalysis = {
     data: null,
@@ -6,9 +7,9 @@ export const gapAnalysis = {
         console.log(`[GapAnalysis] Fetching data for ${star}*`);
         try {
             if (!this.data) {
-                const res = await fetch('/api/audit/temporal-gap');
+                const res = await fetchColumnar('/api/audit/temporal-gap');
                 if (!res.ok) throw new Error(`HTTP ${res.status}`);
-                this.data = await res.json();
+                this.data = await readPayload(res);
                 console.log('[GapAnalysis] Data loaded:', Object.keys(this.data));
             }
             this.render(star);
@@ -45,7 +46,9 @@ export const gapAnalysis = {
         const distEl = document.getElementById('gapDistance');
         if (distEl) {
             const dist = Math.abs(starData.real.autocorr - starData.iid.autocorr);
-            distEl.innerHTML = `<span>${(dist * 100).toFixed(1)}% Deviation</span>`;
+            // Empirical p-value of the observed autocorr against the IID null ensemble
+            const pAuto = starData.null ? ` (p=${starData.null.autocorr.p_value.toFixed(3)})` : '';
+            distEl.innerHTML = `<span>${(dist * 100).toFixed(1)}% Deviation${pAuto}</span>`;
         }
 
         // Render Time Series
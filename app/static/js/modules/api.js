@@ -1,11 +1,13 @@
+import { fetchColumnar, readPayload } from './columnar.js';
 
 /**
  * Fetches simulation comparison results from the server.
+ * Asks for the columnar binary format; the decoded result has the JSON shape.
  * @param {Object} payload - The simulation configuration payload.
  * @returns {Promise<Object>} - The simulation results.
  */
 export async function fetchCompareSimulation(payload) {
-    const res = await fetch('/compare', {
+    const res = await fetchColumnar('/compare', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload)
@@ -14,5 +16,67 @@ export async function fetchCompareSimulation(payload) {
         const txt = await res.text();
         throw new Error(txt || `HTTP ${res.status}`);
     }
-    return await res.json();
+    return await readPayload(res);
+}
+
+/**
+ * Runs /compare/stream and dispatches its server-sent events.
+ * POST bodies rule out EventSource, so the stream is read with fetch.
+ * @param {Object} payload - The simulation configuration payload.
+ * @param {Object} handlers - { onStarted({run_id}), onSnapshot({phase, done, total, snapshot}) }.
+ * @param {number} batchSize - Sessions per snapshot.
+ * @returns {Promise<Object>} - The final /compare payload (with `stopped`).
+ */
+export async function streamCompareSimulation(payload, handlers = {}, batchSize = 2000) {
+    const res = await fetch(`/compare/stream?batch_size=${batchSize}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify(payload)
+    });
+    if (!res.ok) {
+        const txt = await res.text();
+        throw new Error(txt || `HTTP ${res.status}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+
+    const dispatch = (frame) => {
+        let event = 'message';
+        const data = [];
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+        });
+        if (!data.length) return;
+        const body = JSON.parse(data.join('\n'));
+        if (event === 'started') handlers.onStarted?.(body);
+        else if (event === 'snapshot') handlers.onSnapshot?.(body);
+        else if (event === 'result') result = body;
+        else if (event === 'error') throw new Error(body.detail || 'Simulation failed');
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let idx;
+        while ((idx = buffer.indexOf('\n\n')) >= 0) {
+            dispatch(buffer.slice(0, idx));
+            buffer = buffer.slice(idx + 2);
+        }
+    }
+    if (buffer.trim()) dispatch(buffer);
+    if (!result) throw new Error('Stream ended without a result');
+    return result;
+}
+
+/**
+ * Asks the server to stop a streaming run; its result covers the sessions finished so far.
+ * @param {string} runId - The run id from the `started` event.
+ */
+export async function stopCompareStream(runId) {
+    await fetch(`/compare/stream/${runId}/stop`, { method: 'POST' });
 }
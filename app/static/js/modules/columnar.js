@@ -0,0 +1,96 @@
+/**
+ * Decoder for the columnar binary payloads (application/vnd.starforce.columnar).
+ * Layout and column types are documented in app/core/columnar.py.
+ * Column buffers are 8-byte aligned, so they map straight onto typed arrays
+ * (little-endian hosts, i.e. every browser in practice).
+ */
+export const COLUMNAR_MEDIA_TYPE = 'application/vnd.starforce.columnar';
+
+const MAGIC = 'SFC1';
+
+/**
+ * @param {ArrayBuffer} buffer - The response body.
+ * @param {Object} options - { rows: true } rebuilds arrays of objects (same shape as the JSON
+ *   response); { rows: false } leaves tables as { length, columns: { name: TypedArray|Array } }.
+ * @returns {Object} - The decoded payload.
+ */
+export function decodeColumnar(buffer, { rows = true } = {}) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== MAGIC) throw new Error('Not a columnar payload');
+
+    const headerLen = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLen)));
+    const base = 8 + headerLen + ((8 - ((8 + headerLen) % 8)) % 8);
+
+    const column = (col) => {
+        const start = base + (col.offset || 0);
+        switch (col.type) {
+            case 'json':
+                return col.values.map(restore);
+            case 'bool':
+                return Array.from(new Uint8Array(buffer, start, col.byteLength), v => v === 1);
+            case 'i32':
+                return new Int32Array(buffer, start, col.byteLength / 4);
+            case 'f64': {
+                const arr = new Float64Array(buffer, start, col.byteLength / 8);
+                return col.nullable ? Array.from(arr, v => (Number.isNaN(v) ? null : v)) : arr;
+            }
+            case 'dict': {
+                const codes = new Int32Array(buffer, start, col.byteLength / 4);
+                return Array.from(codes, c => (c < 0 ? null : col.dictionary[c]));
+            }
+            default:
+                throw new Error(`Unknown column type: ${col.type}`);
+        }
+    };
+
+    const table = (t) => {
+        const cols = t.columns.map(c => [c.name, column(c)]);
+        if (!rows) return { length: t.length, columns: Object.fromEntries(cols) };
+        const out = new Array(t.length);
+        for (let i = 0; i < t.length; i++) {
+            const row = {};
+            for (const [name, values] of cols) row[name] = values[i];
+            out[i] = row;
+        }
+        return out;
+    };
+
+    function restore(node) {
+        if (Array.isArray(node)) return node.map(restore);
+        if (node && typeof node === 'object') {
+            const keys = Object.keys(node);
+            if (keys.length === 1 && keys[0] === '$table') return table(header.tables[node.$table]);
+            if (keys.length === 1 && keys[0] === '$array') {
+                const arr = column(header.arrays[node.$array]);
+                return rows ? Array.from(arr) : arr;
+            }
+            const out = {};
+            for (const k of keys) out[k] = restore(node[k]);
+            return out;
+        }
+        return node;
+    }
+
+    return restore(header.root);
+}
+
+/**
+ * fetch() that asks for the columnar format and falls back to JSON when the
+ * server answers with JSON (older servers, endpoints without negotiation).
+ * @returns {Promise<Response>} - The raw response.
+ */
+export function fetchColumnar(url, init = {}) {
+    const headers = { ...(init.headers || {}), 'Accept': `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9` };
+    return fetch(url, { ...init, headers });
+}
+
+/**
+ * Parses a response from fetchColumnar into the usual JSON-shaped object.
+ */
+export async function readPayload(res) {
+    const type = res.headers.get('Content-Type') || '';
+    if (type.startsWith(COLUMNAR_MEDIA_TYPE)) return decodeColumnar(await res.arrayBuffer());
+    return await res.json();
+}
@@ -1,11 +1,14 @@
 
-import { fetchCompareSimulation } from './api.js';
+import { streamCompareSimulation, stopCompareStream } from './api.js';
 import { ChartManager } from './charts.js';
 import { autoCap } from './utils.js';
 import { updateDisplayRangeUI, renderAuditTable, renderStats, buildBoxOptions, renderStrategyBox } from './ui.js';
 
 const chartManager = new ChartManager();
 
+// Streaming run in flight ({ runId }); the run button stops it.
+let activeRun = null;
+
 // --- Input Helpers ---
 const el = (id) => document.getElementById(id);
 const val = (id) => el(id)?.value;
@@ -240,14 +243,39 @@ function updateTrimUI() {
     }
 }
 
+function emptyWorld() {
+    return {
+        s_var: 0, f_var: 0, b_var: 0, max_f: 0, max_s: 0, max_b: 0,
+        level_stats: {}, histogram: [], s_histogram: [], b_histogram: [], m_histogram: [],
+        avg_cost: 0, cost_var: 0, avg_clicks: 0, level_avg_tries: {}
+    };
+}
+
+// Renders a partial snapshot: charts and stats only, the audit table waits for the result.
+function renderPartial(partial, progress) {
+    const world = progress.phase === 'fair' ? 'fair' : 'rigged';
+    if (progress.snapshot) partial[world] = progress.snapshot;
+    partial.execution_time = (performance.now() - partial.started) / 1000;
+    chartManager.setData(partial);
+    renderStats(partial);
+    chartManager.updateComparisonChart();
+
+    const pct = progress.total ? Math.floor(progress.done / progress.total * 100) : 0;
+    el('run-btn').innerHTML = `STOP (${world} ${pct}%)`;
+}
+
 async function runSimulation() {
+    if (activeRun) {
+        if (activeRun.runId) await stopCompareStream(activeRun.runId);
+        return;
+    }
+
     const btn = el('run-btn');
     const loading = el('deck-loading');
     const mode = val('sim-mode');
 
-    btn.disabled = true;
-    btn.innerHTML = `Running...`;
-    btn.classList.add('opacity-50');
+    activeRun = {};
+    btn.innerHTML = `STOP`;
     if (loading) loading.classList.remove('hidden');
 
     try {
@@ -308,7 +336,17 @@ async function runSimulation() {
             payload.markov_rho = num('markov-rho', 0.0);
         }
 
-        const data = await fetchCompareSimulation(payload);
+        const partial = {
+            fair: emptyWorld(),
+            rigged: emptyWorld(),
+            simulation_count: payload.users * payload.runs_per_user,
+            execution_time: 0,
+            started: performance.now()
+        };
+        const data = await streamCompareSimulation(payload, {
+            onStarted: ({ run_id }) => { if (activeRun) activeRun.runId = run_id; },
+            onSnapshot: (progress) => renderPartial(partial, progress)
+        });
         chartManager.setData(data);
         chartManager.setFixedLengthMode(payload.fixed_length_mode);
         renderStats(data);
@@ -321,9 +359,8 @@ async function runSimulation() {
         alert("Error: " + e.message);
         console.error(e);
     } finally {
-        btn.disabled = false;
+        activeRun = null;
         btn.innerHTML = "RUN AUDIT";
-        btn.classList.remove('opacity-50');
         if (loading) loading.classList.add('hidden');
     }
 }
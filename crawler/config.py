@@ -1,6 +1,7 @@
 """
 크롤러 설정
 """
+import os
 from pathlib import Path
 
 # API 엔드포인트
@@ -17,9 +18,18 @@ METADATA_API = f"{BASE_API_URL}/pages/{PAGE_ID}"
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+# 파이프라인 단계별 소요 시간 (앱 /metrics 에서 노출)
+METRICS_FILE = DATA_DIR.parent / "sessions" / "crawler_metrics.json"
+
 # 스케줄 설정 (시간 단위)
 CRAWL_INTERVAL_HOURS = 1
 
 # 요청 설정
 REQUEST_TIMEOUT = 30000  # 30초
 PAGE_LOAD_WAIT = 15000   # 15초 (페이지 로드 대기)
+
+# 수집 방식: browser | auto (API 직접 요청, 실패 시 브라우저) | fetch
+# 직접 요청은 실제 메타데이터 응답으로 검증되기 전까지 명시적으로 선택할 때만 사용
+CRAWL_MODE = os.environ.get("STARFORCE_CRAWL_MODE", "browser")
+FETCH_CONCURRENCY = 16   # 직접 요청 모드 동시 요청 수 (커넥션 풀 크기)
+FETCH_RETRIES = 3        # /probs 요청별 재시도 횟수
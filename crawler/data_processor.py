@@ -2,6 +2,7 @@
 데이터 처리: 스냅샷 → Delta 변환 및 패치 세션 관리
 """
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -35,11 +36,15 @@ class HourlyDelta:
 class DeltaCalculator:
     """연속 스냅샷에서 시간별 증분 계산"""
     
+    TAIL_BLOCK = 64 * 1024  # 마지막 줄 역방향 탐색 단위
+    
     def __init__(self, session_dir: Path):
         self.session_dir = session_dir
         self.session_dir.mkdir(parents=True, exist_ok=True)
         self.snapshots_file = session_dir / "hourly_snapshots.jsonl"
         self.deltas_file = session_dir / "hourly_deltas.jsonl"
+        # 마지막 스냅샷 + 스냅샷 파일 크기/수정 시각 (세션이 커져도 재개 비용 일정)
+        self.state_file = session_dir / "hourly_snapshots.state.json"
         
         # 이전 스냅샷 캐시 (star_level -> previous data)
         self._previous: dict[str, dict] = {}
@@ -47,17 +52,69 @@ class DeltaCalculator:
         self._load_last_snapshot()
     
     def _load_last_snapshot(self):
-        """마지막 스냅샷 로드하여 delta 계산 준비"""
+        """
+        마지막 스냅샷 로드하여 delta 계산 준비
+        상태 파일이 스냅샷 파일과 일치하면 그것을, 아니면 파일 끝에서 마지막 줄만 읽음
+        """
         if not self.snapshots_file.exists():
             return
         
-        # 마지막 줄 읽기
-        with open(self.snapshots_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            if lines:
-                last = json.loads(lines[-1])
-                self._previous = last.get("data_by_key", {})
-                self._previous_window_end = last.get("window_end", "")
+        stat = self.snapshots_file.stat()
+        state = self._read_state()
+        if state and state.get("offset") == stat.st_size and state.get("mtime_ns") == stat.st_mtime_ns:
+            self._previous = state.get("data_by_key", {})
+            self._previous_window_end = state.get("window_end", "")
+            return
+        
+        # 상태 파일이 없거나 오래됨 (외부 수정 등): 마지막 줄 읽기 후 상태 재기록
+        line = self._read_last_line()
+        if line:
+            last = json.loads(line)
+            self._previous = last.get("data_by_key", {})
+            self._previous_window_end = last.get("window_end", "")
+            self._write_state()
+    
+    def _read_last_line(self) -> Optional[bytes]:
+        """스냅샷 파일의 마지막 비어 있지 않은 줄 (끝에서부터 블록 단위로 탐색)"""
+        with open(self.snapshots_file, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            tail = b""
+            pos = end
+            while pos > 0:
+                step = min(self.TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                stripped = tail.rstrip()
+                # 줄 전체가 블록 안에 들어왔으면 종료
+                if b"\n" in stripped or pos == 0:
+                    return stripped.rsplit(b"\n", 1)[-1] or None
+        return None
+    
+    def _read_state(self) -> Optional[dict]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_state(self):
+        """현재 마지막 스냅샷 상태를 스냅샷 파일 크기/수정 시각과 함께 기록"""
+        stat = self.snapshots_file.stat()
+        state = {
+            "offset": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "window_end": self._previous_window_end,
+            "data_by_key": self._previous
+        }
+        tmp = self.state_file.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp, self.state_file)
+        except OSError:
+            # 상태 파일은 캐시일 뿐: 쓰지 못하면 다음에 마지막 줄을 읽음
+            pass
     
     def process_crawl_result(self, crawl_result: dict) -> tuple[list[HourlyDelta], bool]:
         """
@@ -154,6 +211,7 @@ class DeltaCalculator:
         
         # 캐시 업데이트
         self._previous = current_data
+        self._write_state()
         
         return deltas, reset_detected
 
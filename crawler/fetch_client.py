@@ -0,0 +1,213 @@
+"""
+API 직접 요청 모드
+페이지 메타데이터의 AUTO_TABLE dataSources 로 /probs URL 을 구성하고
+커넥션 풀을 공유하는 비동기 클라이언트로 동시에 요청한다 (브라우저 불필요)
+"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from .config import (
+    BASE_API_URL,
+    PAGE_ID,
+    PAGE_URL,
+    REQUEST_TIMEOUT,
+    FETCH_CONCURRENCY,
+    FETCH_RETRIES
+)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Referer": PAGE_URL,
+    "Origin": "https://now.nexon.com",
+}
+
+# dataSources 항목의 키 이름 후보 → /probs 쿼리 파라미터
+SOURCE_PARAMS = {
+    "contentid": ("contentid", "contentId", "content_id"),
+    "trialid": ("trialid", "trialId", "trial_id"),
+    "probtableid": ("probtableid", "probTableId", "probtable_id"),
+}
+
+
+class FetchError(Exception):
+    """직접 요청 모드 실패 (브라우저 모드로 전환 대상)"""
+
+
+def unwrap(payload):
+    """{"code": 0, "data": {...}} 형태의 API 응답 본문 추출"""
+    if isinstance(payload, dict) and "code" in payload and isinstance(payload.get("data"), dict):
+        return payload["data"]
+    return payload
+
+
+def _first(obj: dict, *keys):
+    for key in keys:
+        if obj.get(key):
+            return obj[key]
+    return None
+
+
+def extract_paragraphs(data: dict) -> list:
+    """
+    메타데이터에서 모든 paragraphs 추출 (selectedSubPage / subPages / 단일 sub-page)
+    각 paragraph 에 소속 subPageId 를 채우고, 같은 id 는 한 번만 포함
+    """
+    data = unwrap(data) or {}
+    containers = [data]
+    if data.get("selectedSubPage"):
+        containers.append(data["selectedSubPage"])
+    containers.extend(data.get("subPages", []))
+
+    paragraphs, seen = [], set()
+    for sp in containers:
+        sub_page_id = _first(sp, "id", "subPageId") if sp is not data else None
+        for p in sp.get("paragraphs", []):
+            pid = _first(p, "id", "paragraphId")
+            if pid is not None and pid in seen:
+                continue
+            seen.add(pid)
+            if sub_page_id and not _first(p, "subPageId"):
+                p = {**p, "subPageId": sub_page_id}
+            paragraphs.append(p)
+    return paragraphs
+
+
+def probs_urls(paragraphs: list, page_api: str) -> list[str]:
+    """AUTO_TABLE paragraphs 의 dataSources → /probs URL (순서 유지, 중복 제거)"""
+    api_base = page_api.split("/pages/")[0]
+    urls = []
+    for p in paragraphs:
+        if p.get("type") != "AUTO_TABLE":
+            continue
+        sub_page_id = _first(p, "subPageId", "sub_page_id")
+        paragraph_id = _first(p, "id", "paragraphId")
+        for source in p.get("dataSources", []):
+            url = _first(source, "url", "probsUrl")
+            if url is None:
+                sub = _first(source, "subPageId") or sub_page_id
+                para = _first(source, "paragraphId") or paragraph_id
+                query = {name: _first(source, *keys) for name, keys in SOURCE_PARAMS.items()}
+                if not (sub and para) or None in query.values():
+                    continue
+                url = (f"{page_api}/sub-pages/{sub}/paragraphs/{para}/probs?"
+                       f"{urlencode(query)}")
+            elif url.startswith("/"):
+                url = f"{api_base}{url}"
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+class ProbsFetcher:
+    """메타데이터 → dataSources → /probs 동시 요청"""
+
+    def __init__(self, api_base: str = BASE_API_URL, page_id: str = PAGE_ID,
+                 concurrency: int = FETCH_CONCURRENCY, retries: int = FETCH_RETRIES):
+        self.api_base = api_base.rstrip("/")
+        self.page_id = page_id
+        self.concurrency = concurrency
+        self.retries = retries
+        self.metadata: Optional[dict] = None
+        self.paragraphs: list[dict] = []
+        self.failed: list[str] = []
+
+    @property
+    def page_api(self) -> str:
+        return f"{self.api_base}/pages/{self.page_id}"
+
+    async def fetch(self) -> list[dict]:
+        """prob_data 항목 리스트 (브라우저 모드와 같은 형식) 반환"""
+        limits = httpx.Limits(max_connections=self.concurrency,
+                              max_keepalive_connections=self.concurrency)
+        timeout = httpx.Timeout(REQUEST_TIMEOUT / 1000)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with httpx.AsyncClient(headers=HEADERS, limits=limits, timeout=timeout,
+                                     follow_redirects=True) as client:
+            self.metadata = await self._get_json(client, semaphore, self.page_api)
+            self.paragraphs = await self._collect_paragraphs(client, semaphore, self.metadata)
+            urls = self.probs_urls()
+            if not urls:
+                raise FetchError("메타데이터에 AUTO_TABLE dataSources 가 없습니다")
+
+            print(f"[{self._timestamp()}] /probs {len(urls)}건 동시 요청 (동시 {self.concurrency})")
+            results = await asyncio.gather(
+                *(self._get_prob(client, semaphore, url) for url in urls)
+            )
+
+        prob_data = [r for r in results if r is not None]
+        self.failed = [url for url, r in zip(urls, results) if r is None]
+        if not prob_data:
+            raise FetchError("/probs 응답을 하나도 받지 못했습니다")
+        if self.failed:
+            print(f"[{self._timestamp()}] /probs {len(self.failed)}건 실패")
+        return prob_data
+
+    async def _collect_paragraphs(self, client, semaphore, metadata) -> list:
+        """메타데이터의 paragraphs + paragraphs 가 빠진 sub-page 는 개별 조회"""
+        data = unwrap(metadata) or {}
+        paragraphs = extract_paragraphs(data)
+
+        missing = []
+        for sp in data.get("subPages", []):
+            sub_page_id = _first(sp, "id", "subPageId")
+            if sub_page_id and "paragraphs" not in sp:
+                missing.append(sub_page_id)
+        sub_pages = await asyncio.gather(
+            *(self._get_json(client, semaphore, f"{self.page_api}/sub-pages/{sp}")
+              for sp in missing),
+            return_exceptions=True
+        )
+        for sub_page_id, sub_page in zip(missing, sub_pages):
+            if isinstance(sub_page, Exception):
+                print(f"  [sub-page {sub_page_id}] 조회 실패: {sub_page}")
+                continue
+            for p in extract_paragraphs(sub_page):
+                paragraphs.append(p if _first(p, "subPageId") else {**p, "subPageId": sub_page_id})
+        return paragraphs
+
+    def probs_urls(self) -> list[str]:
+        return probs_urls(self.paragraphs, self.page_api)
+
+    async def _get_json(self, client, semaphore, url: str):
+        """GET + JSON 파싱 (일시적 오류는 지수 백오프 후 재시도)"""
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with semaphore:
+                    response = await client.get(url)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError, ValueError) as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if attempt == self.retries or not retryable:
+                    raise FetchError(f"{url}: {e}") from e
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+    async def _get_prob(self, client, semaphore, url: str) -> Optional[dict]:
+        try:
+            data = await self._get_json(client, semaphore, url)
+        except FetchError as e:
+            print(f"  [확률 데이터] 실패: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("code") not in (0, None):
+            print(f"  [확률 데이터] 오류 응답: {url}")
+            return None
+        return {
+            "url": url,
+            "data": data,
+            "captured_at": self._timestamp()
+        }
+
+    @staticmethod
+    def _timestamp() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
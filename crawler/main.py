@@ -10,39 +10,44 @@ from datetime import datetime
 # 상위 디렉토리를 path에 추가
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from crawler.config import DATA_DIR
-from crawler.nexon_crawler import run_crawler
+from crawler.config import DATA_DIR, BASE_API_URL, CRAWL_MODE
+from crawler.nexon_crawler import run_crawler, CRAWL_MODES
 from crawler.scheduler import run_scheduler
 from crawler.data_processor import DeltaCalculator, SessionManager
 from crawler.manipulation_detector import ManipulationDetector, run_analysis
+from crawler.metrics import stage
 
 
 # 세션 베이스 디렉토리
 SESSIONS_DIR = DATA_DIR.parent / "sessions"
 
 
-def crawl_and_process(headless: bool = True) -> dict:
+def crawl_and_process(headless: bool = True, mode: str = CRAWL_MODE,
+                      api_base: str = BASE_API_URL) -> dict:
     """크롤링 + 데이터 처리 실행 (자동 패치 감지)"""
     # 1. 크롤링
-    result = asyncio.run(run_crawler(headless=headless))
+    with stage("crawl"):
+        result = asyncio.run(run_crawler(headless=headless, mode=mode, api_base=api_base))
     
-    # 2. 세션 관리
-    session_mgr = SessionManager(SESSIONS_DIR)
-    session_dir = session_mgr.get_current_session()
-    
-    # 3. Delta 계산 (리셋 감지 포함)
-    processor = DeltaCalculator(session_dir)
-    deltas, reset_detected = processor.process_crawl_result(result)
+    with stage("process"):
+        # 2. 세션 관리
+        session_mgr = SessionManager(SESSIONS_DIR)
+        session_dir = session_mgr.get_current_session()
+        
+        # 3. Delta 계산 (리셋 감지 포함)
+        processor = DeltaCalculator(session_dir)
+        deltas, reset_detected = processor.process_crawl_result(result)
     
     # 4. 리셋 감지 시 새 세션 시작
     if reset_detected:
         print(f"\n🔄 패치 감지! 새 세션을 자동으로 시작합니다...")
-        new_session_name = datetime.now().strftime("patch_%Y%m%d_%H%M")
-        session_dir = session_mgr.start_new_session(new_session_name)
-        
-        # 새 세션에 현재 데이터를 첫 스냅샷으로 저장
-        new_processor = DeltaCalculator(session_dir)
-        new_processor.process_crawl_result(result)
+        with stage("new_session"):
+            new_session_name = datetime.now().strftime("patch_%Y%m%d_%H%M")
+            session_dir = session_mgr.start_new_session(new_session_name)
+            
+            # 새 세션에 현재 데이터를 첫 스냅샷으로 저장
+            new_processor = DeltaCalculator(session_dir)
+            new_processor.process_crawl_result(result)
         
         print(f"✅ 새 세션 생성: {new_session_name}")
     
@@ -117,6 +122,7 @@ def main():
 예시:
   python -m crawler.main                    # 1회 크롤링 + 처리 (브라우저 표시)
   python -m crawler.main --headless         # 1회 크롤링 + 처리 (백그라운드)
+  python -m crawler.main --mode fetch       # 브라우저 없이 API 직접 요청
   python -m crawler.main --schedule         # 스케줄러 모드 (1시간마다)
   python -m crawler.main --analyze          # 현재 세션 분석
   python -m crawler.main --new-session      # 새 패치 세션 시작
@@ -130,6 +136,20 @@ def main():
         help="브라우저 창 없이 실행"
     )
     
+    parser.add_argument(
+        "--mode",
+        choices=CRAWL_MODES,
+        default=CRAWL_MODE,
+        help="수집 방식: browser (기본) / auto (직접 요청, 실패 시 브라우저) / fetch"
+    )
+    
+    parser.add_argument(
+        "--api-base",
+        default=BASE_API_URL,
+        metavar="URL",
+        help="직접 요청 모드 API 주소 (로컬 스텁 서버 테스트용)"
+    )
+    
     parser.add_argument(
         "--schedule", 
         action="store_true",
@@ -169,7 +189,8 @@ def main():
         run_scheduler()
     else:
         # 기본: 1회 크롤링 + 처리
-        result = crawl_and_process(headless=args.headless)
+        result = crawl_and_process(headless=args.headless, mode=args.mode,
+                                   api_base=args.api_base)
         
         # 결과 요약 출력
         print(f"\n{'='*50}")
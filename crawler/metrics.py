@@ -0,0 +1,48 @@
+"""
+파이프라인 단계별 소요 시간 기록 (앱의 /metrics 에서 읽어감)
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from .config import METRICS_FILE
+
+
+def record_stage(stage: str, seconds: float, ok: bool):
+    """단계 1회 실행 결과를 상태 파일에 누적"""
+    try:
+        state = json.loads(METRICS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+
+    s = state.setdefault(stage, {"count": 0, "failures": 0, "total_seconds": 0.0})
+    s["count"] += 1
+    if not ok:
+        s["failures"] += 1
+    s["total_seconds"] += seconds
+    s["last_seconds"] = seconds
+    s["last_end"] = time.time()
+    s["last_end_iso"] = datetime.now().isoformat()
+
+    # 원자적 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+    METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = METRICS_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, METRICS_FILE)
+
+
+@contextmanager
+def stage(name: str):
+    """with stage("crawl"): ... 형태로 단계 소요 시간 측정"""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        try:
+            record_stage(name, time.perf_counter() - start, ok)
+        except Exception as e:
+            print(f"메트릭 기록 실패: {e}")
@@ -1,84 +1,210 @@
 """
 Nexon Now 스타포스 데이터 크롤러
-Playwright 기반으로 API 응답을 캡처하여 JSON으로 저장
+API 직접 요청(fetch) 또는 Playwright 로 API 응답을 캡처(browser)하여 JSON으로 저장
 """
-import json
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from playwright.async_api import async_playwright, Response
+from typing import Optional, TYPE_CHECKING
 
 from .config import (
     PAGE_URL, 
     METADATA_API, 
     BASE_API_URL,
-    DATA_DIR, 
     PAGE_LOAD_WAIT,
-    REQUEST_TIMEOUT
+    REQUEST_TIMEOUT,
+    CRAWL_MODE
 )
+from .raw_archive import RawArchive
+from .fetch_client import FetchError, ProbsFetcher, extract_paragraphs, probs_urls, unwrap
+
+if TYPE_CHECKING:
+    from playwright.async_api import Response
+
+CRAWL_MODES = ("auto", "fetch", "browser")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class BrowserSession:
+    """
+    Playwright 브라우저 컨텍스트 (첫 사용 시 실행, close() 전까지 재사용)
+    이미지/폰트/미디어 요청은 라우팅 단계에서 차단
+    """
+    BLOCKED_RESOURCES = ("image", "font", "media")
+    
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self.context = None
+    
+    async def new_page(self):
+        if self.context is None:
+            await self._launch()
+        return await self.context.new_page()
+    
+    async def _launch(self):
+        from playwright.async_api import async_playwright
+        
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self.context = await self._browser.new_context(user_agent=USER_AGENT)
+        await self.context.route("**/*", self._route)
+    
+    async def _route(self, route):
+        if route.request.resource_type in self.BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def close(self):
+        """브라우저 종료 (다음 new_page() 에서 다시 실행)"""
+        for closer in (self.context, self._browser):
+            if closer is not None:
+                try:
+                    await closer.close()
+                except Exception:
+                    pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._playwright = self._browser = self.context = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
 
 
 class StarforceCrawler:
     """넥슨 나우 스타포스 통계 크롤러"""
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, mode: str = CRAWL_MODE,
+                 api_base: str = BASE_API_URL, browser: Optional["BrowserSession"] = None):
+        if mode not in CRAWL_MODES:
+            raise ValueError(f"알 수 없는 수집 방식: {mode} ({', '.join(CRAWL_MODES)})")
         self.headless = headless
+        self.mode = mode
+        self.api_base = api_base
+        self.browser = browser
         self.metadata: Optional[dict] = None
+        self.paragraphs: Optional[list] = None
         self.prob_data: list[dict] = []
         
     async def crawl(self) -> dict:
         """
-        메인 크롤링 함수 (최대 3회 재시도)
+        메인 크롤링 함수
+        auto: API 직접 요청 → 실패하거나 일부 테이블이라도 빠지면 브라우저로 재수집
+        """
+        if self.mode in ("auto", "fetch"):
+            try:
+                await self._crawl_fetch()
+            except Exception as e:
+                print(f"[{self._timestamp()}] 직접 요청 실패: {e}")
+                if self.mode == "fetch":
+                    raise
+                print(f"[{self._timestamp()}] 브라우저 모드로 전환합니다")
+        
+        if not self.prob_data:
+            await self._crawl_browser()
+        
+        # 결과 구성
+        result = self._build_result()
+        # 저장
+        self._save_result(result)
+        
+        return result
+    
+    async def _crawl_fetch(self):
+        """메타데이터의 dataSources 로 /probs 를 동시 요청 (브라우저 없이)"""
+        fetcher = ProbsFetcher(api_base=self.api_base)
+        print(f"[{self._timestamp()}] API 직접 요청: {fetcher.page_api}")
+        prob_data = await fetcher.fetch()
+        # 일부만 받은 결과는 저장하지 않음 (빠진 키가 리셋 판정을 왜곡)
+        if fetcher.failed:
+            raise FetchError(f"/probs {len(fetcher.failed)}/{len(fetcher.failed) + len(prob_data)}건 실패")
+        self.prob_data = prob_data
+        self.metadata = fetcher.metadata
+        self.paragraphs = fetcher.paragraphs
+        print(f"[{self._timestamp()}] {len(self.prob_data)}개 테이블 수집 성공!")
+    
+    async def _crawl_browser(self):
+        """
+        Playwright 로 페이지를 열어 API 응답 캡처 (최대 3회 재시도)
+        스케줄러가 넘겨준 BrowserSession 이 있으면 그 컨텍스트를 재사용
         """
+        session = self.browser or BrowserSession(headless=self.headless)
         max_retries = 3
-        for attempt in range(1, max_retries + 1):
-            self.metadata = None
-            self.prob_data = []
-            
-            print(f"[{self._timestamp()}] 크롤링 시도 {attempt}/{max_retries}...")
-            
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=self.headless)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                )
-                page = await context.new_page()
-                page.on("response", self._handle_response)
+        try:
+            for attempt in range(1, max_retries + 1):
+                self.metadata = None
+                self.paragraphs = None
+                self.prob_data = []
+                self._expected = None
+                self._metadata_ready = asyncio.Event()
+                self._all_captured = asyncio.Event()
+                
+                print(f"[{self._timestamp()}] 크롤링 시도 {attempt}/{max_retries}...")
                 
                 try:
-                    await page.goto(PAGE_URL, timeout=REQUEST_TIMEOUT)
-                    # 대기 시간: 시도 횟수가 늘어날수록 조금 더 기다림
-                    wait_time = PAGE_LOAD_WAIT + (attempt - 1) * 5000
-                    await page.wait_for_timeout(wait_time)
-                    await self._scroll_page(page)
+                    page = await session.new_page()
+                    page.on("response", self._handle_response)
+                    try:
+                        await page.goto(PAGE_URL, timeout=REQUEST_TIMEOUT,
+                                        wait_until="domcontentloaded")
+                        # 대기 한도: 시도 횟수가 늘어날수록 조금 더 기다림
+                        wait_time = PAGE_LOAD_WAIT + (attempt - 1) * 5000
+                        await self._wait_for_tables(page, wait_time)
+                    finally:
+                        await page.close()
                     
                     # 데이터가 들어왔는지 확인
                     if len(self.prob_data) > 0:
                         print(f"[{self._timestamp()}] {len(self.prob_data)}개 테이블 수집 성공!")
-                        await browser.close()
                         break
                     else:
                         print(f"[{self._timestamp()}] 데이터 캡처 실패 (응답 없음)")
                         
                 except Exception as e:
                     print(f"[{self._timestamp()}] 에러 발생: {e}")
-                finally:
-                    await browser.close()
-            
-            if attempt < max_retries:
-                retry_wait = 5 * attempt
-                print(f"[{self._timestamp()}] {retry_wait}초 후 재시도합니다...")
-                await asyncio.sleep(retry_wait)
+                    # 브라우저가 죽었을 수 있으므로 다음 시도에서 새로 띄움
+                    await session.close()
+                
+                if attempt < max_retries:
+                    retry_wait = 5 * attempt
+                    print(f"[{self._timestamp()}] {retry_wait}초 후 재시도합니다...")
+                    await asyncio.sleep(retry_wait)
+        finally:
+            if self.browser is None:
+                await session.close()
+    
+    async def _wait_for_tables(self, page, timeout_ms: int):
+        """
+        메타데이터 테이블 수만큼 /probs 응답이 도착할 때까지 대기 (고정 sleep 없음)
+        메타데이터에서 기대 개수를 알 수 없으면 네트워크가 잠잠해질 때까지 대기
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        # lazy loading 테이블이 바로 요청되도록 끝까지 스크롤
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
         
-        # 결과 구성
-        result = self._build_result()
-        # 저장
-        self._save_result(result)
+        try:
+            await asyncio.wait_for(self._metadata_ready.wait(), deadline - loop.time())
+            if self._expected:
+                await asyncio.wait_for(self._all_captured.wait(), deadline - loop.time())
+                return
+        except asyncio.TimeoutError:
+            if self.prob_data:
+                print(f"[{self._timestamp()}] 대기 한도 도달: "
+                      f"{len(self.prob_data)}/{self._expected or '?'}개 수신")
+                return
         
-        return result
+        await self._scroll_page(page, max(deadline - loop.time(), 1.0))
     
-    async def _handle_response(self, response: Response):
+    async def _handle_response(self, response: "Response"):
         """API 응답 캡처 핸들러"""
         url = response.url
         
@@ -86,7 +212,9 @@ class StarforceCrawler:
             # 메타데이터 API
             if METADATA_API in url and "/sub-pages/" not in url:
                 self.metadata = await response.json()
-                print(f"  [메타데이터] 캡처됨")
+                self._expected = self._expected_probs(self.metadata)
+                print(f"  [메타데이터] 캡처됨 (테이블 {self._expected or '?'}개 예상)")
+                self._metadata_ready.set()
             
             # 확률 데이터 API (/probs)
             elif f"{BASE_API_URL}" in url and "/probs" in url:
@@ -98,25 +226,52 @@ class StarforceCrawler:
                     "captured_at": self._timestamp()
                 })
                 print(f"  [확률 데이터] 캡처됨 ({len(self.prob_data)}번째)")
+            
+            else:
+                return
+            if self._expected and len(self.prob_data) >= self._expected:
+                self._all_captured.set()
                 
         except Exception as e:
             # JSON 파싱 실패 등은 무시
             pass
     
-    async def _scroll_page(self, page):
-        """페이지 스크롤하여 lazy loading 콘텐츠 로드"""
+    @staticmethod
+    def _expected_probs(metadata: dict) -> int:
+        """페이지에 렌더링될 (선택된 sub-page 의) AUTO_TABLE dataSources 수"""
+        data = unwrap(metadata) or {}
+        selected = data.get("selectedSubPage")
+        paragraphs = extract_paragraphs(selected if selected else data)
+        if selected:
+            sub_page_id = selected.get("id") or selected.get("subPageId")
+            paragraphs = [p if p.get("subPageId") else {**p, "subPageId": sub_page_id}
+                          for p in paragraphs]
+        return len(probs_urls(paragraphs, METADATA_API))
+    
+    async def _scroll_page(self, page, timeout: float):
+        """페이지 스크롤하여 lazy loading 콘텐츠 로드 (네트워크가 잠잠해질 때까지)"""
         print(f"[{self._timestamp()}] 페이지 스크롤 중...")
         
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         for i in range(5):
             await page.evaluate("window.scrollBy(0, 800)")
-            await page.wait_for_timeout(1000)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await page.wait_for_load_state("networkidle", timeout=remaining * 1000)
+            except Exception:
+                break
     
     def _build_result(self) -> dict:
         """크롤링 결과 구성"""
         # 메타데이터에서 테이블 정보 추출
         tables = []
-        if self.metadata:
-            paragraphs = self._extract_paragraphs(self.metadata)
+        paragraphs = self.paragraphs
+        if paragraphs is None and self.metadata:
+            paragraphs = extract_paragraphs(self.metadata)
+        if paragraphs:
             for p in paragraphs:
                 if p.get("type") == "AUTO_TABLE":
                     tables.append({
@@ -136,44 +291,25 @@ class StarforceCrawler:
             }
         }
     
-    def _extract_paragraphs(self, data: dict) -> list:
-        """메타데이터에서 모든 paragraphs 추출 (중첩 구조 처리)"""
-        paragraphs = []
-        
-        # selectedSubPage에서 추출
-        if "selectedSubPage" in data:
-            paragraphs.extend(data["selectedSubPage"].get("paragraphs", []))
-        
-        # subPages 배열에서 추출
-        if "subPages" in data:
-            for sp in data["subPages"]:
-                paragraphs.extend(sp.get("paragraphs", []))
-        
-        return paragraphs
-    
     def _save_result(self, result: dict):
-        """결과를 JSON 파일로 저장"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = DATA_DIR / f"starforce_{timestamp}.json"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
-        
-        print(f"[{self._timestamp()}] 저장 완료: {filename}")
+        """결과를 원본 아카이브에 저장 (같은 내용은 한 번만, LATEST 는 포인터)"""
+        entry, stored = RawArchive().append(result)
         
-        # 최신 데이터 심볼릭 링크/복사
-        latest_file = DATA_DIR / "latest.json"
-        with open(latest_file, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        note = "새 내용" if stored else "이전과 같은 내용, index 만 추가"
+        print(f"[{self._timestamp()}] 저장 완료: {entry['segment']} "
+              f"({entry['hash'][:12]}, {note})")
     
     @staticmethod
     def _timestamp() -> str:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-async def run_crawler(headless: bool = True) -> dict:
-    """크롤러 실행 헬퍼 함수"""
-    crawler = StarforceCrawler(headless=headless)
+async def run_crawler(headless: bool = True, mode: str = CRAWL_MODE,
+                      api_base: str = BASE_API_URL,
+                      browser: Optional[BrowserSession] = None) -> dict:
+    """크롤러 실행 헬퍼 함수 (browser: 재사용할 BrowserSession)"""
+    crawler = StarforceCrawler(headless=headless, mode=mode, api_base=api_base,
+                               browser=browser)
     return await crawler.crawl()
 
 
@@ -0,0 +1,243 @@
+"""
+크롤링 원본 결과 아카이브 (내용 주소 기반 gzip 세그먼트)
+
+archive/
+  segments/YYYYMM.gz   gzip 멤버를 이어 붙인 월별 세그먼트 (고유 내용 1건 = 멤버 1개)
+  index.jsonl          크롤링 1회 = 1줄 (timestamp, window_end, hash, 세그먼트 위치, captured_at)
+  LATEST               최신 index 항목 (사본이 아닌 포인터)
+
+같은 내용(페이지 URL, 테이블 메타데이터, /probs URL 및 응답)은 해시로 한 번만 저장하고
+수집 시각(crawled_at, captured_at)만 index 에 남긴다. load() 로 원래 결과 dict 를 복원한다.
+
+사용 예:
+  python -m crawler.raw_archive import crawler/data/starforce_*.json [--prune]
+  python -m crawler.raw_archive list
+  python -m crawler.raw_archive show latest
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: 동시 실행 잠금 없이 기록
+    fcntl = None
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crawler.config import DATA_DIR
+
+ARCHIVE_DIR = DATA_DIR / "archive"
+INDEX = "index.jsonl"
+LATEST = "LATEST"
+LOCK = ".lock"
+
+
+def window_end(result: dict) -> str:
+    """첫 /probs 응답의 windowEnd (DeltaCalculator 의 중복 판정과 같은 기준)"""
+    prob_data = result.get("prob_data", [])
+    if prob_data:
+        probs = prob_data[0].get("data", {}).get("data", {}).get("probs", [])
+        if probs:
+            return probs[0].get("windowEnd") or ""
+    return ""
+
+
+def split_result(result: dict) -> tuple[bytes, list]:
+    """크롤링 결과 → (수집 시각을 뺀 정규화 내용, captured_at 목록)"""
+    payload = {
+        "page_url": result.get("page_url"),
+        "tables_metadata": result.get("tables_metadata", []),
+        "prob_data": [{"url": e["url"], "data": e["data"]} for e in result.get("prob_data", [])]
+    }
+    blob = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return blob.encode("utf-8"), [e.get("captured_at") for e in result.get("prob_data", [])]
+
+
+class RawArchive:
+    """크롤링 원본 결과 저장소"""
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.index_file = self.root / INDEX
+        self.latest_file = self.root / LATEST
+        self._locations: Optional[dict] = None
+        self._index_size = -1
+
+    def entries(self) -> list[dict]:
+        """index 항목 전체 (기록 순서)"""
+        if not self.index_file.exists():
+            return []
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def latest(self) -> Optional[dict]:
+        if not self.latest_file.exists():
+            return None
+        with open(self.latest_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def find(self, key: str) -> Optional[dict]:
+        """'latest', 해시 접두사, 또는 timestamp 접두사로 항목 검색 (마지막 일치)"""
+        if key == "latest":
+            return self.latest()
+        match = None
+        for entry in self.entries():
+            if entry["hash"].startswith(key) or entry["timestamp"].startswith(key):
+                match = entry
+        return match
+
+    def append(self, result: dict) -> tuple[dict, bool]:
+        """
+        크롤링 결과 기록 → (index 항목, 새 내용 저장 여부)
+        이미 있는 내용이면 세그먼트에 쓰지 않고 기존 위치를 가리킨다
+        """
+        blob, captured_at = split_result(result)
+        digest = hashlib.sha256(blob).hexdigest()
+        timestamp = result.get("crawled_at", "")
+
+        with self._locked():
+            location = self._known().get(digest)
+            stored = location is None
+            if stored:
+                location = self._write_segment(timestamp, blob)
+                self._known()[digest] = location
+
+            entry = {
+                "timestamp": timestamp,
+                "window_end": window_end(result),
+                "hash": digest,
+                **location,
+                "captured_at": captured_at
+            }
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._index_size = f.tell()
+            self._write_latest(entry)
+        return entry, stored
+
+    def load(self, entry: dict) -> dict:
+        """index 항목 → 원래 크롤링 결과 dict"""
+        with open(self.root / entry["segment"], "rb") as f:
+            f.seek(entry["offset"])
+            payload = json.loads(gzip.decompress(f.read(entry["length"])))
+
+        prob_data = [
+            {**e, "captured_at": captured}
+            for e, captured in zip(payload["prob_data"], entry["captured_at"])
+        ]
+        return {
+            "crawled_at": entry["timestamp"],
+            "page_url": payload["page_url"],
+            "tables_metadata": payload["tables_metadata"],
+            "prob_data": prob_data,
+            "summary": {
+                "total_tables": len(payload["tables_metadata"]),
+                "total_prob_responses": len(prob_data)
+            }
+        }
+
+    def import_files(self, paths: list, prune: bool = False) -> tuple[int, int]:
+        """
+        기존 JSON 결과 파일을 (파일명 순으로) 아카이브에 추가 → (추가 수, 새 내용 수)
+        이미 같은 timestamp·hash 로 기록된 파일은 건너뛴다. prune 이면 원본 삭제
+        """
+        done = {(e["timestamp"], e["hash"]) for e in self.entries()}
+        added = stored_count = 0
+        for path in sorted(Path(p) for p in paths):
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            digest = hashlib.sha256(split_result(result)[0]).hexdigest()
+            if (result.get("crawled_at", ""), digest) not in done:
+                _, stored = self.append(result)
+                added += 1
+                stored_count += stored
+            if prune:
+                path.unlink()
+        return added, stored_count
+
+    def _known(self) -> dict:
+        """hash → 세그먼트 위치 (index 가 다른 곳에서 바뀌었을 때만 다시 구성)"""
+        size = self.index_file.stat().st_size if self.index_file.exists() else 0
+        if self._locations is None or size != self._index_size:
+            self._index_size = size
+            self._locations = {}
+            for e in self.entries():
+                self._locations.setdefault(e["hash"], {
+                    "segment": e["segment"], "offset": e["offset"], "length": e["length"]
+                })
+        return self._locations
+
+    def _write_segment(self, timestamp: str, blob: bytes) -> dict:
+        month = "".join(ch for ch in timestamp if ch.isdigit())[:6] or "unknown"
+        segment = f"segments/{month}.gz"
+        path = self.root / segment
+        path.parent.mkdir(parents=True, exist_ok=True)
+        member = gzip.compress(blob, compresslevel=9, mtime=0)
+        with open(path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+        return {"segment": segment, "offset": offset, "length": len(member)}
+
+    def _write_latest(self, entry: dict):
+        tmp = self.latest_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self.latest_file)
+
+    @contextmanager
+    def _locked(self):
+        """스케줄러와 CLI 가 동시에 기록하지 않도록 잠금 (가능한 경우)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / LOCK, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤링 원본 결과 아카이브")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="기존 starforce_*.json 파일을 아카이브에 추가")
+    p_import.add_argument("paths", nargs="*", help="기본: crawler/data/starforce_*.json")
+    p_import.add_argument("--prune", action="store_true", help="추가한 원본 파일 삭제")
+
+    sub.add_parser("list", help="index 항목 목록")
+
+    p_show = sub.add_parser("show", help="결과 복원 출력 (latest / timestamp / hash 접두사)")
+    p_show.add_argument("key", nargs="?", default="latest")
+
+    args = parser.parse_args()
+    archive = RawArchive()
+
+    if args.command == "import":
+        paths = args.paths or sorted(DATA_DIR.glob("starforce_*.json"))
+        added, stored = archive.import_files(paths, prune=args.prune)
+        print(f"{added}개 추가 (새 내용 {stored}개, 나머지는 중복)")
+    elif args.command == "list":
+        for e in archive.entries():
+            print(f"{e['timestamp']}  {e['window_end'] or '-':<20}  {e['hash'][:12]}  "
+                  f"{len(e['captured_at'])}개")
+    else:
+        entry = archive.find(args.key)
+        if entry is None:
+            sys.exit(f"항목 없음: {args.key}")
+        print(json.dumps(archive.load(entry), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+직접 요청 모드 검증용 로컬 스텁 서버
+저장된 크롤링 결과(아카이브 항목 또는 starforce_*.json)의 /probs 응답을 그대로 재생하고,
+기록된 URL 로부터 페이지 메타데이터(subPages → AUTO_TABLE dataSources)를 합성한다
+
+사용 예:
+  python -m crawler.stub_server latest --port 8765
+  python -m crawler.main --headless --mode fetch \\
+      --api-base http://127.0.0.1:8765/api/services/maplestory
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crawler.config import BASE_API_URL, PAGE_ID
+from crawler.raw_archive import RawArchive
+
+API_PREFIX = urlsplit(BASE_API_URL).path
+
+
+def _route(path: str, query: str = "") -> str:
+    """경로 + 정렬된 쿼리 (쿼리 파라미터 순서와 무관하게 매칭)"""
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    return f"{path}?{urlencode(sorted(parse_qsl(query)))}" if query else path
+
+
+def load_recording(spec: str) -> dict:
+    """JSON 파일 경로, 또는 아카이브 키 (latest / timestamp / hash 접두사)"""
+    path = Path(spec)
+    if path.suffix == ".json" and path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    archive = RawArchive()
+    entry = archive.find(spec)
+    if entry is None:
+        raise FileNotFoundError(f"녹화 없음: {spec}")
+    return archive.load(entry)
+
+
+def build_routes(recording: dict) -> dict:
+    """녹화된 크롤링 결과 → {경로: 응답 본문}"""
+    routes = {}
+    sub_pages = {}   # sub-page id → {paragraph id → paragraph}
+    for entry in recording.get("prob_data", []):
+        parts = urlsplit(entry["url"])
+        routes[_route(parts.path, parts.query)] = entry["data"]
+
+        segments = parts.path.split("/")
+        try:
+            sub_page_id = segments[segments.index("sub-pages") + 1]
+            paragraph_id = segments[segments.index("paragraphs") + 1]
+        except (ValueError, IndexError):
+            continue
+        query = dict(parse_qsl(parts.query))
+        paragraphs = sub_pages.setdefault(sub_page_id, {})
+        paragraph = paragraphs.setdefault(paragraph_id, {
+            "id": paragraph_id,
+            "type": "AUTO_TABLE",
+            "tableName": "스타포스",
+            "columns": [],
+            "dataSources": []
+        })
+        paragraph["dataSources"].append({
+            "contentId": query.get("contentid"),
+            "trialId": query.get("trialid"),
+            "probTableId": query.get("probtableid")
+        })
+
+    def sub_page(sub_page_id, with_paragraphs=True):
+        sp = {"id": sub_page_id, "name": sub_page_id}
+        if with_paragraphs:
+            sp["paragraphs"] = list(sub_pages[sub_page_id].values())
+        return sp
+
+    ids = list(sub_pages)
+    # 첫 sub-page 만 메타데이터에 paragraphs 포함, 나머지는 /sub-pages/{id} 로 제공
+    # (실제 페이지처럼 선택된 sub-page 만 펼쳐진 응답)
+    metadata = {
+        "id": PAGE_ID,
+        "selectedSubPage": sub_page(ids[0]) if ids else None,
+        "subPages": [sub_page(sp, with_paragraphs=(i == 0)) for i, sp in enumerate(ids)]
+    }
+    routes[f"/pages/{PAGE_ID}"] = {"code": 0, "message": None, "data": metadata}
+    for sp in ids:
+        routes[f"/pages/{PAGE_ID}/sub-pages/{sp}"] = {"code": 0, "message": None, "data": sub_page(sp)}
+    return routes
+
+
+class StubServer:
+    """녹화 응답을 재생하는 HTTP 서버 (별도 스레드에서 실행 가능)"""
+
+    def __init__(self, recording: str, host: str = "127.0.0.1", port: int = 0,
+                 delay: float = 0.0):
+        self.routes = build_routes(load_recording(str(recording)))
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive (커넥션 풀 재사용 확인용)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                parts = urlsplit(self.path)
+                payload = server.routes.get(_route(parts.path, parts.query))
+                if payload is None:
+                    status, payload = 404, {"code": 404, "message": "not recorded", "data": None}
+                else:
+                    status = 200
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화된 /probs 응답을 재생하는 로컬 스텁 서버")
+    parser.add_argument("recording", nargs="?", default="latest",
+                        help="재생할 크롤링 결과: JSON 파일 또는 아카이브 키 (기본: latest)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="응답마다 추가할 지연 (초, 네트워크 왕복 시간 흉내)")
+    args = parser.parse_args()
+
+    server = StubServer(args.recording, args.host, args.port, args.delay)
+    print(f"스텁 서버: {server.api_base} ({len(server.routes)}개 경로)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
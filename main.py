@@ -1,13 +1,44 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from app.api import simulator, audit
+from app.core import metrics
 from pathlib import Path
 import uvicorn
 
-app = FastAPI()
+# Comma-separated routers to mount; "audit" alone skips the simulator and its
+# NumPy/C++ imports on audit-only deployments.
+ROUTERS = {r.strip() for r in os.environ.get("STARFORCE_ROUTERS", "simulator,audit").split(",") if r.strip()}
+
+# uvicorn worker processes for `python main.py`; >1 shares one audit dataset and temporal series
+# between them, and /metrics merges the workers' counters (see app/core/metrics.py)
+WORKERS = int(os.environ.get("STARFORCE_WORKERS", "1"))
+
+# Seconds between audit_data/ change checks; 0 disables hot reload
+AUDIT_POLL_SECONDS = float(os.environ.get("STARFORCE_AUDIT_POLL", "30"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics.start_sharing()
+    if os.environ.get("STARFORCE_WARMUP", "").lower() in ("1", "true", "yes"):
+        from app.services.warmup import start_warmup
+        start_warmup(ROUTERS)
+    if "audit" in ROUTERS and AUDIT_POLL_SECONDS > 0:
+        from app.core.audit_engine import start_audit_poller
+        start_audit_poller(AUDIT_POLL_SECONDS)
+    yield
+    if metrics.SHARED_DIR:
+        metrics.flush_shared()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,7 +46,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+class StreamSafeGZip(GZipMiddleware):
+    """
+    GZip except on the SSE compare stream. Starlette only leaves
+    text/event-stream uncompressed in recent releases; older ones buffer
+    the stream and deliver its events late or all at once.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/compare/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Audit bundles / heatmaps are large, repetitive JSON
+app.add_middleware(StreamSafeGZip, minimum_size=1024)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Route template keeps label cardinality bounded (/compare/stream/{run_id}/stop).
+    # Streaming responses are timed to their first byte.
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        path = "/static" if request.url.path.startswith("/static/") else "unmatched"
+    metrics.HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=path)
+    metrics.HTTP_REQUESTS.inc(method=request.method, route=path, status=response.status_code)
+    return response
 
 # Root directory for path resolution
 ROOT_DIR = Path(__file__).parent
@@ -26,8 +87,16 @@ app.mount("/static", StaticFiles(directory=ROOT_DIR / "app" / "static"), name="s
 # Setup templates
 templates = Jinja2Templates(directory=ROOT_DIR / "app" / "templates")
 
-app.include_router(simulator.router)
-app.include_router(audit.router)
+if "simulator" in ROUTERS:
+    from app.api import simulator
+    app.include_router(simulator.router)
+if "audit" in ROUTERS:
+    from app.api import audit
+    app.include_router(audit.router)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -38,4 +107,19 @@ async def read_audit(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    if WORKERS > 1:
+        if "audit" in ROUTERS:
+            # Build the column and temporal caches once here; workers map them read-only and start warm
+            from app.core.audit_engine import publish_audit_cache
+            from app.services.temporal_service import get_temporal_service
+            publish_audit_cache()
+            get_temporal_service().refresh()
+        # Per-worker metrics files, merged at scrape time; fresh for every run
+        metrics_dir = tempfile.mkdtemp(prefix="starforce-metrics-")
+        os.environ["STARFORCE_METRICS_DIR"] = metrics_dir
+        try:
+            uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WORKERS)
+        finally:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
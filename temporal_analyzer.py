@@ -4,45 +4,33 @@ import math
 import statistics
 import numpy as np
 
-def load_all_data(base_dir="crawler/sessions"):
-    all_entries = []
+from app.services.snapshot_stream import iter_snapshots, session_files
+
+def iter_all_data(base_dir="crawler/sessions"):
+    """
+    Snapshots from every session in global timestamp order, streamed: the
+    sessions' time-ordered files are k-way merged rather than loaded and sorted.
+    This treats data across sessions as a single timeline.
+    """
     print(f"Searching in: {os.path.abspath(base_dir)}")
-    found_files = 0
-    
-    for root, dirs, files in os.walk(base_dir):
-        # Prefer relabeled snapshots if present
-        relabeled = os.path.join(root, "hourly_snapshots_relabel.jsonl")
-        original = os.path.join(root, "hourly_snapshots.jsonl")
-        path = relabeled if os.path.exists(relabeled) else original
-        if os.path.exists(path):
-            found_files += 1
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line: continue
-                    try:
-                        entry = json.loads(line)
-                        if entry.get("data_by_key"):
-                            all_entries.append(entry)
-                    except: continue
-    
-    # Sort ALL entries by timestamp globally
-    # This treats data across sessions as a single timeline
-    all_entries.sort(key=lambda x: x["timestamp"])
-    print(f"Aggregated {len(all_entries)} snapshots from {found_files} files.")
-    return all_entries
+    found_files = len(session_files(base_dir))
+    count = 0
+    for entry in iter_snapshots(base_dir, dedup=False):
+        count += 1
+        yield entry
+    print(f"Aggregated {count} snapshots from {found_files} files.")
 
-def analyze_temporal_iid(base_dir="crawler/sessions"):
-    raw_data = load_all_data(base_dir)
-    if not raw_data:
-        print("No valid data found.")
-        return
+def load_all_data(base_dir="crawler/sessions"):
+    return list(iter_all_data(base_dir))
 
+def analyze_temporal_iid(base_dir="crawler/sessions"):
     # key -> list of hourly deltas
     deltas_map = {}
 
     prev_data = None
-    for entry in raw_data:
+    snapshots = 0
+    for entry in iter_all_data(base_dir):
+        snapshots += 1
         curr_ts = entry["timestamp"]
         curr_data = entry["data_by_key"]
         
@@ -89,6 +77,10 @@ def analyze_temporal_iid(base_dir="crawler/sessions"):
         
         prev_data = curr_data
 
+    if not snapshots:
+        print("No valid data found.")
+        return
+
     # Now Analyze each key
     import re
     
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests import the app and crawler packages from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PROBS_URL = (
+    "https://orng-api.nexon.com/api/services/maplestory/pages/p/sub-pages/s/paragraphs/{para}/probs"
+    "?contentid=c&trialid={trial}&probtableid={table}"
+)
+TRIALS = {"off": "스타포스 이벤트 미적용(파괴방지X)", "on": "스타포스 이벤트 미적용(스타캐치 O)"}
+
+
+@pytest.fixture
+def make_crawl_result():
+    """Factory for crawler results shaped like NexonCrawler's (one /probs table per star and catch)."""
+    def make(hour, counts, stars=range(15, 18), crawled_at=None):
+        window_end = f"2026-03-29T{hour:02d}:00:00"
+        prob_data = []
+        for star in stars:
+            for catch, trial in TRIALS.items():
+                s, f, b = counts(star, catch)
+                probs = [
+                    {"count": count, "prob": prob, "probtable_name": f"{star}성", "trialid_name": trial,
+                     "trialresult_name": name, "windowEnd": window_end}
+                    for count, prob, name in ((s, "30.0000%", "성공"), (f, "67.9000%", "실패 (유지)"),
+                                              (b, "2.1000%", "파괴"))
+                ]
+                prob_data.append({
+                    "url": PROBS_URL.format(para=star, trial=catch, table=f"t{star}{catch}"),
+                    "data": {"code": 0, "data": {"probs": probs, "trialresultMissing": False}, "message": None},
+                    "captured_at": f"2026-03-29 {hour:02d}:05:{star:02d}",
+                })
+        return {
+            "crawled_at": crawled_at or f"2026-03-29 {hour:02d}:05:00",
+            "page_url": "https://now.nexon.com/service/maplestory?page=p",
+            "tables_metadata": [{"index": 0, "rows": [["성공", "30%"]]}],
+            "prob_data": prob_data,
+            "summary": {"total_tables": 1, "total_prob_responses": len(prob_data)},
+        }
+    return make
@@ -0,0 +1,31 @@
+import pytest
+
+from app.api import audit
+from app.core import audit_engine
+from app.core.audit_engine import AuditSnapshot
+from app.core.audit_frame import AuditFrame
+from app.models.schemas import AuditQuery
+
+from test_audit_cube import make_records
+
+
+def snapshot_of(records, version):
+    return AuditSnapshot(version, records, AuditFrame.from_records(records))
+
+
+def test_bundle_reads_one_snapshot(monkeypatch):
+    pinned = snapshot_of(make_records(seed=0), "v1")
+
+    # A reload installed mid-build must not leak into the bundle
+    def reloaded():
+        pytest.fail("bundle read the current snapshot")
+    monkeypatch.setattr(audit_engine, "get_audit_snapshot", reloaded)
+
+    q = AuditQuery(events=[], stars=[], catch_ops=[], min_samples=100, split_date="20250801")
+    bundle = audit._build_bundle(q, pinned)
+
+    filtered = pinned.cube.select(min_samples=100)
+    assert bundle["query"]["debug_info"]["db_size"] == len(pinned.frame)
+    assert bundle["query"]["results"] == audit_engine.calculate_stats(filtered)
+    assert bundle["eventDates"] == pinned.dims.calendar
+    assert bundle["eventDec"] == audit_engine.get_event_deception_index(filtered, snapshot=pinned)
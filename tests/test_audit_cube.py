@@ -0,0 +1,114 @@
+import math
+import random
+
+import pytest
+
+from app.core import audit_engine
+from app.core.audit_cube import AuditCube
+from app.core.audit_frame import AuditFrame
+
+EVENTS = ("스타포스 이벤트 미적용", "샤이닝 스타포스", "30% 할인")
+DATES = ("20250320", "20250611", "20250902", "20251105", "20260110")
+
+
+def make_records(duplicates=0, seed=0):
+    """Audit records shaped like _load_audit_json's: one file per date/event/catch, one row per star."""
+    rng = random.Random(seed)
+    records = []
+    for date in DATES:
+        for event in EVENTS:
+            for catch in (False, True):
+                for star in range(12, 23):
+                    for _ in range(1 + (duplicates if rng.random() < 0.3 else 0)):
+                        records.append(make_record(rng, date, event, catch, star))
+    rng.shuffle(records)
+    return records
+
+
+def make_record(rng, date, event, catch, star):
+    n = rng.choice([rng.randint(1, 99), rng.randint(100, 300), rng.randint(300, 20000)])
+    p = {"success": rng.uniform(0.2, 0.5), "boom": rng.uniform(0.0, 0.1)}
+    p["fail"] = 1.0 - p["success"] - p["boom"]
+    r = {"star": star, "total_n": n, "_date": date, "_event": event, "_is_catch": catch}
+    left = n
+    for prefix in ("success", "boom", "fail"):
+        obs = left if prefix == "fail" else min(left, round(n * p[prefix] + rng.gauss(0, 3)))
+        left -= obs
+        var = n * p[prefix] * (1 - p[prefix])
+        r[f"{prefix}_n"] = obs
+        r[f"{prefix}_p_target"] = p[prefix]
+        r[f"{prefix}_z_score"] = (obs - n * p[prefix]) / math.sqrt(var) if var > 0 else 0.0
+    r["success_p_actual"] = r["success_n"] / n
+    return r
+
+
+def record_filter(records, events=None, stars=None, catches=None, min_samples=0):
+    """The record-at-a-time filter the cube replaces."""
+    return [
+        r for r in records
+        if (not events or r["_event"] in events)
+        and (not stars or r["star"] in stars)
+        and (catches is None or r["_is_catch"] in catches)
+        and r.get("total_n", 0) >= min_samples
+    ]
+
+
+def views(data):
+    return {
+        "stats": audit_engine.calculate_stats(data),
+        "heatmap": audit_engine.get_heatmap_stats(data),
+        "drift": audit_engine.get_drift_stats(data),
+        "monthly": audit_engine.get_monthly_stats(data),
+        "dates": audit_engine.get_event_dates(data),
+        "season": audit_engine.get_season_contrast_stats(filtered_db=data),
+        "split": audit_engine.get_season_contrast_stats(split_date="20250801", filtered_db=data),
+    }
+
+
+def assert_close(a, b, path="$"):
+    """Equal, except floats may differ by the last rounding step."""
+    if isinstance(a, dict):
+        assert isinstance(b, dict) and list(a) == list(b), path
+        for k in a:
+            assert_close(a[k], b[k], f"{path}.{k}")
+    elif isinstance(a, list):
+        assert isinstance(b, list) and len(a) == len(b), path
+        for i, (x, y) in enumerate(zip(a, b)):
+            assert_close(x, y, f"{path}[{i}]")
+    elif isinstance(a, float) and isinstance(b, (int, float)):
+        assert b == pytest.approx(a, rel=1e-9, abs=0.1001), path
+    else:
+        assert a == b, path
+
+
+QUERIES = [
+    {},
+    {"min_samples": 100},
+    {"stars": [17, 18], "catches": {True}, "min_samples": 0},
+    {"events": ["샤이닝 스타포스"], "min_samples": 500},
+    {"events": list(EVENTS[:2]), "stars": list(range(15, 23)), "catches": {False}, "min_samples": 101},
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_single_record_cells_match_exactly(query):
+    records = make_records()
+    cube = AuditCube(AuditFrame.from_records(records))
+    selected = cube.select(**query)
+    expected = record_filter(records, **query)
+
+    assert selected.records() == expected
+    assert selected.n_records == len(expected)
+    assert views(selected) == views(expected)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_multi_record_cells_match(query):
+    records = make_records(duplicates=2, seed=1)
+    frame = AuditFrame.from_records(records)
+    selected = AuditCube(frame).select(**query)
+    expected = record_filter(records, **query)
+
+    assert selected.records() == expected
+    assert selected.records() == frame.take(frame.mask(**query)).records()
+    assert_close(views(expected), views(selected))
@@ -0,0 +1,76 @@
+import json
+import math
+import struct
+
+import pytest
+
+from app.core.columnar import MAGIC, decode, encode
+
+
+def as_json(payload):
+    """What the JSON response carries (non-finite floats go out as null)."""
+    def clean(node):
+        if isinstance(node, dict):
+            return {k: clean(v) for k, v in node.items()}
+        if isinstance(node, (list, tuple)):
+            return [clean(v) for v in node]
+        if isinstance(node, float) and not math.isfinite(node):
+            return None
+        return node
+    return json.loads(json.dumps(clean(payload)))
+
+
+PAYLOADS = {
+    "scalars": {"a": 1, "b": 2.5, "c": None, "d": True, "e": "별", "f": []},
+    "table": {
+        "rows": [
+            {
+                "star": s,
+                "n": s * 1000,
+                "rate": s / 7,
+                "z": None if s % 3 == 0 else -s / 3,
+                "catch": bool(s % 2),
+                "event": "no_event" if s % 4 else "샤이닝",
+                "label": None if s == 5 else f"{s}성",
+                "mixed": [s] if s % 2 else "x",
+            }
+            for s in range(25)
+        ]
+    },
+    "arrays": {
+        "ints": list(range(-20, 20)),
+        "floats": [i / 3 for i in range(40)],
+        "mixed": [1, 2.5] * 10,
+        "wide": [2 ** 40 + i for i in range(20)],
+        "short": [1, 2, 3],
+    },
+    "nested": {
+        "series": {str(s): {"z_scores": [math.sin(i) for i in range(30)], "n_obs": 30} for s in (17, 22)},
+        "tables": [[{"k": "a", "v": 1}, {"k": "b", "v": 2}], [{"x": 1.5}]],
+        "ragged": [{"a": 1}, {"b": 2}],
+    },
+    "non_finite": {"values": [float("nan"), float("inf"), 1.0] * 6, "x": float("-inf")},
+}
+
+
+@pytest.mark.parametrize("name", PAYLOADS)
+def test_round_trip_equals_json(name):
+    payload = PAYLOADS[name]
+    data = encode(payload)
+    assert data[:4] == MAGIC
+    assert decode(data) == as_json(payload)
+
+
+def test_buffers_are_aligned():
+    data = encode(PAYLOADS["table"])
+    (hlen,) = struct.unpack_from("<I", data, 4)
+    header = json.loads(data[8:8 + hlen])
+    for table in header["tables"]:
+        for col in table["columns"]:
+            if "offset" in col:
+                assert col["offset"] % 8 == 0
+
+
+def test_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode(b"{}")
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from crawler.data_processor import DeltaCalculator
+
+
+def counts(hour):
+    return lambda star, catch: (1000 * hour + star * (2 if catch == "on" else 1), 2100 * hour, 7 * hour)
+
+
+def last_line(calc):
+    with open(calc.snapshots_file, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1])
+
+
+def loaded(calc):
+    return calc._previous, calc._previous_window_end
+
+
+def test_resume_from_state_equals_last_line(tmp_path, make_crawl_result):
+    calc = DeltaCalculator(tmp_path)
+    for h in (1, 2, 3):
+        calc.process_crawl_result(make_crawl_result(h, counts(h)))
+
+    state = json.loads(calc.state_file.read_text(encoding="utf-8"))
+    last = last_line(calc)
+    assert state["offset"] == calc.snapshots_file.stat().st_size
+    assert (state["data_by_key"], state["window_end"]) == (last["data_by_key"], last["window_end"])
+
+    resumed = DeltaCalculator(tmp_path)
+    assert loaded(resumed) == (last["data_by_key"], last["window_end"])
+    # Same windowEnd as the last snapshot: skipped after a restart too
+    assert resumed.process_crawl_result(make_crawl_result(3, counts(3))) == ([], False)
+
+
+def test_resumed_run_writes_the_same_files(tmp_path, make_crawl_result):
+    results = [make_crawl_result(h, counts(h)) for h in range(1, 6)]
+    continuous = DeltaCalculator(tmp_path / "a")
+    for r in results:
+        continuous.process_crawl_result(r)
+    for r in results:
+        DeltaCalculator(tmp_path / "b").process_crawl_result(r)
+
+    for name in ("hourly_snapshots.jsonl", "hourly_deltas.jsonl"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+    assert (tmp_path / "a" / "hourly_deltas.jsonl").read_text(encoding="utf-8").count("\n") == 4 * 6
+
+
+def test_stale_state_falls_back_to_last_line(tmp_path, make_crawl_result):
+    calc = DeltaCalculator(tmp_path)
+    calc.process_crawl_result(make_crawl_result(1, counts(1)))
+
+    # Another writer appends behind the state file's back
+    other = DeltaCalculator(tmp_path / "other")
+    other.process_crawl_result(make_crawl_result(2, counts(2)))
+    with open(calc.snapshots_file, "ab") as f:
+        f.write(other.snapshots_file.read_bytes() + b"\n")
+
+    resumed = DeltaCalculator(tmp_path)
+    last = last_line(resumed)
+    assert loaded(resumed) == (last["data_by_key"], last["window_end"])
+    state = json.loads(resumed.state_file.read_text(encoding="utf-8"))
+    assert state["offset"] == resumed.snapshots_file.stat().st_size
+    assert state["window_end"] == "2026-03-29T02:00:00"
+
+
+def test_corrupt_state_falls_back_to_last_line(tmp_path, make_crawl_result):
+    calc = DeltaCalculator(tmp_path)
+    calc.process_crawl_result(make_crawl_result(1, counts(1)))
+    calc.state_file.write_text("{", encoding="utf-8")
+
+    resumed = DeltaCalculator(tmp_path)
+    last = last_line(resumed)
+    assert loaded(resumed) == (last["data_by_key"], last["window_end"])
+
+
+@pytest.mark.parametrize("block", [1, 7, 64, 100000])
+def test_read_last_line_any_block_size(block, tmp_path, make_crawl_result, monkeypatch):
+    calc = DeltaCalculator(tmp_path)
+    for h in (1, 2):
+        calc.process_crawl_result(make_crawl_result(h, counts(h)))
+    with open(calc.snapshots_file, "ab") as f:
+        f.write(b"\n  \n")
+
+    monkeypatch.setattr(DeltaCalculator, "TAIL_BLOCK", block)
+    assert json.loads(calc._read_last_line()) == last_line(calc)
+
+    calc.snapshots_file.write_bytes(b"")
+    assert calc._read_last_line() is None
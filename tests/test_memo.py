@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.memo import MemoCache
+
+THREADS = 8
+
+
+def run_concurrently(fn):
+    barrier = threading.Barrier(THREADS)
+
+    def call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        futures = [pool.submit(call) for _ in range(THREADS)]
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_single_flight_computes_once():
+    cache = MemoCache("test_memo")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)  # long enough for every thread to join the flight
+        return object()
+
+    values = run_concurrently(lambda: cache.get("k", 1, compute))
+    assert len(calls) == 1
+    assert all(v is values[0] for v in values)
+    assert cache.get("k", 1, compute) is values[0]
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_the_error():
+    cache = MemoCache("test_memo")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        raise KeyError("boom")
+
+    errors = run_concurrently(lambda: cache.get("k", 1, compute))
+    assert len(calls) == 1
+    assert all(isinstance(e, KeyError) for e in errors)
+    # Failures aren't cached
+    assert cache.get("k", 1, lambda: 42) == 42
+
+
+def test_new_version_drops_old_entries():
+    cache = MemoCache("test_memo")
+    assert cache.get("k", 1, lambda: "old") == "old"
+    assert cache.get("k", 2, lambda: "new") == "new"
+    assert cache.get("k", 2, lambda: pytest.fail("recomputed")) == "new"
+    assert len(cache) == 1
+
+
+def test_lru_eviction():
+    cache = MemoCache("test_memo", maxsize=2)
+    cache.get("a", 1, lambda: 1)
+    cache.get("b", 1, lambda: 2)
+    cache.get("a", 1, lambda: pytest.fail("recomputed"))
+    cache.get("c", 1, lambda: 3)
+    assert cache.get("b", 1, lambda: "again") == "again"
+    assert cache.get("c", 1, lambda: pytest.fail("recomputed")) == 3
@@ -0,0 +1,37 @@
+import json
+
+from app.core import metrics
+
+REQUESTS = metrics.counter("test_merge_total", "Merge test counter.", ("route",))
+LATENCY = metrics.histogram("test_merge_seconds", "Merge test histogram.", buckets=(0.1, 1.0))
+
+
+def sample(text, line_prefix):
+    return next(float(l.rsplit(" ", 1)[1]) for l in text.splitlines() if l.startswith(line_prefix))
+
+
+def test_render_adds_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "SHARED_DIR", str(tmp_path))
+    REQUESTS.inc(2, route="/a")
+    REQUESTS.set_total(5, route="mirror")
+    LATENCY.observe(0.05)
+
+    # Another worker's flush, as flush_shared() writes it
+    other = {
+        "test_merge_total": [[["/a"], 3.0], [["/b"], 1.0], [["mirror"], 5.0]],
+        "test_merge_seconds": [[[], [[0, 1, 0], 0.5, 1]]],
+    }
+    (tmp_path / "999999.json").write_text(json.dumps(other))
+    metrics.flush_shared()  # our own file is skipped; live values are used
+
+    text = metrics.render()
+    assert sample(text, 'test_merge_total{route="/a"}') == 5
+    assert sample(text, 'test_merge_total{route="/b"}') == 1
+    assert sample(text, 'test_merge_total{route="mirror"}') == 5
+    assert sample(text, 'test_merge_seconds_bucket{le="0.1"}') == 1
+    assert sample(text, 'test_merge_seconds_bucket{le="1"}') == 2
+    assert sample(text, "test_merge_seconds_count") == 2
+
+    # Merging never changes the process's own values
+    assert REQUESTS.values[("/a",)] == 2
+    assert LATENCY.values[()][2] == 1
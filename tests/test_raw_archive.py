@@ -0,0 +1,50 @@
+import json
+
+from crawler.raw_archive import RawArchive
+
+
+def counts(hour):
+    return lambda star, catch: (1000 * hour + star, 2000 * hour + star, hour)
+
+
+def test_append_load_round_trip(tmp_path, make_crawl_result):
+    archive = RawArchive(tmp_path)
+    results = [make_crawl_result(h, counts(h)) for h in (1, 2)]
+    # Same content crawled again: only the crawl times differ
+    results.append(make_crawl_result(2, counts(2), crawled_at="2026-03-29 02:35:00"))
+    for r in results[2]["prob_data"]:
+        r["captured_at"] = r["captured_at"].replace(":05:", ":35:")
+    results.append(make_crawl_result(3, counts(3), crawled_at="2026-04-01 03:05:00"))
+
+    stored = [archive.append(r)[1] for r in results]
+    assert stored == [True, True, False, True]
+
+    entries = archive.entries()
+    assert [archive.load(e) for e in entries] == results
+    assert entries[2]["hash"] == entries[1]["hash"]
+    assert entries[2]["offset"] == entries[1]["offset"]
+    assert [e["segment"] for e in entries] == ["segments/202603.gz"] * 3 + ["segments/202604.gz"]
+    assert archive.latest() == entries[-1]
+    assert archive.find("2026-03-29 02:35") == entries[2]
+
+    # A fresh instance (another process) reads the same archive
+    other = RawArchive(tmp_path)
+    assert other.load(other.find("latest")) == results[-1]
+    assert other.append(results[0])[1] is False
+
+
+def test_import_files_skips_recorded_results(tmp_path, make_crawl_result):
+    data = tmp_path / "data"
+    data.mkdir()
+    results = [make_crawl_result(h, counts(h)) for h in (1, 2)]
+    paths = []
+    for r in results:
+        path = data / f"starforce_{r['crawled_at'].replace(' ', '_').replace(':', '')}.json"
+        path.write_text(json.dumps(r, ensure_ascii=False), encoding="utf-8")
+        paths.append(path)
+
+    archive = RawArchive(tmp_path / "archive")
+    assert archive.import_files(paths) == (2, 2)
+    assert archive.import_files(paths, prune=True) == (0, 0)
+    assert not any(p.exists() for p in paths)
+    assert [archive.load(e) for e in archive.entries()] == results
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from app.services.sim_summary import SimSummary
+from app.services.simulation_service import aggregate
+
+
+def make_results(n, seed=0):
+    rng = random.Random(seed)
+    results = []
+    for _ in range(n):
+        streaks = [rng.choice([1, -1]) * rng.randint(1, 12) for _ in range(rng.randint(0, 20))]
+        results.append({
+            "lvl_stats": [[rng.randint(0, 50) for _ in range(4)] for _ in range(10)],
+            # Large enough that cost^2 doesn't fit in int64
+            "cost": rng.randint(0, 80_000_000_000),
+            "clicks": rng.randint(1, 400),
+            "streaks": streaks,
+            "b_streaks": [rng.randint(0, 3) for _ in range(rng.randint(0, 4))],
+        })
+    return results
+
+
+@pytest.mark.parametrize("chunks", [1, 2, 7])
+def test_merged_summary_equals_single_pass(chunks):
+    results = make_results(300)
+    single = SimSummary().add(results)
+
+    merged = SimSummary()
+    size = -(-len(results) // chunks)
+    for i in range(0, len(results), size):
+        # Shards cross the process boundary as plain JSON
+        shard = SimSummary().add(results[i:i + size])
+        merged.merge(SimSummary.from_dict(shard.to_dict()))
+
+    assert merged.to_dict() == single.to_dict()
+    assert merged.to_aggregate() == single.to_aggregate()
+
+
+def test_summary_aggregate_equals_aggregate():
+    results = make_results(200, seed=1)
+    assert SimSummary().add(results).to_aggregate() == aggregate(results)
+
+
+def test_empty_summary():
+    assert SimSummary().to_aggregate() == aggregate([])
@@ -0,0 +1,160 @@
+import itertools
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services import snapshot_stream
+from app.services.temporal_service import TemporalService
+
+STARS = range(15, 23)
+START = datetime(2026, 1, 27, 2)
+_fresh = itertools.count()
+
+
+def make_snapshots(hours, seed, offset=0):
+    """Hourly cumulative snapshots like the crawler's DeltaCalculator writes."""
+    rng = random.Random(seed)
+    counts = {star: [rng.randint(0, 5000), rng.randint(0, 5000), 0] for star in STARS}
+    lines = []
+    for h in range(hours):
+        window_end = (START + timedelta(hours=h + offset)).strftime("%Y-%m-%dT%H:%M:%S")
+        data = {}
+        for star in STARS:
+            c = counts[star]
+            if h == hours // 2 and star == 17:
+                c[:] = [0, 0, 0]  # server-side reset
+            n = rng.randint(50, 3000)
+            s = sum(rng.random() < 0.3 for _ in range(n))
+            b = rng.randint(0, n - s) // 20
+            c[0] += s
+            c[1] += n - s - b
+            c[2] += b
+            data[f"no_event_catch_off_{star}"] = {
+                "star": str(star), "event": "스타포스 이벤트 미적용", "window_end": window_end,
+                "success_count": c[0], "fail_count": c[1], "boom_count": c[2],
+                "success_rate": 0.3, "fail_rate": 0.67, "boom_rate": 0.03,
+            }
+        crawled = START + timedelta(hours=h + offset, minutes=rng.randint(1, 50))
+        entry = {"timestamp": crawled.strftime("%Y-%m-%d %H:%M:%S"), "window_end": window_end, "data_by_key": data}
+        lines.append((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+    return lines
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Two overlapping sessions; b re-records a's hours 6..8 (duplicates) and carries on."""
+    a = make_snapshots(12, seed=1)
+    b = a[6:9] + make_snapshots(10, seed=2, offset=12)
+    base = tmp_path / "sessions"
+    return base, {base / "s_a" / snapshot_stream.ORIGINAL: a, base / "s_b" / snapshot_stream.ORIGINAL: b}
+
+
+def result(base_dir, service=None):
+    """Gap data of `service`, or of a fresh service with a cache of its own (a full rebuild)."""
+    if service is None:
+        service = TemporalService(str(base_dir), cache_dir=base_dir.parent / f"fresh-{next(_fresh)}")
+    return json.dumps(service.get_temporal_gap_data(), sort_keys=True)
+
+
+def write(path, data, mode="ab"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, mode) as f:
+        f.write(data)
+
+
+def test_tailing_equals_rebuild(sessions):
+    base, files = sessions
+    service = TemporalService(str(base))
+    rng = random.Random(0)
+    pending = {path: list(lines) for path, lines in files.items()}
+    for path in pending:
+        write(path, b"")
+    steps = 0
+    while any(pending.values()):
+        path = rng.choice([p for p, lines in pending.items() if lines])
+        line = pending[path].pop(0)
+        if rng.random() < 0.3:
+            # Crawler caught mid-write: the partial line must wait for the rest
+            cut = len(line) // 2
+            write(path, line[:cut])
+            assert result(base, service) == result(base)
+            line = line[cut:]
+        write(path, line)
+        steps += 1
+        if steps % 3 == 0 or not any(pending.values()):
+            assert result(base, service) == result(base)
+    assert service._count == len(list(snapshot_stream.iter_snapshots(str(base))))
+
+
+def test_out_of_order_append_rebuilds(sessions):
+    base, files = sessions
+    (path_a, a), (path_b, b) = files.items()
+    write(path_a, b"".join(a[:4] + a[8:]))
+    write(path_b, b"".join(b))
+    service = TemporalService(str(base))
+    result(base, service)
+
+    # Backfilled hours land after newer ones
+    write(path_a, b"".join(a[4:8]))
+    assert result(base, service) == result(base)
+
+
+def test_rewritten_and_relabeled_files_rebuild(sessions):
+    base, files = sessions
+    (path_a, a), (path_b, b) = files.items()
+    write(path_a, b"".join(a))
+    write(path_b, b"".join(b))
+    service = TemporalService(str(base))
+    result(base, service)
+
+    write(path_a, b"".join(a[:7]), mode="wb")
+    assert result(base, service) == result(base)
+
+    write(path_b.with_name(snapshot_stream.RELABELED), b"".join(b[2:]))
+    assert result(base, service) == result(base)
+
+    path_b.with_name(snapshot_stream.RELABELED).unlink()
+    path_a.unlink()
+    assert result(base, service) == result(base)
+
+
+def test_dedup_keeps_only_the_frontier(sessions):
+    base, files = sessions
+    for path, lines in files.items():
+        write(path, b"".join(lines))
+    service = TemporalService(str(base))
+    result(base, service)
+
+    snapshots = list(snapshot_stream.iter_snapshots(str(base)))
+    # b re-records three of a's hours; each pair is kept once
+    assert len(snapshots) == sum(len(lines) for lines in files.values()) - 3
+    assert service._count == len(snapshots)
+    assert service._dedup.timestamp == snapshots[-1]["timestamp"]
+    assert len(service._dedup.signatures) == 1
+
+
+def test_workers_share_the_published_series(sessions):
+    base, files = sessions
+    (path_a, a), (path_b, b) = files.items()
+    write(path_a, b"".join(a[:6]))
+    write(path_b, b"".join(b))
+    first, second = TemporalService(str(base)), TemporalService(str(base))
+    expected = result(base)
+    assert result(base, first) == expected
+
+    # The second worker maps the first one's generation instead of reading the files
+    second._tail = lambda: pytest.fail("re-read the session files")
+    assert result(base, second) == expected
+    series = next(iter(second._series.values()))
+    assert isinstance(series["z"], np.memmap) or isinstance(series["z"].base, np.memmap)
+    del second._tail
+
+    # Either worker tails new lines from the shared state; the other picks them up
+    write(path_a, b"".join(a[6:]))
+    assert result(base, second) == result(base)
+    assert first.refresh()
+    assert first._count == second._count
+    assert result(base, first) == result(base, second)